@@ -0,0 +1,11 @@
+import os
+
+APP_DIR_NAME = os.path.join("FoxTeam", "FoxBr")
+
+
+def data_path(*parts):
+    """Return a path inside the per-user FoxBr data directory, creating the directory."""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    directory = os.path.join(base, APP_DIR_NAME, *parts[:-1])
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, *parts[-1:])
@@ -0,0 +1,95 @@
+"""Delta update against a local HTTP server standing in for GitHub releases.
+
+Builds two releases that differ in one file, serves the second one over
+loopback and reports how many bytes the delta saved over the full archive.
+
+    python benchmarks/bench_delta_update.py [--files 200] [--file-size 262144]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import tempfile
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from update_manifest import MANIFEST_FILENAME, build_manifest, save_manifest, publish_release, apply_delta_update
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory):
+    """Serve a directory on a free loopback port; returns the server."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_release(directory, files, file_size, changed=()):
+    for index in range(files):
+        path = os.path.join(directory, "lib" if index % 2 else "", f"module_{index}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(os.urandom(file_size) if index in changed else random.Random(index).randbytes(file_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-size", type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="foxbr_delta_")
+    try:
+        install_path = os.path.join(work_dir, "install")
+        new_release = os.path.join(work_dir, "release")
+        server_dir = os.path.join(work_dir, "server", "0.0.7")
+
+        # Installed release, with its cached manifest
+        os.makedirs(install_path)
+        make_release(install_path, args.files, args.file_size)
+        save_manifest(build_manifest(install_path, "0.0.6"), os.path.join(install_path, MANIFEST_FILENAME))
+
+        # New release: one file changed, published with its full archive
+        os.makedirs(new_release)
+        make_release(new_release, args.files, args.file_size, changed={0})
+        archive_path = os.path.join(work_dir, "FoxBr.zip")
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for root, _, names in os.walk(new_release):
+                for name in names:
+                    path = os.path.join(root, name)
+                    archive.write(path, os.path.relpath(path, new_release))
+        remote = publish_release(new_release, "0.0.7", server_dir, archive_path)
+
+        server = serve_directory(os.path.dirname(server_dir))
+        release_url = f"http://127.0.0.1:{server.server_address[1]}/0.0.7"
+        start = time.perf_counter()
+        stats = apply_delta_update(release_url, install_path, remote)
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+
+        if stats is None:
+            print("Delta update failed.")
+            sys.exit(1)
+        saved_percent = 100 * stats["bytes_saved"] / max(1, stats["full_download_bytes"])
+        print(f"Changed files:      {stats['changed_files']} of {args.files}")
+        print(f"Downloaded:         {stats['bytes_downloaded']} bytes")
+        print(f"Full archive:       {stats['full_download_bytes']} bytes")
+        print(f"Saved:              {stats['bytes_saved']} bytes ({saved_percent:.1f}%)")
+        print(f"Delta update time:  {elapsed * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Segmented downloads against a local HTTP server.
+
+Serves a generated archive over loopback with an optional per-connection
+bandwidth cap (like a CDN limiting each stream) and compares the previous
+single-connection, 1 KiB-chunk download with SegmentedDownloader. Also
+checks resuming after an interruption and the fallback for servers that
+ignore Range requests.
+
+    python benchmarks/bench_download.py [--size-mb 64] [--rate-mb 16]
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from download_engine import SegmentedDownloader, DownloadCanceled
+
+SEND_CHUNK_SIZE = 64 * 1024
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """Serves server.payload, honoring Range requests unless server.ranges is False."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payload = self.server.payload
+        start, end = 0, len(payload) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and self.server.ranges:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"bench"')
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        rate = self.server.rate
+        sent_start = time.perf_counter()
+        sent = 0
+        try:
+            for offset in range(start, end + 1, SEND_CHUNK_SIZE):
+                chunk = payload[offset:min(offset + SEND_CHUNK_SIZE, end + 1)]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if rate:
+                    delay = sent / rate - (time.perf_counter() - sent_start)
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # The client closed a probe request early
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(payload, rate, ranges=True):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+    server.daemon_threads = True
+    server.payload = payload
+    server.rate = rate
+    server.ranges = ranges
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/FoxBr.zip"
+
+
+def legacy_download(url, save_path):
+    """The previous path: one connection, 1 KiB chunks, a progress update per chunk."""
+    progress_updates = 0
+    response = requests.get(url, stream=True, timeout=30)
+    response.raise_for_status()
+    total_size = int(response.headers.get("content-length", 0))
+    downloaded_size = 0
+    with open(save_path, "wb") as file:
+        for chunk in response.iter_content(1024):
+            if chunk:
+                file.write(chunk)
+                downloaded_size += len(chunk)
+                int((downloaded_size / total_size) * 100)
+                progress_updates += 1
+    return progress_updates
+
+
+def timed(label, size, function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    updates = f"{result} progress updates" if result is not None else ""
+    print(f"{label:<28} {elapsed:7.2f} s  {size / elapsed / 1e6:8.1f} MB/s  {updates}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--rate-mb", type=float, default=16, help="Per-connection cap in MB/s (0 = none)")
+    parser.add_argument("--segments", type=int, default=4)
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_mb * 1024 * 1024)
+    expected = hashlib.sha256(payload).hexdigest()
+    rate = args.rate_mb * 1e6
+    work_dir = tempfile.mkdtemp(prefix="foxbr_download_")
+    save_path = os.path.join(work_dir, "FoxBr.zip")
+
+    def check():
+        with open(save_path, "rb") as file:
+            assert hashlib.sha256(file.read()).hexdigest() == expected, "Downloaded file is corrupt"
+        os.remove(save_path)
+
+    try:
+        server, url = start_server(payload, rate)
+
+        timed("Single connection, 1 KiB", len(payload), lambda: legacy_download(url, save_path))
+        check()
+
+        def segmented():
+            updates = []
+            SegmentedDownloader(url, save_path, args.segments, lambda *_: updates.append(1)).run()
+            return len(updates)
+        timed(f"Segmented x{args.segments}", len(payload), segmented)
+        check()
+
+        # Interrupt halfway, then resume from the persisted state
+        downloader = SegmentedDownloader(url, save_path, args.segments)
+        downloader.progress_callback = lambda done, total: done > total // 2 and downloader.cancel()
+        try:
+            downloader.run()
+        except DownloadCanceled:
+            pass
+        resumed = SegmentedDownloader(url, save_path, args.segments)
+        timed("Resumed after cancel", len(payload), lambda: resumed.run() and None)
+        print(f"{'':<28} resumed from {resumed.resumed_bytes / len(payload):.0%}")
+        check()
+        server.shutdown()
+
+        server, url = start_server(payload, rate, ranges=False)
+        timed("No range support fallback", len(payload),
+              lambda: SegmentedDownloader(url, save_path, args.segments).run() and None)
+        check()
+        server.shutdown()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Download manager throughput, queue limits, rate limiting and resume after a restart.
+
+Serves generated files over loopback with HTTP Range support, under two host
+names (127.0.0.1 and localhost) so the per-host limit is exercised, then:
+downloads a batch and reports throughput and the peak number of concurrent
+downloads overall and per host; downloads one file under a rate limit and
+reports the speed achieved; pauses a download, discards the manager as a
+restart would, resumes it from a new one and checks the file.
+
+    python benchmarks/bench_downloads.py [--files 8] [--size-mb 8] [--rate-mb 4]
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import functools
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication
+from download_manager import DownloadManager, DONE, PAUSED, ACTIVE
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """Static files with single-range support, enough for the segmented engine."""
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+        if match is None or not os.path.isfile(path):
+            return super().send_head()
+        size = os.path.getsize(path)
+        start = int(match.group(1))
+        end = min(int(match.group(2) or size - 1), size - 1)
+        source = open(path, "rb")
+        source.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", f'"{size}-{int(os.path.getmtime(path))}"')
+        self.end_headers()
+        self.range_remaining = end - start + 1
+        return source
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "range_remaining", None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            data = source.read(min(256 * 1024, remaining))
+            if not data:
+                break
+            outputfile.write(data)
+            remaining -= len(data)
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # Pausing a download drops its connections mid-response
+
+
+def wait_for(app, condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for downloads")
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--rate-mb", type=float, default=4.0, help="Bandwidth limit for the rate test, in MB/s")
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv)
+
+    work_dir = tempfile.mkdtemp(prefix="foxbr_downloads_")
+    served = os.path.join(work_dir, "served")
+    os.makedirs(served)
+    size = args.size_mb * 1024 * 1024
+    for index in range(args.files):
+        with open(os.path.join(served, f"file_{index}.bin"), "wb") as f:
+            f.write(os.urandom(size))
+    with open(os.path.join(served, "large.bin"), "wb") as f:
+        f.write(os.urandom(size * 4))
+    expected = {name: file_hash(os.path.join(served, name)) for name in os.listdir(served)}
+
+    server = QuietServer(("127.0.0.1", 0), functools.partial(RangeHandler, directory=served))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    hosts = [f"http://127.0.0.1:{port}", f"http://localhost:{port}"]
+
+    try:
+        # Batch: queue ordering and concurrency limits
+        target = os.path.join(work_dir, "batch")
+        os.makedirs(target)
+        manager = DownloadManager(directory=target, state_path=os.path.join(work_dir, "batch.json"))
+        start = time.perf_counter()
+        downloads = [
+            manager.add(f"{hosts[index % 2]}/file_{index}.bin") for index in range(args.files)
+        ]
+        wait_for(app, lambda: all(d.state == DONE for d in downloads), timeout=120)
+        elapsed = time.perf_counter() - start
+        assert all(file_hash(d.path) == expected[d.file_name] for d in downloads)
+        stats = manager.stats()
+        print(f"Batch       {args.files} x {args.size_mb} MB in {elapsed:.2f} s  "
+              f"({args.files * size / elapsed / 1e6:.0f} MB/s)  peak active {stats['peak_active']} "
+              f"of {manager.max_active}, peak per host {stats['peak_per_host']} of {manager.max_per_host}")
+        manager.close()
+
+        # One download under a bandwidth limit
+        target = os.path.join(work_dir, "limited")
+        os.makedirs(target)
+        manager = DownloadManager(directory=target, state_path=os.path.join(work_dir, "limited.json"))
+        manager.set_rate_limit(int(args.rate_mb * 1024 * 1024))
+        start = time.perf_counter()
+        download = manager.add(f"{hosts[0]}/file_0.bin")
+        wait_for(app, lambda: download.state == DONE, timeout=120)
+        elapsed = time.perf_counter() - start
+        print(f"Rate limit  {args.rate_mb:.1f} MB/s set, {size / elapsed / 1024 / 1024:.2f} MB/s achieved")
+        manager.close()
+
+        # Pause, restart, resume
+        target = os.path.join(work_dir, "resumed")
+        os.makedirs(target)
+        state_path = os.path.join(work_dir, "resumed.json")
+        manager = DownloadManager(directory=target, state_path=state_path)
+        manager.set_rate_limit(int(args.rate_mb * 1024 * 1024))
+        download = manager.add(f"{hosts[0]}/large.bin")
+        wait_for(app, lambda: download.state == ACTIVE and download.received > size, timeout=60)
+        manager.pause(download.id)
+        wait_for(app, lambda: download.state == PAUSED, timeout=30)
+        before = manager.bytes_received
+        manager.close()
+        del manager
+
+        manager = DownloadManager(directory=target, state_path=state_path)
+        download = next(iter(manager.downloads.values()))
+        start = time.perf_counter()
+        manager.resume(download.id)
+        wait_for(app, lambda: manager.downloads[download.id].state == DONE, timeout=120)
+        elapsed = time.perf_counter() - start
+        ok = file_hash(download.path) == expected["large.bin"]
+        print(f"Resume      {before / 1e6:.1f} MB before the restart, {manager.bytes_received / 1e6:.1f} MB after "
+              f"({size * 4 / 1e6:.1f} MB file) in {elapsed:.2f} s, file {'intact' if ok else 'CORRUPT'}")
+        manager.close()
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Omnibox suggestion latency over a large synthetic history.
+
+Loads a history index with synthetic entries and times a query for every
+keystroke of a set of typed strings, the way the omnibox asks for them.
+With --store, the entries are written to SQLite first and loaded the way
+HistoryService does: only the top --capacity by frecency go into memory,
+and queries the index can't fill also search the rest in SQLite.
+
+    python benchmarks/bench_history.py [--entries 1000000] [--limit 8] [--store] [--capacity 50000]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import resource
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryIndex, HistoryService, normalize_url
+
+WORDS = (
+    "python docs news weather mail maps video music shop cloud game learn "
+    "rust linux qt browser release guide forum photo travel recipe code"
+).split()
+TYPED = ["github.com/rust", "google.com/search", "python docs", "wea", "https://www.exa", "zzz not there"]
+
+
+def synthetic_rows(count, seed=0):
+    rng = random.Random(seed)
+    hosts = [f"{rng.choice(WORDS)}{index}.example.com" for index in range(count // 50 or 1)]
+    hosts += ["github.com", "google.com", "docs.python.org"]
+    now = time.time()
+    for index in range(count):
+        host = rng.choice(hosts)
+        path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        url = f"https://www.{host}/{path}/{index}" if index % 3 else f"https://{host}/{path}?q={index}"
+        title = " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 5)))
+        yield url, title, rng.randint(1, 40), now - rng.random() * 180 * 86400
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=8)
+
+    parser.add_argument("--store", action="store_true", help="Load from SQLite with a capped index")
+    parser.add_argument("--capacity", type=int, default=50000)
+    args = parser.parse_args()
+
+    service = connection = None
+    if args.store:
+        path = os.path.join(tempfile.mkdtemp(prefix="foxbr_history_"), "history.sqlite")
+        with sqlite3.connect(path) as connection:
+            connection.execute("CREATE TABLE history (url TEXT PRIMARY KEY, title TEXT, visit_count INTEGER, "
+                               "last_visit REAL, key TEXT)")
+            connection.executemany("INSERT OR IGNORE INTO history VALUES (?, ?, ?, ?, ?)",
+                                   (row + (normalize_url(row[0]),) for row in synthetic_rows(args.entries)))
+        connection.close()
+        start = time.perf_counter()
+        service = HistoryService(path=path, load_delay=0, index_capacity=args.capacity)
+        while not service.loaded:
+            time.sleep(0.01)
+        service.close()
+        print(f"First open, building the word index: {time.perf_counter() - start:.1f} s")
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        service = HistoryService(path=path, load_delay=0, index_capacity=args.capacity)
+        while not service.loaded:
+            time.sleep(0.01)
+        load_time = time.perf_counter() - start
+        index = service.index
+        connection = sqlite3.connect(path)
+        print(f"Loaded {len(index):,} of {args.entries:,} entries from SQLite in {load_time:.1f} s "
+              f"(peak RSS +{max_rss_mb() - rss_before:.0f} MB)")
+    else:
+        rss_before = max_rss_mb()
+        index = HistoryIndex()
+        start = time.perf_counter()
+        index.load(synthetic_rows(args.entries))
+        load_time = time.perf_counter() - start
+        print(f"Loaded {len(index):,} entries in {load_time:.1f} s (peak RSS +{max_rss_mb() - rss_before:.0f} MB)")
+
+    latencies = []
+    tail_latencies = []
+    for typed in TYPED:
+        for length in range(1, len(typed) + 1):
+            start = time.perf_counter()
+            found = index.query(typed[:length], args.limit)
+            latencies.append(time.perf_counter() - start)
+            if service is not None and len(found) < args.limit:
+                start = time.perf_counter()
+                service._suggest_from_store(connection, typed[:length], [])
+                tail_latencies.append(time.perf_counter() - start)
+        print(f"  {typed!r:24} -> {[url for url, _ in index.query(typed, 3)]}")
+
+    start = time.perf_counter()
+    for visit in range(1000):
+        index.add_visit(f"https://new{visit}.example.org/page", "New Page")
+    visit_time = (time.perf_counter() - start) / 1000
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"Keystrokes: {len(latencies)}  p50 {percentile(0.5):.3f} ms  p95 {percentile(0.95):.3f} ms  "
+          f"max {latencies[-1] * 1000:.3f} ms")
+    print(f"New visit: {visit_time * 1000:.3f} ms")
+    if tail_latencies:
+        tail_latencies.sort()
+        print(f"SQLite fallback: {len(tail_latencies)} keystrokes  p50 "
+              f"{tail_latencies[len(tail_latencies) // 2] * 1000:.1f} ms  max {tail_latencies[-1] * 1000:.1f} ms")
+    if service is not None:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
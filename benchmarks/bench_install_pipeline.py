@@ -0,0 +1,83 @@
+"""Overlapped download + verify + extract against a local HTTP server.
+
+Compares the previous sequence (download, then extractall on the calling
+thread) with InstallPipeline, which hashes and extracts while the archive
+is still arriving.
+
+    python benchmarks/bench_install_pipeline.py [--files 400] [--file-kb 256] [--rate-mb 16]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import hashlib
+import zipfile
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_download import start_server
+from download_engine import SegmentedDownloader
+from install_pipeline import InstallPipeline
+
+
+def build_archive(files, file_size):
+    """A release-like ZIP of compressible files, returned as bytes."""
+    path = tempfile.mktemp(suffix=".zip")
+    rng = random.Random(0)
+    words = [bytes(rng.choices(b"abcdefghijklmnopqrstuvwxyz", k=8)) for _ in range(512)]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index in range(files):
+            data = b" ".join(rng.choices(words, k=file_size // 9))
+            archive.writestr(f"lib/module_{index}.pyd", data)
+    with open(path, "rb") as file:
+        payload = file.read()
+    os.remove(path)
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--file-kb", type=int, default=256)
+    parser.add_argument("--rate-mb", type=float, default=16, help="Per-connection cap in MB/s (0 = none)")
+    args = parser.parse_args()
+
+    payload = build_archive(args.files, args.file_kb * 1024)
+    expected = hashlib.sha256(payload).hexdigest()
+    server, url = start_server(payload, args.rate_mb * 1e6)
+    work_dir = tempfile.mkdtemp(prefix="foxbr_install_")
+    print(f"Archive: {len(payload) / 1e6:.1f} MB, {args.files} files")
+
+    try:
+        install_path = os.path.join(work_dir, "sequential")
+        os.makedirs(install_path)
+        zip_path = os.path.join(install_path, "FoxBr.zip")
+        start = time.perf_counter()
+        SegmentedDownloader(url, zip_path).run()
+        downloaded = time.perf_counter()
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            zip_ref.extractall(install_path)
+        os.remove(zip_path)
+        end = time.perf_counter()
+        print(f"Download then extract:  {end - start:6.2f} s "
+              f"(download {downloaded - start:.2f} s, extract {end - downloaded:.2f} s)")
+
+        install_path = os.path.join(work_dir, "pipeline")
+        os.makedirs(install_path)
+        pipeline = InstallPipeline(url, os.path.join(install_path, "FoxBr.zip"), install_path, expected_sha256=expected)
+        start = time.perf_counter()
+        installed = pipeline.run()
+        end = time.perf_counter()
+        print(f"Install pipeline:       {end - start:6.2f} s "
+              f"(download+extract {pipeline.timings['download_and_extract']:.2f} s, "
+              f"swap {pipeline.timings['swap']:.2f} s, {len(installed)} files, hash verified)")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""New-tab latency with the warm web view pool on and off.
+
+Opens tabs against a local file:// page and times add_new_tab, letting the
+pool refill in idle time between tabs as it would between user actions.
+
+    python benchmarks/bench_new_tab.py [--tabs 30] [--pool-size 2]
+"""
+import os
+import time
+import argparse
+import tempfile
+import statistics
+
+from qt_harness import make_browser, close_browser, wait_until, process_events
+from PyQt5.QtCore import QUrl
+
+
+def measure(pool_size, tabs, url):
+    window = make_browser(view_pool_size=pool_size)
+    timings = []
+    for _ in range(tabs):
+        wait_until(lambda: len(window.view_pool.views) >= pool_size, timeout=5)
+        start = time.perf_counter()
+        window.add_new_tab(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        process_events(0.05)
+    stats = window.view_pool.stats()
+    close_browser(window)
+    return timings, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=30)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    page = os.path.join(tempfile.mkdtemp(), "page.html")
+    with open(page, "w") as file:
+        file.write("<html><head><title>Bench</title></head><body><p>FoxBr</p></body></html>")
+    url = QUrl.fromLocalFile(page).toString()
+
+    for label, pool_size in (("Pool off", 0), (f"Pool on ({args.pool_size})", args.pool_size)):
+        timings, stats = measure(pool_size, args.tabs, url)
+        print(f"{label:<14} median {statistics.median(timings):7.2f} ms  "
+              f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:7.2f} ms  "
+              f"hits {stats['hits']} misses {stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
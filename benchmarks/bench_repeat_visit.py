@@ -0,0 +1,150 @@
+"""Repeat-visit load times with the shared profile's disk cache, within a run and after a restart.
+
+A local server serves a page with a large script, a stylesheet and images,
+all cacheable, adding a fixed delay per request to stand in for the
+network. Each run is a separate browser process on the same data
+directory: it loads the page once, then again after leaving it. The first
+run starts with an empty cache; the second shows what survives a restart.
+The same runs with the HTTP cache off give the baseline.
+
+    python benchmarks/bench_repeat_visit.py [--visits 5] [--latency-ms 40] [--images 12] [--script-kb 512]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+CHILD_FLAG = "--child"
+
+
+class CachingHandler(SimpleHTTPRequestHandler):
+    """Static files with a one-hour max-age, after a fixed delay; counts what it serves."""
+
+    delay = 0.0
+    counter = None
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "max-age=3600")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        with self.counter["lock"]:
+            self.counter["requests"] += 1
+        super().do_GET()
+
+
+def make_site(images, script_kb):
+    directory = tempfile.mkdtemp(prefix="foxbr_site_")
+    functions = "".join(f"function f{n}(x){{return x*{n}+{n % 7};}}\n" for n in range(script_kb * 1024 // 40))
+    with open(os.path.join(directory, "app.js"), "w") as file:
+        file.write(functions + "document.title = 'Loaded ' + f1(1);\n")
+    with open(os.path.join(directory, "style.css"), "w") as file:
+        file.write("".join(f".c{n}{{color:#{n * 4099 % 0xffffff:06x}}}\n" for n in range(2000)))
+    for n in range(images):
+        with open(os.path.join(directory, f"image_{n}.bmp"), "wb") as file:
+            width = height = 64
+            pixels = bytes((n * 17 + i) % 256 for i in range(width * height * 3))
+            header = b"BM" + (54 + len(pixels)).to_bytes(4, "little") + b"\0\0\0\0" + (54).to_bytes(4, "little")
+            info = (40).to_bytes(4, "little") + width.to_bytes(4, "little") + height.to_bytes(4, "little")
+            info += (1).to_bytes(2, "little") + (24).to_bytes(2, "little") + b"\0" * 24
+            file.write(header + info + pixels)
+    tags = "".join(f"<img src='image_{n}.bmp'>" for n in range(images))
+    with open(os.path.join(directory, "index.html"), "w") as file:
+        file.write(f"<html><head><title>Site</title><link rel='stylesheet' href='style.css'>"
+                   f"<script src='app.js'></script></head><body>{tags}</body></html>")
+    return directory
+
+
+def serve(directory, latency):
+    counter = {"requests": 0, "lock": threading.Lock()}
+    handler = type("Handler", (CachingHandler,), {"delay": latency, "counter": counter})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counter
+
+
+def run_child(data_dir, url, visits, cache_type):
+    """One browser process: load the page a number of times; prints the load times as JSON."""
+    from qt_harness import wait_until  # Qt and the web engine are only loaded in the browser processes
+    os.environ["LOCALAPPDATA"] = data_dir  # Share the cache with the other runs
+    from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+    from PyQt5.QtCore import QUrl
+    from browser_profile import shared_profile
+
+    profile = shared_profile()
+    profile.set_http_cache(cache_type=cache_type)
+    view = QWebEngineView()
+    view.setPage(QWebEnginePage(profile.engine_profile, view))
+    view.resize(1280, 800)
+    view.show()
+    finished = []
+    view.loadFinished.connect(finished.append)
+
+    timings = []
+    for _ in range(visits):
+        for target in ("about:blank", url):
+            finished.clear()
+            start = time.perf_counter()
+            view.setUrl(QUrl(target))
+            wait_until(lambda: finished, timeout=30)
+        timings.append((time.perf_counter() - start) * 1000)
+    stats = profile.stats()
+    view.close()
+    print(json.dumps({"timings": timings, "http_cache_bytes": stats["http_cache_bytes"],
+                      "code_cache_bytes": stats["code_cache_bytes"]}))
+
+
+def run(data_dir, url, visits, cache_type, counter):
+    before = counter["requests"]
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), CHILD_FLAG, data_dir, url, str(visits), cache_type],
+        capture_output=True, text=True, timeout=600,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["requests"] = counter["requests"] - before
+    return result
+
+
+def report(label, result):
+    first, repeats = result["timings"][0], result["timings"][1:]
+    print(f"{label:<22} first {first:7.1f} ms  repeat median {statistics.median(repeats):7.1f} ms  "
+          f"{result['requests']:3d} requests  HTTP cache {result['http_cache_bytes'] / 1024:7.0f} KiB  "
+          f"code cache {result['code_cache_bytes'] / 1024:5.0f} KiB")
+
+
+def main():
+    if CHILD_FLAG in sys.argv:
+        index = sys.argv.index(CHILD_FLAG)
+        data_dir, url, visits, cache_type = sys.argv[index + 1:index + 5]
+        run_child(data_dir, url, int(visits), cache_type)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--visits", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--script-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    server, counter = serve(make_site(args.images, args.script_kb), args.latency_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    for cache_type in ("none", "disk"):
+        data_dir = tempfile.mkdtemp(prefix="foxbr_bench_")
+        report(f"{cache_type}: first run", run(data_dir, url, args.visits, cache_type, counter))
+        report(f"{cache_type}: after restart", run(data_dir, url, args.visits, cache_type, counter))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
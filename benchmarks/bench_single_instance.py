@@ -0,0 +1,87 @@
+"""Launch-to-tab latency: forwarding to a running browser against a cold start.
+
+Warm: a browser window runs in this process with the single-instance server;
+each run launches `browser.pyw URL` as a new process and times until the
+running window has a tab showing that page. Cold: each run launches
+`browser.pyw --new-instance --startup-trace URL` with its own data directory
+and times until it reports the first page load.
+
+    python benchmarks/bench_single_instance.py [--runs 5]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from qt_harness import make_browser, close_browser, make_pages, serve_directory, wait_until
+from single_instance import InstanceServer
+
+BROWSER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "browser.pyw")
+
+
+def warm_launches(urls):
+    window = make_browser()
+    server = InstanceServer()
+    server.launch_requested.connect(window.on_launch_requested)
+    timings = []
+    for index, url in enumerate(urls):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, BROWSER_SCRIPT, url])
+        loaded = wait_until(
+            lambda: window.tabs.active_tab is not None and window.tabs.active_tab.browser is not None
+            and window.tabs.active_tab.browser.title() == f"Page {index}",
+            timeout=30,
+        )
+        if loaded:
+            timings.append((time.perf_counter() - start) * 1000)
+        process.wait(timeout=10)
+    server.close()
+    close_browser(window)
+    return timings
+
+
+def cold_launches(urls):
+    timings = []
+    for url in urls:
+        env = dict(os.environ, LOCALAPPDATA=tempfile.mkdtemp(prefix="foxbr_bench_"))
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, BROWSER_SCRIPT, "--new-instance", "--startup-trace", url],
+            env=env, stderr=subprocess.PIPE, text=True,
+        )
+        for line in process.stderr:
+            if "first page load" in line:
+                timings.append((time.perf_counter() - start) * 1000)
+                break
+        process.kill()
+        process.wait()
+    return timings
+
+
+def report(label, timings):
+    if timings:
+        print(f"{label:<28} median {statistics.median(timings):8.1f} ms  min {min(timings):8.1f} ms  "
+              f"max {max(timings):8.1f} ms  ({len(timings)} runs)")
+    else:
+        print(f"{label:<28} no successful runs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = serve_directory(make_pages(args.runs))
+    port = server.server_address[1]
+    urls = [f"http://127.0.0.1:{port}/page_{index}.html" for index in range(args.runs)]
+
+    report("Forwarded to running browser", warm_launches(urls))
+    report("Cold start", cold_launches(urls))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Enter-to-page latency with omnibox speculation on and off, against a slow local server.
+
+Visits a few pages served over loopback with added latency so they are in
+history, then types each page's address one character at a time, presses
+Enter, and times until the tab shows the loaded page.
+
+    python benchmarks/bench_speculation.py [--pages 5] [--delay 0.3] [--keystroke 0.12]
+"""
+import time
+import argparse
+import threading
+import functools
+import statistics
+from http.server import ThreadingHTTPServer
+
+from qt_harness import make_browser, close_browser, make_pages, wait_until, process_events, QuietHandler
+
+
+class SlowHandler(QuietHandler):
+    delay = 0.3
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        super().do_GET()
+
+
+def start_slow_server(directory, delay):
+    handler = functools.partial(type("Handler", (SlowHandler,), {"delay": delay}), directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(enabled, urls, keystroke):
+    window = make_browser()
+    window.speculation.enabled = enabled
+    for index, url in enumerate(urls):
+        window.history.record_visit(url, f"Page {index}")
+    wait_until(lambda: window.history.loaded, timeout=10)
+
+    timings = []
+    for index, url in enumerate(urls):
+        typed = url.split("://", 1)[1]
+        window.toolbar.url_field.setFocus()
+        for length in range(1, len(typed) + 1):
+            window.toolbar.url_field.setText(typed[:length])
+            window.on_url_text_edited(typed[:length])
+            process_events(keystroke)
+
+        start = time.perf_counter()
+        window.on_url_entered()
+        # The active tab's view may have been replaced by the preloaded one
+        wait_until(lambda: window.tabs.active_tab.browser.title() == f"Page {index}", timeout=10)
+        timings.append((time.perf_counter() - start) * 1000)
+    stats = window.speculation.stats()
+    close_browser(window)
+    return timings, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.3, help="Server latency per request, in seconds")
+    parser.add_argument("--keystroke", type=float, default=0.12, help="Seconds between typed characters")
+    args = parser.parse_args()
+
+    server = start_slow_server(make_pages(args.pages), args.delay)
+    port = server.server_address[1]
+    urls = [f"http://127.0.0.1:{port}/page_{index}.html" for index in range(args.pages)]
+
+    for label, enabled in (("Speculation off", False), ("Speculation on", True)):
+        timings, stats = measure(enabled, urls, args.keystroke)
+        print(f"{label:<16} median {statistics.median(timings):7.1f} ms  max {max(timings):7.1f} ms  {stats}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
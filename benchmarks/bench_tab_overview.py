@@ -0,0 +1,91 @@
+"""Thumbnail capture cost, cache memory and tab overview open time with many tabs.
+
+Captures a page-sized widget once per tab (a QTextBrowser standing in for
+QWebEngineView, whose grab is GPU-backed and varies by driver), waits for the
+worker thread to encode every thumbnail, then times opening the overview
+grid until its first paint. Half of the tabs are captured, the rest get the
+placeholder, as tabs restored from a session but never shown would.
+
+    python benchmarks/bench_tab_overview.py [--tabs 500] [--budget-mb 8]
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QTextBrowser
+from PyQt5.QtCore import QUrl
+
+app = QApplication.instance() or QApplication(sys.argv[:1])
+
+from tab_model import Tab, TabModel
+from thumbnail_cache import ThumbnailCache
+from tab_overview import TabOverview
+
+
+def page_html(index):
+    paragraphs = "".join(f"<p>Paragraph {n} of page {index}. " + "Lorem ipsum dolor sit amet. " * 12 + "</p>"
+                         for n in range(12))
+    return f"<h1 style='color:#{index * 2654435761 % 0xffffff:06x}'>Page {index}</h1>{paragraphs}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=500)
+    parser.add_argument("--budget-mb", type=float, default=8)
+    args = parser.parse_args()
+
+    tabs = TabModel()
+    for index in range(args.tabs):
+        tabs.append(Tab(QUrl(f"https://example{index}.com/"), f"Page {index}"))
+    thumbnails = ThumbnailCache(byte_budget=int(args.budget_mb * 1024 * 1024))
+
+    page = QTextBrowser()
+    page.resize(1280, 800)
+    page.show()
+    app.processEvents()
+    start = time.perf_counter()
+    for tab in list(tabs)[::2]:
+        page.setHtml(page_html(tab.id))
+        thumbnails.capture(tab.id, page)
+    queued = time.perf_counter() - start
+    while thumbnails.encodes < thumbnails.captures:
+        app.processEvents()
+        time.sleep(0.001)
+    page.hide()
+
+    stats = thumbnails.stats()
+    print(f"Captured {stats['captures']} tabs: grab {stats['mean_capture_ms']:.2f} ms each on the GUI thread, "
+          f"encode {stats['mean_encode_ms']:.2f} ms each on the worker ({queued:.2f} s to queue all)")
+    print(f"Cache: {stats['entries']} thumbnails, {stats['bytes'] / 1024:.0f} KiB of "
+          f"{stats['byte_budget'] / 1024:.0f} KiB budget, {stats['evictions']} evicted, "
+          f"{stats['bytes'] / max(1, stats['entries']) / 1024:.1f} KiB each")
+
+    overview = TabOverview(tabs, thumbnails)
+    overview.resize(1280, 800)
+    for label in ("First open", "Reopen"):
+        start = time.perf_counter()
+        overview.open(tabs.tab_at(args.tabs // 2))
+        overview.show()
+        # Batched layout finishes over a few event loop passes; stop once the visible items are painted
+        decoded, settled = -1, None
+        while True:
+            app.processEvents()
+            count = len(overview.overview_model.decoded)
+            if count != decoded:
+                decoded, settled = count, time.perf_counter()
+            elif time.perf_counter() - settled > 0.1:
+                break
+        elapsed = settled - start
+        print(f"{label:<10} {elapsed * 1000:6.1f} ms for {args.tabs} tabs, "
+              f"{len(overview.overview_model.decoded)} thumbnails decoded")
+        overview.hide()
+        overview.close_overview()
+    thumbnails.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Tab operation and UI hot path benchmarks for the browser shell, headless.
+
+Runs a real WebBrowser offscreen with 1, 50 and 500 tabs open, alternating
+local file:// pages and pages served over loopback, and times add_new_tab,
+close_tab, switch_to_tab, highlight_active_tab, title update storms and
+window drag/resize handling. Each timing covers the call and the event
+loop pass that follows it, so deferred work is included; drag and resize
+steps also flush the per-frame update coalescer that holds their moves.
+
+Results are written as JSON. With --baseline, medians and p95s are compared
+against an earlier run and the exit status is 1 if any operation got
+slower than --threshold allows.
+
+    python benchmarks/bench_tabs.py [--tabs 1 50 500] [--repeat 20]
+        [--output bench_tabs.json] [--baseline old.json] [--threshold 0.25]
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+from qt_harness import app, make_browser, close_browser, make_pages, serve_directory, process_events
+from PyQt5.QtCore import Qt, QEvent, QPoint, QUrl
+from PyQt5.QtGui import QMouseEvent
+
+MIN_REGRESSION_MS = 0.05  # Differences below this are noise whatever the ratio
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "count": len(timings),
+        "median_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_ms": timings[-1],
+    }
+
+
+def mouse_move(widget, global_pos):
+    event = QMouseEvent(
+        QEvent.MouseMove, widget.mapFromGlobal(global_pos), global_pos, Qt.NoButton, Qt.LeftButton, Qt.NoModifier
+    )
+    app.sendEvent(widget, event)
+
+
+def run_size(tab_count, urls, repeat, rng):
+    window = make_browser()
+    window.showNormal()
+    window.setGeometry(100, 100, 1280, 800)
+    while len(window.tabs) < tab_count:
+        window.add_new_tab(urls[len(window.tabs) % len(urls)])
+        app.processEvents()
+    process_events(1.0)  # Let the first loads settle
+    results = {}
+
+    def pick_tab():
+        return window.tabs.tab_at(rng.randrange(len(window.tabs)))
+
+    def move_and_apply(widget, global_pos):
+        # Moves and resizes are coalesced to one per frame; time the geometry change, not just the queueing
+        mouse_move(widget, global_pos)
+        window.ui_updates.flush()
+
+    # Open and close a tab at a steady tab count
+    opened, closed = [], []
+    for index in range(repeat):
+        url = urls[index % len(urls)]
+        opened.append(timed(window.add_new_tab, url))
+        closed.append(timed(window.close_tab, window.tabs.tab_at(len(window.tabs) - 1)))
+    results["add_new_tab"] = summarize(opened)
+    results["close_tab"] = summarize(closed)
+
+    results["switch_to_tab"] = summarize([timed(window.switch_to_tab, pick_tab()) for _ in range(repeat * 5)])
+    results["highlight_active_tab"] = summarize(
+        [timed(window.highlight_active_tab, pick_tab()) for _ in range(repeat * 5)]
+    )
+
+    # Title storm: many title changes across live tabs, each followed by one event loop pass
+    live = [tab for tab in window.tabs if tab.browser is not None]
+    storm = [
+        timed(window.update_tab_title, rng.choice(live).browser, f"Title {index}")
+        for index in range(repeat * 50)
+    ]
+    results["title_storm"] = summarize(storm)
+
+    # Drag the window by its title bar
+    title_bar = window.title_bar
+    start = window.frameGeometry().topLeft() + QPoint(400, 10)
+    title_bar.drag_started = False
+    title_bar.initial_click_position = start
+    title_bar.drag_position = start - window.frameGeometry().topLeft()
+    results["window_drag"] = summarize(
+        [timed(move_and_apply, title_bar, start + QPoint(step % 50, step % 30)) for step in range(repeat * 10)]
+    )
+
+    # Resize from the bottom-right corner
+    window.resizing = True
+    window.resize_direction = "bottom-right"
+    window.start_geometry = window.geometry()
+    window.start_position = window.geometry().bottomRight()
+    results["window_resize"] = summarize([
+        timed(move_and_apply, window, window.start_position + QPoint(step % 60, step % 40))
+        for step in range(repeat * 10)
+    ])
+    window.resizing = False
+
+    close_browser(window)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions (size, operation, metric, old, new)."""
+    regressions = []
+    for size, operations in results.items():
+        for operation, metrics in operations.items():
+            old = baseline.get(size, {}).get(operation)
+            if old is None:
+                continue
+            for metric in ("median_ms", "p95_ms"):
+                if metrics[metric] > old[metric] * (1 + threshold) + MIN_REGRESSION_MS:
+                    regressions.append((size, operation, metric, old[metric], metrics[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default="bench_tabs.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    page_dir = make_pages(10)
+    server = serve_directory(page_dir)
+    urls = []
+    for index in range(10):
+        if index % 2:
+            urls.append(f"http://127.0.0.1:{server.server_address[1]}/page_{index}.html")
+        else:
+            urls.append(QUrl.fromLocalFile(f"{page_dir}/page_{index}.html").toString())
+
+    results = {}
+    for tab_count in args.tabs:
+        results[str(tab_count)] = run_size(tab_count, urls, args.repeat, random.Random(args.seed))
+        print(f"{tab_count} tabs")
+        for operation, metrics in results[str(tab_count)].items():
+            print(f"  {operation:<22} median {metrics['median_ms']:8.3f} ms  p95 {metrics['p95_ms']:8.3f} ms  "
+                  f"max {metrics['max_ms']:8.3f} ms")
+    server.shutdown()
+
+    report = {
+        "meta": {"time": time.time(), "python": platform.python_version(), "platform": platform.platform(),
+                 "repeat": args.repeat},
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for size, operation, metric, old, new in regressions:
+            print(f"REGRESSION {size} tabs {operation} {metric}: {old:.3f} ms -> {new:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
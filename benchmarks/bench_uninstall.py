@@ -0,0 +1,96 @@
+"""Uninstall time: the old double os.walk against remove_installation.
+
+Generates an install tree of --files files spread over nested directories,
+then removes it three ways: the previous walk-and-delete loop, a
+remove_installation scan (no install record) and remove_installation
+working from the install record. The three take turns --repeat times on
+freshly written trees and the medians are reported, with the part of each
+remove_installation run spent building its file list.
+
+    python benchmarks/bench_uninstall.py [--files 20000] [--workers 8] [--repeat 7]
+"""
+import os
+import sys
+import time
+import shutil
+import statistics
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from install_pipeline import remove_installation, record_installed_files
+
+
+def make_tree(root, count):
+    """Write count small files, ten to a directory, three directories deep."""
+    installed = []
+    for index in range(count):
+        relative = f"lib/pkg{index // 1000}/mod{index // 10 % 100}/file{index}.dat"
+        path = os.path.join(root, *relative.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * 256)
+        installed.append(relative)
+    return installed
+
+
+def double_walk(root):
+    """The uninstaller's loop before install records: count, then delete."""
+    total = sum(len(files) for _, _, files in os.walk(root))
+    deleted = 0
+    for current, dirs, files in os.walk(root, topdown=False):
+        for name in files:
+            path = os.path.join(current, name)
+            if os.path.exists(path):
+                os.remove(path)
+            deleted += 1
+            int(deleted / total * 100)
+        for name in dirs:
+            path = os.path.join(current, name)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="foxbr_uninstall_")
+    timings = {"Double os.walk": [], "Scan": [], "Install record": []}
+    listing = {"Scan": [], "Install record": []}
+    try:
+        root = os.path.join(work_dir, "FoxBr")
+        for _ in range(args.repeat):
+            make_tree(root, args.files)
+            start = time.perf_counter()
+            double_walk(root)
+            timings["Double os.walk"].append(time.perf_counter() - start)
+
+            make_tree(root, args.files)
+            stats = remove_installation(root, workers=args.workers)
+            timings["Scan"].append(stats["seconds"])
+            listing["Scan"].append(stats["list_seconds"])
+            assert stats["removed"] == args.files and not os.path.exists(root)
+
+            record_installed_files(root, make_tree(root, args.files))
+            stats = remove_installation(root, workers=args.workers)
+            timings["Install record"].append(stats["seconds"])
+            listing["Install record"].append(stats["list_seconds"])
+            assert stats["removed"] == args.files + 1 and not os.path.exists(root)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for label, seconds in timings.items():
+        line = f"{label:<22} median {statistics.median(seconds):6.3f} s  min {min(seconds):6.3f} s  max {max(seconds):6.3f} s"
+        if label in listing:
+            line += f"  listing files {statistics.median(listing[label]) * 1000:5.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
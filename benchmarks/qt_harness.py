@@ -0,0 +1,85 @@
+"""Shared setup for benchmarks that drive a real WebBrowser window headlessly."""
+import os
+import sys
+import time
+import tempfile
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("QTWEBENGINE_CHROMIUM_FLAGS", "--disable-gpu")
+# Keep the benchmark's session, history and caches away from the real profile
+os.environ["LOCALAPPDATA"] = tempfile.mkdtemp(prefix="foxbr_bench_")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # Must be imported before QApplication
+from PyQt5.QtWidgets import QApplication
+from internal_pages import register_internal_scheme
+
+if QApplication.instance() is None:
+    register_internal_scheme()
+app = QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def process_events(duration=0.0):
+    """Run the event loop for roughly duration seconds (at least one pass)."""
+    end = time.perf_counter() + duration
+    while True:
+        app.processEvents()
+        if time.perf_counter() >= end:
+            return
+
+
+def wait_until(predicate, timeout=10.0):
+    """Process events until predicate() is true; returns whether it became true."""
+    end = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() >= end:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def make_pages(count, directory=None):
+    """Write count small HTML pages; returns their directory."""
+    directory = directory or tempfile.mkdtemp(prefix="foxbr_pages_")
+    for index in range(count):
+        with open(os.path.join(directory, f"page_{index}.html"), "w") as file:
+            file.write(f"<html><head><title>Page {index}</title></head><body><p>Page {index}</p></body></html>")
+    return directory
+
+
+def serve_directory(directory):
+    """Serve a directory on a free loopback port; returns the server."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_browser(**kwargs):
+    """Create and show a WebBrowser with an empty session and a fresh data directory."""
+    from web_browser import WebBrowser
+
+    os.environ["LOCALAPPDATA"] = tempfile.mkdtemp(prefix="foxbr_bench_")
+    window = WebBrowser(**kwargs)
+    window.resize(1280, 800)
+    window.show()
+    process_events(0.1)
+    window.start_services()  # As browser.pyw does after first paint
+    return window
+
+
+def close_browser(window):
+    window.close()
+    window.deleteLater()
+    process_events(0.1)
@@ -1,14 +1,29 @@
+import time
+
+START_TIME = time.perf_counter()
+
 import sys
-import subprocess
-import winreg
+from single_instance import forward_to_running_instance, InstanceServer, urls_from_args, NEW_INSTANCE_FLAG
+
+# A browser is already running: hand it the URLs and exit before loading the web engine
+if __name__ == "__main__" and NEW_INSTANCE_FLAG not in sys.argv and forward_to_running_instance(sys.argv[1:]):
+    sys.exit(0)
+
+import threading
 from PyQt5.QtWidgets import QApplication
 from web_browser import WebBrowser
+from startup_trace import StartupTrace
+from internal_pages import register_internal_scheme
+from ui_profiler import UiProfiler
 
 # Define the registry key path
 REGISTRY_KEY_PATH = r"SOFTWARE\FoxTeam\FoxBr"
+STARTUP_TRACE_FLAG = "--startup-trace"
 
 def read_registry_install_path():
     """Retrieve the installation path from the Windows registry."""
+    import winreg  # Only needed once the window is up
+
     try:
         with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, REGISTRY_KEY_PATH) as key:
             install_path, _ = winreg.QueryValueEx(key, "InstallPath")
@@ -23,6 +38,8 @@ def read_registry_install_path():
 
 def run_updater(updater_path):
     """Launch the updater.exe with administrative privileges."""
+    import subprocess  # Only needed once the window is up
+
     try:
         # Run updater.exe with elevated privileges
         subprocess.Popen(
@@ -33,19 +50,51 @@ def run_updater(updater_path):
         print(f"Failed to run updater.exe: {e}")
 
 
-if __name__ == "__main__":
+def check_for_updates():
+    """Launch the updater if a newer version is published; runs on a background thread after first paint."""
+    from update_check import UpdateChecker, read_installed_version  # Only needed once the window is up
+
     # Retrieve the installation path from the registry
     install_path = read_registry_install_path()
 
     if install_path:
+        # Usually answered from the cached check, with no network and no elevation prompt
+        if UpdateChecker().update_available(read_installed_version(install_path)) is None:
+            return
         # Construct the full path to updater.exe
         updater_executable = f"{install_path}\\updater.exe"
         run_updater(updater_executable)
     else:
         print("Updater executable could not be located.")
 
+
+if __name__ == "__main__":
+    trace = StartupTrace(START_TIME, enabled=STARTUP_TRACE_FLAG in sys.argv)
+    new_instance = NEW_INSTANCE_FLAG in sys.argv
+    argv = [arg for arg in sys.argv if arg not in (STARTUP_TRACE_FLAG, NEW_INSTANCE_FLAG)]
+    profiler, argv = UiProfiler.from_argv("browser", argv)  # --profile / --watch-stalls
+    trace.mark("imports")
+
     # Launch the main browser application
-    app = QApplication(sys.argv)
-    window = WebBrowser()
+    register_internal_scheme()  # foxbr:// pages; must precede QApplication
+    app = QApplication(argv)
+    trace.mark("QApplication")
+
+    # Later launches forward their URLs here instead of starting another engine
+    instance_server = None if new_instance else InstanceServer()
+    window = WebBrowser(urls=urls_from_args(argv[1:]))
+    if instance_server is not None:
+        instance_server.launch_requested.connect(window.on_launch_requested)
+    trace.mark("WebBrowser construction")
+    if window.tabs.active_tab is not None and window.tabs.active_tab.browser is not None:
+        trace.watch_page_load(window.tabs.active_tab.browser)
+
+    # The update check waits until the window has been painted
+    trace.first_paint.connect(lambda: threading.Thread(target=check_for_updates, daemon=True).start())
+    # So do history, favicons, content blocking, downloads and the other background services
+    trace.first_paint.connect(window.start_services)
+    trace.watch_first_paint()
     window.showMaximized()  # Start in maximized mode
+    if profiler is not None:
+        profiler.watch(app)
     sys.exit(app.exec_())
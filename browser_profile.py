@@ -0,0 +1,277 @@
+import os
+import html
+import json
+import shutil
+import secrets
+from PyQt5.QtCore import QObject, QCoreApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+from app_paths import data_path
+
+PROFILE_NAME = "FoxBr"
+SETTINGS_FILENAME = "profile.json"
+STORAGE_DIR_NAME = "profile"  # Cookies, local storage, IndexedDB
+CACHE_DIR_NAME = "cache"
+CODE_CACHE_DIR_NAME = "Code Cache"  # Chromium's compiled JavaScript and WebAssembly
+HTTP_CACHE_MB = 256  # Chromium evicts least recently used entries past this
+CODE_CACHE_MB = 64  # Trimmed at startup, before the engine opens it
+HTTP_CACHE_TYPES = {
+    "disk": QWebEngineProfile.DiskHttpCache,
+    "memory": QWebEngineProfile.MemoryHttpCache,
+    "none": QWebEngineProfile.NoCache,
+}
+HTTP_CACHE_SIZE_CHOICES_MB = (64, 128, 256, 512, 1024)
+CODE_CACHE_SIZE_CHOICES_MB = (16, 32, 64, 128, 256)
+DEFAULT_SETTINGS = {"http_cache_type": "disk", "http_cache_mb": HTTP_CACHE_MB, "code_cache_mb": CODE_CACHE_MB}
+MB = 1024 * 1024
+
+_profile = None
+
+
+def shared_profile():
+    """Return the process-wide browser profile that every tab, preload and download uses."""
+    global _profile
+    if _profile is None:
+        _profile = BrowserProfile()
+    return _profile
+
+
+def directory_usage(path, skip_names=()):
+    """(bytes, files) under a directory, not descending into directories named in skip_names."""
+    total = files = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0, 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_names:
+                    size, count = directory_usage(entry.path, skip_names)
+                    total += size
+                    files += count
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+                files += 1
+        except OSError:
+            continue
+    return total, files
+
+
+def find_directories(path, name):
+    """Every directory called name under path."""
+    found = []
+    for root, directories, _ in os.walk(path):
+        if name in directories:
+            found.append(os.path.join(root, name))
+            directories.remove(name)
+    return found
+
+
+def trim_directory(path, byte_budget):
+    """Delete least recently written files until a directory fits its budget; returns bytes freed.
+
+    Index files are kept: Chromium treats entries missing from disk as misses
+    and drops them from its index.
+    """
+    entries = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            if name.startswith("index"):
+                continue
+            file_path = os.path.join(root, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    entries.sort()
+    for _, size, file_path in entries:
+        if total - freed <= byte_budget:
+            break
+        try:
+            os.remove(file_path)
+            freed += size
+        except OSError:
+            continue
+    return freed
+
+
+class BrowserProfile(QObject):
+    """The shared, persistent web engine profile and its cache settings.
+
+    Cookies and site storage live under the profile directory and the HTTP
+    and code caches under the cache directory, so both survive restarts.
+    Chromium bounds the HTTP cache itself; the code cache has no size
+    setting in Qt, so it is trimmed to its budget on startup, before the
+    engine opens it. Settings are kept in profile.json and shown, with
+    cache usage, at foxbr://cache.
+
+    The page's links only change settings when they carry the current
+    action token, which is new for every run and after every change. Loading
+    a foxbr://cache URL again, from history or a preload, changes nothing.
+    """
+
+    def __init__(self, parent=None, name=PROFILE_NAME):
+        super().__init__(parent or QCoreApplication.instance())
+        self.settings_path = data_path(SETTINGS_FILENAME)
+        self.settings = self._load()
+        self.storage_path = os.path.dirname(data_path(STORAGE_DIR_NAME, "storage"))
+        self.cache_path = os.path.dirname(data_path(CACHE_DIR_NAME, "cache"))
+        self.action_token = secrets.token_hex(8)
+
+        # Before the engine has the cache open, so nothing is deleted from under it
+        self.code_cache_trimmed = 0
+        if self.settings.pop("clear_code_cache", False):
+            for directory in self.code_cache_directories():
+                shutil.rmtree(directory, ignore_errors=True)
+            self._save()
+        else:
+            for directory in self.code_cache_directories():
+                self.code_cache_trimmed += trim_directory(directory, self.settings["code_cache_mb"] * MB)
+
+        # Outlives every page that uses it; pages must be deleted before their profile
+        self.engine_profile = QWebEngineProfile(name, self.parent())
+        self.engine_profile.setPersistentStoragePath(self.storage_path)
+        self.engine_profile.setCachePath(self.cache_path)
+        self.engine_profile.setPersistentCookiesPolicy(QWebEngineProfile.AllowPersistentCookies)
+        self._apply_http_cache()
+
+    def code_cache_directories(self):
+        """Code cache directories; Qt versions differ in whether they sit under the cache or storage path."""
+        return (find_directories(self.cache_path, CODE_CACHE_DIR_NAME)
+                + find_directories(self.storage_path, CODE_CACHE_DIR_NAME))
+
+    def set_http_cache(self, cache_type=None, size_mb=None):
+        """Change the HTTP cache type or size; takes effect at once and is kept for later runs."""
+        if cache_type is not None and cache_type in HTTP_CACHE_TYPES:
+            self.settings["http_cache_type"] = cache_type
+        if size_mb is not None and size_mb > 0:
+            self.settings["http_cache_mb"] = int(size_mb)
+        self._apply_http_cache()
+        self._save()
+
+    def set_code_cache_size(self, size_mb):
+        """Change the code cache budget; applied when the browser next starts."""
+        if size_mb > 0:
+            self.settings["code_cache_mb"] = int(size_mb)
+            self._save()
+
+    def clear_cache(self):
+        """Drop the HTTP cache now and the code cache on the next start."""
+        self.engine_profile.clearHttpCache()
+        self.settings["clear_code_cache"] = True
+        self._save()
+
+    def stats(self):
+        code_bytes = code_files = 0
+        for directory in self.code_cache_directories():
+            size, count = directory_usage(directory)
+            code_bytes += size
+            code_files += count
+        http_bytes, http_files = directory_usage(self.cache_path, (CODE_CACHE_DIR_NAME,))
+        storage_bytes, _ = directory_usage(self.storage_path, (CODE_CACHE_DIR_NAME,))
+        return {
+            "http_cache_type": self.settings["http_cache_type"],
+            "http_cache_limit": self.settings["http_cache_mb"] * MB,
+            "http_cache_bytes": http_bytes,
+            "http_cache_files": http_files,
+            "code_cache_limit": self.settings["code_cache_mb"] * MB,
+            "code_cache_bytes": code_bytes,
+            "code_cache_files": code_files,
+            "code_cache_trimmed": self.code_cache_trimmed,
+            "storage_bytes": storage_bytes,
+            "cache_path": self.cache_path,
+            "storage_path": self.storage_path,
+        }
+
+    def render_page(self, path):
+        """foxbr://cache handler: usage and settings; /clear, /http/<type|MB> and /code/<MB> change them.
+
+        A change is only made when the path ends with the current action token.
+        """
+        parts = [part for part in path.split("/") if part]
+        notice = ""
+        if len(parts) > 1 and parts[-1] == self.action_token:
+            parts = parts[:-1]
+            self.action_token = secrets.token_hex(8)  # Each link works once
+        elif parts and parts != ["json"]:
+            parts = []
+            notice = "This link has expired, so nothing was changed."
+        if parts == ["clear"]:
+            self.clear_cache()
+            notice = "HTTP cache cleared; the code cache is cleared when FoxBr next starts."
+        elif len(parts) == 2 and parts[0] == "http":
+            if parts[1].isdigit():
+                self.set_http_cache(size_mb=int(parts[1]))
+            else:
+                self.set_http_cache(cache_type=parts[1])
+        elif len(parts) == 2 and parts[0] == "code" and parts[1].isdigit():
+            self.set_code_cache_size(int(parts[1]))
+            notice = "The new code cache size applies when FoxBr next starts."
+        stats = self.stats()
+        if parts == ["json"]:
+            return b"application/json", json.dumps(stats, indent=2).encode("utf-8")
+
+        def choices(prefix, values, current):
+            return " ".join(
+                f"<b>{value}</b>" if str(value) == str(current)
+                else f"<a href='foxbr://cache/{prefix}/{value}/{self.action_token}'>{value}</a>"
+                for value in values
+            )
+
+        def megabytes(size):
+            return f"{size / MB:.1f} MB"
+
+        page = (
+            "<html><head><title>Cache</title><style>"
+            "body{font-family:sans-serif;margin:20px}table{border-collapse:collapse;margin-bottom:24px}"
+            "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}</style></head><body>"
+            "<h1>Cache</h1><p><a href='foxbr://cache/json'>Export as JSON</a> · "
+            f"<a href='foxbr://cache/clear/{self.action_token}'>Clear cache</a></p>"
+            f"<p>{html.escape(notice)}</p>"
+            "<table><tr><th></th><th>Used</th><th>Limit</th><th>Files</th></tr>"
+            f"<tr><td>HTTP cache ({stats['http_cache_type']})</td><td>{megabytes(stats['http_cache_bytes'])}</td>"
+            f"<td>{megabytes(stats['http_cache_limit'])}</td><td>{stats['http_cache_files']}</td></tr>"
+            f"<tr><td>Code cache</td><td>{megabytes(stats['code_cache_bytes'])}</td>"
+            f"<td>{megabytes(stats['code_cache_limit'])}</td><td>{stats['code_cache_files']}</td></tr>"
+            f"<tr><td>Site storage</td><td>{megabytes(stats['storage_bytes'])}</td><td></td><td></td></tr></table>"
+            f"<p>HTTP cache type: {choices('http', HTTP_CACHE_TYPES, stats['http_cache_type'])}</p>"
+            f"<p>HTTP cache size (MB): {choices('http', HTTP_CACHE_SIZE_CHOICES_MB, self.settings['http_cache_mb'])}</p>"
+            f"<p>Code cache size (MB): {choices('code', CODE_CACHE_SIZE_CHOICES_MB, self.settings['code_cache_mb'])}</p>"
+            f"<p>Cache: {html.escape(stats['cache_path'])}<br>Storage: {html.escape(stats['storage_path'])}</p>"
+            "</body></html>"
+        )
+        return b"text/html", page.encode("utf-8")
+
+    def _apply_http_cache(self):
+        self.engine_profile.setHttpCacheType(HTTP_CACHE_TYPES[self.settings["http_cache_type"]])
+        self.engine_profile.setHttpCacheMaximumSize(self.settings["http_cache_mb"] * MB)
+
+    def _load(self):
+        settings = dict(DEFAULT_SETTINGS)
+        try:
+            with open(self.settings_path, "r") as settings_file:
+                saved = json.load(settings_file)
+        except (OSError, ValueError):
+            return settings
+        if not isinstance(saved, dict):
+            return settings
+        if saved.get("http_cache_type") in HTTP_CACHE_TYPES:
+            settings["http_cache_type"] = saved["http_cache_type"]
+        for key in ("http_cache_mb", "code_cache_mb"):
+            if isinstance(saved.get(key), int) and saved[key] > 0:
+                settings[key] = saved[key]
+        if saved.get("clear_code_cache"):
+            settings["clear_code_cache"] = True
+        return settings
+
+    def _save(self):
+        temp_path = self.settings_path + ".tmp"
+        try:
+            with open(temp_path, "w") as settings_file:
+                json.dump(self.settings, settings_file)
+            os.replace(temp_path, self.settings_path)
+        except OSError as e:
+            print(f"[Profile] Failed to save cache settings: {e}")
@@ -0,0 +1,86 @@
+import os
+import glob
+import time
+import threading
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+from app_paths import data_path
+from filter_lists import compile_filter_lists, FilterMatcher
+
+FILTERS_DIR_NAME = "filters"  # Adblock Plus format lists (*.txt), e.g. EasyList
+COMPILED_DIR_NAME = "filters_compiled"
+
+RESOURCE_TYPE_NAMES = {
+    QWebEngineUrlRequestInfo.ResourceTypeSubFrame: "subdocument",
+    QWebEngineUrlRequestInfo.ResourceTypeScript: "script",
+    QWebEngineUrlRequestInfo.ResourceTypeImage: "image",
+    QWebEngineUrlRequestInfo.ResourceTypeFavicon: "image",
+    QWebEngineUrlRequestInfo.ResourceTypeStylesheet: "stylesheet",
+    QWebEngineUrlRequestInfo.ResourceTypeObject: "object",
+    QWebEngineUrlRequestInfo.ResourceTypePluginResource: "object",
+    QWebEngineUrlRequestInfo.ResourceTypeXhr: "xmlhttprequest",
+    QWebEngineUrlRequestInfo.ResourceTypePing: "ping",
+    QWebEngineUrlRequestInfo.ResourceTypeCspReport: "ping",
+    QWebEngineUrlRequestInfo.ResourceTypeMedia: "media",
+    QWebEngineUrlRequestInfo.ResourceTypeFontResource: "font",
+}
+
+
+class ContentBlocker(QWebEngineUrlRequestInterceptor):
+    """Block ad and tracker requests using the filter lists in the data directory.
+
+    Lists are compiled (or their cached compilation is mapped) on a
+    background thread; requests pass unfiltered until that is done.
+    interceptRequest runs on the web engine's IO thread.
+    """
+
+    def __init__(self, parent=None, filter_paths=None):
+        super().__init__(parent)
+        self.matcher = None
+        self.checked = 0
+        self.blocked = 0
+        self.decision_seconds = 0.0
+        self.blocked_by_page = {}  # First-party host -> blocked requests
+
+        if filter_paths is None:
+            filter_paths = sorted(glob.glob(os.path.join(data_path(FILTERS_DIR_NAME, ""), "*.txt")))
+        if filter_paths:
+            threading.Thread(target=self._load, args=(filter_paths,), name="FilterLists", daemon=True).start()
+
+    def install(self, profile):
+        profile.setUrlRequestInterceptor(self)
+
+    def interceptRequest(self, info):
+        matcher = self.matcher
+        resource_type = info.resourceType()
+        if matcher is None or resource_type == QWebEngineUrlRequestInfo.ResourceTypeMainFrame:
+            return  # Never block the page itself
+
+        start = time.perf_counter()
+        url = info.requestUrl()
+        page_host = info.firstPartyUrl().host()
+        blocked = matcher.should_block(
+            url.toString(), url.host(), page_host, RESOURCE_TYPE_NAMES.get(resource_type, "other")
+        )
+        self.decision_seconds += time.perf_counter() - start
+        self.checked += 1
+        if blocked:
+            info.block(True)
+            self.blocked += 1
+            self.blocked_by_page[page_host] = self.blocked_by_page.get(page_host, 0) + 1
+
+    def stats(self):
+        stats = {
+            "checked": self.checked,
+            "blocked": self.blocked,
+            "mean_decision_us": self.decision_seconds / self.checked * 1e6 if self.checked else 0.0,
+            "blocked_by_page": dict(self.blocked_by_page),
+        }
+        if self.matcher is not None:
+            stats.update(self.matcher.stats())
+        return stats
+
+    def _load(self, filter_paths):
+        try:
+            self.matcher = FilterMatcher(compile_filter_lists(filter_paths, data_path(COMPILED_DIR_NAME, "")))
+        except (OSError, ValueError) as e:
+            print(f"Failed to load filter lists: {e}")
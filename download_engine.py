@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+SEGMENT_COUNT = 4  # Parallel HTTP Range requests
+MIN_SEGMENT_SIZE = 1024 * 1024  # Files smaller than this are not split
+TAIL_SEGMENT_SIZE = 256 * 1024  # Fetched separately so a ZIP's central directory arrives early
+BUFFER_SIZE = 1024 * 1024  # Read size per network read and file write
+PROGRESS_INTERVAL = 0.1  # Seconds between progress reports
+STATE_SAVE_INTERVAL = 1.0  # Seconds between writes of the resume state
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+
+class DownloadCanceled(Exception):
+    """Raised when a download is canceled; the partial state is kept for resuming."""
+
+
+class RangeNotSupported(Exception):
+    """The server ignored a Range request."""
+
+
+class SegmentedDownloader:
+    """Download a file over parallel HTTP Range segments, resumable across runs.
+
+    Data goes into a preallocated "<save_path>.part" file and the progress of
+    every segment is persisted to "<save_path>.part.json", so an interrupted
+    download continues where it stopped. Servers without range support get a
+    single streamed request instead. progress_callback(downloaded, total) is
+    called at most once per progress_interval seconds, from worker threads;
+    chunk_callback(offset, data) is called for every chunk written, before
+    available_until() and the counters include it. With finalize=False the data is left in the .part file for the caller.
+    headers are sent with every request.
+    """
+
+    def __init__(self, url, save_path, segments=SEGMENT_COUNT, progress_callback=None,
+                 progress_interval=PROGRESS_INTERVAL, session=None, chunk_callback=None, finalize=True,
+                 headers=None):
+        self.url = url
+        self.save_path = save_path
+        self.part_path = save_path + PART_SUFFIX
+        self.state_path = save_path + STATE_SUFFIX
+        self.segment_count = max(1, segments)
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.session = session or requests.Session()
+        self.chunk_callback = chunk_callback
+        self.finalize = finalize
+        self.headers = headers or {}
+
+        self.lock = threading.Lock()
+        self.canceled = threading.Event()
+        self.failed = threading.Event()  # Set when any segment fails, stopping the others
+        self.validator = None
+        self.total_size = 0
+        self.downloaded = 0
+        self.segments = []  # [start, end (inclusive), bytes done]
+        self.last_report = 0.0
+        self.last_state_save = 0.0
+        self.resumed_bytes = 0
+
+    def cancel(self):
+        """Stop the download; the partial file can be resumed later."""
+        self.canceled.set()
+
+    def discard_partial(self):
+        """Remove the partial file and its resume state."""
+        for path in (self.part_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run(self):
+        """Download the file and return its size in bytes."""
+        # Probe with a one-byte range: a 206 answer carries the total size
+        response = self.session.get(self.url, headers={**self.headers, "Range": "bytes=0-0"}, stream=True, timeout=30)
+        response.raise_for_status()
+        final_url = response.url  # Release downloads redirect to a signed URL
+        content_range = response.headers.get("content-range", "")
+        if response.status_code != 206 or "/" not in content_range:
+            return self._run_single(response)
+        response.close()
+
+        size = int(content_range.rsplit("/", 1)[1])
+        validator = response.headers.get("etag") or response.headers.get("last-modified")
+        if size < MIN_SEGMENT_SIZE:
+            return self._run_single(self.session.get(final_url, headers=self.headers, stream=True, timeout=30))
+
+        self.total_size = size
+        if not self._load_state(size, validator):
+            self._plan_segments(size, validator)
+        self.resumed_bytes = self.downloaded
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=len(self.segments)) as executor:
+            futures = [
+                executor.submit(self._fetch_segment, final_url, segment)
+                for segment in self.segments if segment[2] < segment[1] - segment[0] + 1
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+        self._save_state(force=True)
+
+        if errors:
+            # Report the failure that stopped the other segments, not their cancellation
+            errors.sort(key=lambda e: isinstance(e, DownloadCanceled))
+            if isinstance(errors[0], RangeNotSupported):
+                self.discard_partial()
+                return self._run_single(self.session.get(final_url, headers=self.headers, stream=True, timeout=30))
+            raise errors[0]
+
+        if self.finalize:
+            os.replace(self.part_path, self.save_path)
+        os.remove(self.state_path)
+        self._report(force=True)
+        return self.total_size
+
+    def available_until(self, position):
+        """Return the end of the contiguous downloaded data starting at position."""
+        with self.lock:
+            for start, end, done in self.segments:
+                if start <= position <= end:
+                    if position >= start + done:
+                        return position
+                    position = start + done
+                    if position <= end:
+                        return position
+        return position
+
+    def _plan_segments(self, size, validator):
+        """Split the file into equal segments and preallocate the output file."""
+        body_size = size - TAIL_SEGMENT_SIZE
+        segment_size = max(MIN_SEGMENT_SIZE, -(-body_size // self.segment_count))
+        self.segments = [
+            [start, min(start + segment_size, body_size) - 1, 0]
+            for start in range(0, body_size, segment_size)
+        ]
+        self.segments.append([body_size, size - 1, 0])
+        self.validator = validator
+        self.downloaded = 0
+        with open(self.part_path, "wb") as part_file:
+            part_file.truncate(size)
+        self._save_state(force=True)
+
+    def _load_state(self, size, validator):
+        """Resume from a saved state if it still matches the remote file."""
+        try:
+            with open(self.state_path, "r") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return False
+        if (state.get("size") != size or state.get("validator") != validator
+                or not os.path.exists(self.part_path)):
+            return False
+        self.segments = state["segments"]
+        self.validator = validator
+        self.downloaded = sum(segment[2] for segment in self.segments)
+        return True
+
+    def _save_state(self, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_state_save < STATE_SAVE_INTERVAL:
+                return
+            self.last_state_save = now
+            state = {
+                "url": self.url,
+                "size": self.total_size,
+                "validator": self.validator,
+                "segments": [list(segment) for segment in self.segments],
+            }
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(temp_path, self.state_path)
+
+    def _fetch_segment(self, url, segment):
+        try:
+            self._fetch_range(url, segment)
+        except DownloadCanceled:
+            raise
+        except Exception:
+            self.failed.set()
+            raise
+
+    def _fetch_range(self, url, segment):
+        start, end, done = segment
+        headers = {**self.headers, "Range": f"bytes={start + done}-{end}"}
+        with self.session.get(url, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RangeNotSupported()
+            with open(self.part_path, "r+b") as part_file:
+                part_file.seek(start + done)
+                for chunk in response.iter_content(BUFFER_SIZE):
+                    if self.canceled.is_set() or self.failed.is_set():
+                        raise DownloadCanceled()
+                    offset = part_file.tell()
+                    part_file.write(chunk)
+                    part_file.flush()  # In the file before the counters below say so
+                    if self.chunk_callback is not None:
+                        self.chunk_callback(offset, chunk)  # Before the counters, so it sees each chunk first
+                    with self.lock:
+                        segment[2] += len(chunk)
+                        self.downloaded += len(chunk)
+                    self._report()
+                    self._save_state()
+
+    def _run_single(self, response):
+        """Plain streamed download for servers without range support."""
+        self.downloaded = 0
+        with response:
+            response.raise_for_status()
+            self.total_size = int(response.headers.get("content-length", 0))
+            segment = [0, self.total_size - 1, 0]
+            self.segments = [segment]
+            with open(self.part_path, "wb") as part_file:
+                for chunk in response.iter_content(BUFFER_SIZE):
+                    if self.canceled.is_set():
+                        raise DownloadCanceled()
+                    offset = part_file.tell()
+                    part_file.write(chunk)
+                    part_file.flush()  # In the file before the counters below say so
+                    if self.chunk_callback is not None:
+                        self.chunk_callback(offset, chunk)  # Before the counters, so it sees each chunk first
+                    with self.lock:
+                        segment[2] += len(chunk)
+                        self.downloaded += len(chunk)
+                    self._report()
+        if self.finalize:
+            os.replace(self.part_path, self.save_path)
+        self._report(force=True)
+        return self.downloaded
+
+    def _report(self, force=False):
+        """Call the progress callback, throttled to one call per progress_interval."""
+        if self.progress_callback is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_report < self.progress_interval:
+                return
+            self.last_report = now
+            downloaded = self.downloaded
+        self.progress_callback(downloaded, self.total_size)
@@ -0,0 +1,522 @@
+import os
+import json
+import time
+import threading
+from urllib.parse import urlsplit, unquote
+import requests
+from requests.adapters import HTTPAdapter
+from PyQt5.QtCore import QObject, QStandardPaths, QTimer, pyqtSignal
+from app_paths import data_path
+from download_engine import SegmentedDownloader, DownloadCanceled, SEGMENT_COUNT, PART_SUFFIX, STATE_SUFFIX
+
+STATE_FILENAME = "downloads.json"
+MAX_ACTIVE_DOWNLOADS = 3
+MAX_DOWNLOADS_PER_HOST = 2
+CLOSE_TIMEOUT = 2.0  # Seconds to wait at exit for running downloads to save their resume state
+RATE_BURST_SECONDS = 0.25  # Data a rate-limited download may get ahead by
+SPEED_SMOOTHING = 0.3  # Weight of the newest sample in the moving average speed
+PROBE_TIMEOUT = 10  # Seconds for the ranged GET that decides whether a page download can be taken over
+
+QUEUED = "queued"
+ACTIVE = "active"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELED = "canceled"
+UNFINISHED_STATES = (QUEUED, ACTIVE, PAUSED)
+ENGINE_INTERRUPTED = "Interrupted when FoxBr closed"  # Web engine transfers can't continue in a new run
+
+
+class RateLimiter:
+    """Shared byte budget for all transfers; 0 bytes per second means unlimited."""
+
+    def __init__(self, bytes_per_second=0):
+        self.bytes_per_second = bytes_per_second
+        self.lock = threading.Lock()
+        self.next_free = 0.0  # Monotonic time at which the bytes taken so far are paid for
+
+    def reserve(self, size):
+        """Take size bytes from the budget; returns the seconds to wait before they are due."""
+        rate = self.bytes_per_second
+        if not rate:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.next_free = max(self.next_free, now - RATE_BURST_SECONDS) + size / rate
+            return self.next_free - now
+
+    def consume(self, size, stop_event=None):
+        """Block until size bytes fit in the budget, or stop_event is set."""
+        delay = self.reserve(size)
+        if delay > 0:
+            if stop_event is None:
+                time.sleep(delay)
+            else:
+                stop_event.wait(delay)
+
+
+class Download:
+    """One entry in the download list.
+
+    A download runs either in the segmented download engine or, when engine
+    is set, as the web engine's own download item.
+    """
+
+    def __init__(self, download_id, url, path, referrer=None, state=QUEUED, received=0, total=0, error=None,
+                 engine=False):
+        self.id = download_id
+        self.url = url
+        self.path = path
+        self.host = urlsplit(url).hostname or ""
+        self.referrer = referrer
+        self.state = state
+        self.received = received
+        self.total = total
+        self.error = error
+        self.engine = engine
+        self.speed = 0.0  # Bytes per second, smoothed
+        self.downloader = None
+        self.thread = None
+        self.item = None  # QWebEngineDownloadItem of a web engine download, while it can still run
+        self.probing = False  # Waiting to learn whether the download engine can take it over
+        self.cancel_requested = False
+        self.last_sample = None  # (monotonic time, bytes received) of the last progress report
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def resumable(self):
+        """Whether resume() can continue it; the web engine can't resume an interrupted transfer."""
+        return not self.engine or self.item is not None and self.state != FAILED
+
+    def to_dict(self):
+        return {
+            "id": self.id, "url": self.url, "path": self.path, "referrer": self.referrer,
+            "state": self.state, "received": self.received, "total": self.total, "error": self.error,
+            "engine": self.engine,
+        }
+
+
+class DownloadManager(QObject):
+    """Queue in-page downloads and run them with the segmented download engine.
+
+    Downloads start in the order they were added, at most max_active at a
+    time and max_per_host per server. Each runs on its own thread as
+    parallel Range requests straight into "<file>.part", which is renamed
+    into place when complete, so the data is written once and never copied.
+    Pausing keeps the partial file and its resume state; the list is saved
+    to downloads.json, so paused and unfinished downloads survive a restart.
+    A shared RateLimiter caps the total bandwidth when set.
+
+    Downloads started by pages are accepted in the web engine and paused,
+    since their request may have been a form POST or used credentials a
+    plain GET can't repeat. They move to the segmented engine only when a
+    ranged GET for the same URL returns the same size and type; otherwise
+    the web engine's item is queued like any other download, resumed when
+    it gets a slot, and paused for a while whenever it gets ahead of the
+    rate limit.
+    """
+
+    download_added = pyqtSignal(int)
+    download_changed = pyqtSignal(int)
+    download_removed = pyqtSignal(int)
+    _finished = pyqtSignal(int, str, str)  # Download id, new state, error; from worker threads
+    _probed = pyqtSignal(int, bool)  # Download id, whether a plain GET can take it over
+
+    def __init__(self, parent=None, directory=None, state_path=None, max_active=MAX_ACTIVE_DOWNLOADS,
+                 max_per_host=MAX_DOWNLOADS_PER_HOST, session=None, segments=SEGMENT_COUNT):
+        super().__init__(parent)
+        self.directory = directory or QStandardPaths.writableLocation(QStandardPaths.DownloadLocation)
+        self.state_path = state_path or data_path(STATE_FILENAME)
+        self.max_active = max_active
+        self.max_per_host = max_per_host
+        self.segments = segments
+        self.session = session or self._create_session()
+        self.limiter = RateLimiter()
+        self.downloads = {}  # Id -> Download, in the order they were added
+        self.next_id = 1
+        self.closed = False
+        self.takeovers = 0
+
+        self.lock = threading.Lock()
+        self.bytes_received = 0  # This run, over all downloads
+        self.completed = 0
+        self.peak_active = 0
+        self.peak_per_host = 0
+
+        self._finished.connect(self._on_finished)
+        self._probed.connect(self._on_probed)
+        self._load()
+        self._schedule()
+
+    def install(self, profile):
+        """Take over the downloads of a web engine profile."""
+        self.session.headers["User-Agent"] = profile.httpUserAgent()
+        cookie_store = profile.cookieStore()
+        cookie_store.cookieAdded.connect(self._on_cookie_added)
+        cookie_store.cookieRemoved.connect(self._on_cookie_removed)
+        cookie_store.loadAllCookies()
+        profile.downloadRequested.connect(self.on_download_requested)
+
+    def on_download_requested(self, item):
+        """Queue a page's download in the web engine, and probe whether the download engine can take it over."""
+        url = item.url()
+        item.setPath(self._unique_path(os.path.basename(item.path())))
+        item.accept()  # Items that are not accepted here are deleted
+        item.pause()  # Until it gets a slot, or is taken over without fetching anything twice
+        referrer = item.page().url().toString() if item.page() is not None else None
+        download = Download(self.next_id, url.toString(), item.path(), referrer, engine=True)
+        download.total = max(0, item.totalBytes())
+        download.item = item
+        item.downloadProgress.connect(
+            lambda received, total: self._on_engine_progress(download, item, received, total)
+        )
+        item.finished.connect(lambda: self._on_engine_finished(download, item))
+        # blob:, data:, saved pages and sizes we can't compare stay with the web engine
+        if url.scheme() in ("http", "https") and not item.isSavePageDownload() and download.total > 0:
+            download.probing = True
+            threading.Thread(
+                target=self._probe, args=(download.id, download.url, referrer, download.total, item.mimeType()),
+                name="DownloadProbe", daemon=True,
+            ).start()
+        self._append(download)
+        return download
+
+    def add(self, url, file_name=None, referrer=None, path=None):
+        """Queue a download and return it."""
+        if not file_name:
+            file_name = unquote(os.path.basename(urlsplit(url).path)) or "download"
+        return self._append(Download(self.next_id, url, path or self._unique_path(file_name), referrer))
+
+    def pause(self, download_id):
+        download = self.downloads.get(download_id)
+        if download is None:
+            return
+        if download.state == ACTIVE and download.item is not None:
+            download.item.pause()
+            self._set_state(download, PAUSED)
+            self._schedule()
+        elif download.state == ACTIVE:
+            download.downloader.cancel()  # Reported back as paused by the worker
+        elif download.state == QUEUED:
+            self._set_state(download, PAUSED)
+
+    def resume(self, download_id):
+        download = self.downloads.get(download_id)
+        if download is not None and download.state in (PAUSED, FAILED) and download.resumable:
+            download.error = None
+            self._set_state(download, QUEUED)
+            self._schedule()
+
+    def cancel(self, download_id):
+        """Stop a download and delete its partial data."""
+        download = self.downloads.get(download_id)
+        if download is None or download.state not in UNFINISHED_STATES + (FAILED,):
+            return
+        if download.item is not None:
+            item, download.item = download.item, None
+            download.probing = False
+            self._set_state(download, CANCELED)
+            item.cancel()  # The web engine deletes its partial file
+            self._schedule()
+            return
+        if download.state == ACTIVE:
+            download.cancel_requested = True
+            download.downloader.cancel()
+            return
+        self._discard_partial(download)
+        self._set_state(download, CANCELED)
+
+    def remove(self, download_id):
+        """Drop a finished, failed or canceled download from the list; the file is kept."""
+        download = self.downloads.get(download_id)
+        if download is None or download.state in UNFINISHED_STATES:
+            return
+        del self.downloads[download_id]
+        self.download_removed.emit(download_id)
+        self._save()
+
+    def clear_finished(self):
+        for download in list(self.downloads.values()):
+            if download.state not in UNFINISHED_STATES:
+                self.remove(download.id)
+
+    def set_rate_limit(self, bytes_per_second):
+        """Cap the combined download speed; 0 removes the cap."""
+        self.limiter.bytes_per_second = bytes_per_second
+        self._save()
+
+    def active_downloads(self):
+        return [download for download in self.downloads.values() if download.state == ACTIVE]
+
+    def stats(self):
+        active = self.active_downloads()
+        return {
+            "active": len(active),
+            "queued": sum(download.state == QUEUED for download in self.downloads.values()),
+            "paused": sum(download.state == PAUSED for download in self.downloads.values()),
+            "completed": self.completed,
+            "bytes_received": self.bytes_received,
+            "speed_bps": sum(download.speed for download in active),
+            "rate_limit_bps": self.limiter.bytes_per_second,
+            "peak_active": self.peak_active,
+            "peak_per_host": self.peak_per_host,
+            "in_engine": sum(download.item is not None for download in self.downloads.values()),
+            "takeovers": self.takeovers,
+        }
+
+    def close(self):
+        """Stop running downloads, keeping them queued for the next start."""
+        self.closed = True
+        for download in self.downloads.values():
+            if download.item is not None and download.state in UNFINISHED_STATES:
+                download.item = None  # Ends with the web engine
+                download.state, download.error = FAILED, ENGINE_INTERRUPTED
+        active = self.active_downloads()
+        for download in active:
+            download.downloader.cancel()
+            download.state = QUEUED
+        self._save()
+        deadline = time.monotonic() + CLOSE_TIMEOUT
+        for download in active:
+            download.thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _append(self, download):
+        self.next_id = max(self.next_id, download.id + 1)
+        self.downloads[download.id] = download
+        self.download_added.emit(download.id)
+        self._save()
+        self._schedule()
+        return download
+
+    def _schedule(self):
+        """Start queued downloads while the overall and per-host limits allow."""
+        if self.closed:
+            return
+        active = self.active_downloads()
+        per_host = {}
+        for download in active:
+            per_host[download.host] = per_host.get(download.host, 0) + 1
+        for download in list(self.downloads.values()):
+            if len(active) >= self.max_active:
+                break
+            if download.state != QUEUED or download.probing or per_host.get(download.host, 0) >= self.max_per_host:
+                continue
+            per_host[download.host] = per_host.get(download.host, 0) + 1
+            active.append(download)
+            self._start(download)
+        self.peak_active = max(self.peak_active, len(active))
+        self.peak_per_host = max([self.peak_per_host] + list(per_host.values()))
+
+    def _start(self, download):
+        download.cancel_requested = False
+        download.speed = 0.0
+        download.last_sample = None
+        if download.item is not None:
+            self._set_state(download, ACTIVE)
+            download.item.resume()
+            return
+        download.downloader = SegmentedDownloader(
+            download.url, download.path, segments=self.segments, session=self.session,
+            progress_callback=lambda received, total: self._on_progress(download, received, total),
+            chunk_callback=lambda offset, chunk: self._on_chunk(download, chunk),
+            headers={"Referer": download.referrer} if download.referrer else None,
+        )
+        self._set_state(download, ACTIVE)
+        download.thread = threading.Thread(target=self._run, args=(download,), name="Download", daemon=True)
+        download.thread.start()
+
+    def _run(self, download):
+        """Worker thread: run one transfer and report how it ended."""
+        downloader = download.downloader
+        state, error = FAILED, "Interrupted"
+        try:
+            downloader.run()
+            state, error = DONE, ""
+        except DownloadCanceled:
+            state, error = (CANCELED if download.cancel_requested else PAUSED), ""
+            if download.cancel_requested:
+                downloader.discard_partial()
+        except Exception as e:  # Any failure must still end the transfer, or it keeps its slot
+            state, error = FAILED, str(e) or type(e).__name__
+        finally:
+            # Always reported, so the download leaves ACTIVE and the queue moves on
+            self._finished.emit(download.id, state, error)
+
+    def _probe(self, download_id, url, referrer, total, mime_type):
+        """Worker thread: whether a plain ranged GET gets the file the web engine is downloading."""
+        headers = {"Range": "bytes=0-0"}
+        if referrer:
+            headers["Referer"] = referrer
+        safe = False
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=PROBE_TIMEOUT) as response:
+                content_range = response.headers.get("Content-Range", "")
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                safe = (
+                    response.status_code == 206 and content_range.rsplit("/", 1)[-1] == str(total)
+                    and (not mime_type or content_type == mime_type.lower())
+                )
+        except requests.RequestException:
+            pass
+        self._probed.emit(download_id, safe)
+
+    def _on_probed(self, download_id, safe):
+        """Move a paused web engine download to the download engine, or queue it where it is."""
+        download = self.downloads.get(download_id)
+        if download is None or not download.probing or self.closed:
+            return
+        download.probing = False
+        item = download.item
+        if safe and item is not None and download.state in (QUEUED, PAUSED) and not item.isFinished():
+            download.item = None
+            download.engine = False
+            download.received = 0
+            item.cancel()  # The web engine deletes its partial file; ours goes to "<file>.part" until complete
+            self.takeovers += 1
+            self._save()
+        self._schedule()
+
+    def _on_engine_progress(self, download, item, received, total):
+        """Account for a web engine transfer, pausing it while it is ahead of the rate limit."""
+        if download.item is not item:
+            return
+        received_now = max(0, received - download.received)
+        with self.lock:
+            self.bytes_received += received_now
+        self._on_progress(download, received, max(0, total))
+        if download.state == ACTIVE and received_now:
+            delay = self.limiter.reserve(received_now)
+            if delay > 0:
+                item.pause()
+                QTimer.singleShot(int(delay * 1000), lambda: self._end_throttle(download, item))
+
+    def _end_throttle(self, download, item):
+        if download.item is item and download.state == ACTIVE:
+            item.resume()
+
+    def _on_engine_finished(self, download, item):
+        if download.item is not item or download.state not in UNFINISHED_STATES:
+            return  # Taken over or canceled from here
+        download.item = None
+        if item.state() == item.DownloadCompleted:
+            state, error = DONE, ""
+        elif item.state() == item.DownloadCancelled:
+            state, error = CANCELED, ""
+        else:
+            state, error = FAILED, item.interruptReasonString() or "Interrupted"
+        self._on_finished(download.id, state, error)
+
+    def _on_progress(self, download, received, total):
+        """Worker thread: update the transfer's size and smoothed speed."""
+        now = time.monotonic()
+        if download.last_sample is not None:
+            elapsed = now - download.last_sample[0]
+            if elapsed > 0:
+                sample = (received - download.last_sample[1]) / elapsed
+                download.speed += SPEED_SMOOTHING * (sample - download.speed)
+        download.last_sample = (now, received)
+        download.received = received
+        download.total = total
+        self.download_changed.emit(download.id)
+
+    def _on_chunk(self, download, chunk):
+        """Worker thread: account for every chunk and hold the transfer to the rate limit."""
+        with self.lock:
+            self.bytes_received += len(chunk)
+        self.limiter.consume(len(chunk), download.downloader.canceled)
+
+    def _on_finished(self, download_id, state, error):
+        download = self.downloads.get(download_id)
+        if download is None or self.closed:
+            return
+        download.downloader = download.thread = None
+        download.speed = 0.0
+        download.error = error or None
+        if state == DONE:
+            self.completed += 1
+            if os.path.exists(download.path):
+                download.received = download.total = max(download.received, os.path.getsize(download.path))
+        self._set_state(download, state)
+        self._schedule()
+
+    def _set_state(self, download, state):
+        download.state = state
+        self.download_changed.emit(download.id)
+        self._save()
+
+    def _unique_path(self, file_name):
+        """A path in the download directory not used by a file, a partial file or another download."""
+        file_name = os.path.basename(file_name.replace("\\", "/")) or "download"
+        taken = {os.path.normcase(download.path) for download in self.downloads.values()}
+        stem, extension = os.path.splitext(file_name)
+        path = os.path.join(self.directory, file_name)
+        number = 1
+        while (os.path.normcase(path) in taken or os.path.exists(path)
+               or os.path.exists(path + PART_SUFFIX)):
+            path = os.path.join(self.directory, f"{stem} ({number}){extension}")
+            number += 1
+        return path
+
+    def _discard_partial(self, download):
+        for path in (download.path + PART_SUFFIX, download.path + STATE_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_per_host * 4, pool_maxsize=self.max_active * self.segments)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _on_cookie_added(self, cookie):
+        """Mirror the browser's cookies so downloads behind a login work."""
+        self.session.cookies.set(
+            bytes(cookie.name()).decode("utf-8", "replace"), bytes(cookie.value()).decode("utf-8", "replace"),
+            domain=cookie.domain(), path=cookie.path() or "/", secure=cookie.isSecure(),
+        )
+
+    def _on_cookie_removed(self, cookie):
+        try:
+            self.session.cookies.clear(cookie.domain(), cookie.path() or "/", bytes(cookie.name()).decode("utf-8", "replace"))
+        except KeyError:
+            pass
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return
+        self.limiter.bytes_per_second = state.get("rate_limit", 0)
+        for entry in state.get("downloads", []):
+            try:
+                download = Download(
+                    entry["id"], entry["url"], entry["path"], entry.get("referrer"),
+                    entry["state"], entry.get("received", 0), entry.get("total", 0), entry.get("error"),
+                    entry.get("engine", False),
+                )
+            except KeyError:
+                continue
+            if download.engine and download.state in UNFINISHED_STATES:
+                download.state, download.error = FAILED, ENGINE_INTERRUPTED
+            elif download.state == ACTIVE:
+                download.state = QUEUED  # Interrupted by a crash; it resumes from the partial file
+            self.downloads[download.id] = download
+            self.next_id = max(self.next_id, download.id + 1)
+
+    def _save(self):
+        state = {
+            "rate_limit": self.limiter.bytes_per_second,
+            "downloads": [download.to_dict() for download in self.downloads.values()],
+        }
+        temp_path = self.state_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as state_file:
+                json.dump(state, state_file)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            print(f"Failed to save downloads: {e}")
@@ -0,0 +1,223 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar, QScrollArea, QComboBox
+)
+from PyQt5.QtGui import QDesktopServices
+from PyQt5.QtCore import Qt, QUrl
+from download_manager import QUEUED, ACTIVE, PAUSED, DONE, FAILED, CANCELED
+from update_coalescer import UpdateCoalescer
+
+PANEL_WIDTH = 380
+PANEL_HEIGHT = 420
+RATE_LIMITS = [  # (label, bytes per second)
+    ("Unlimited", 0),
+    ("128 KB/s", 128 * 1024),
+    ("512 KB/s", 512 * 1024),
+    ("1 MB/s", 1024 * 1024),
+    ("5 MB/s", 5 * 1024 * 1024),
+]
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class DownloadRow(QWidget):
+    """One download: name, progress, status and its actions."""
+
+    def __init__(self, manager, download_id):
+        super().__init__()
+        self.manager = manager
+        self.download_id = download_id
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.setSpacing(2)
+        top = QHBoxLayout()
+        self.name_label = QLabel()
+        self.action_button = QPushButton()
+        self.action_button.clicked.connect(self.on_action_clicked)
+        self.close_button = QPushButton("✕")
+        self.close_button.setToolTip("Cancel")
+        self.close_button.clicked.connect(self.on_close_clicked)
+        top.addWidget(self.name_label, 1)
+        top.addWidget(self.action_button)
+        top.addWidget(self.close_button)
+        layout.addLayout(top)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(6)
+        layout.addWidget(self.progress_bar)
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #666666; font-size: 11px;")
+        layout.addWidget(self.status_label)
+        self.refresh()
+
+    def refresh(self):
+        download = self.manager.downloads.get(self.download_id)
+        if download is None:
+            return
+        self.name_label.setText(download.file_name)
+        self.name_label.setToolTip(download.url)
+        if download.total:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(download.received / download.total * 1000))
+        else:
+            self.progress_bar.setRange(0, 0 if download.state == ACTIVE else 1000)
+        self.progress_bar.setVisible(download.state in (QUEUED, ACTIVE, PAUSED))
+
+        received = format_size(download.received)
+        total = format_size(download.total) if download.total else "?"
+        if download.state == ACTIVE:
+            status = f"{received} of {total} — {format_size(download.speed)}/s"
+            if download.speed and download.total:
+                status += f", {int((download.total - download.received) / download.speed)} s left"
+        elif download.state == QUEUED:
+            status = "Waiting"
+        elif download.state == PAUSED:
+            status = f"Paused — {received} of {total}"
+        elif download.state == DONE:
+            status = f"{format_size(download.total)} — Done"
+        elif download.state == FAILED:
+            status = f"Failed: {download.error}"
+        else:
+            status = "Canceled"
+        self.status_label.setText(status)
+
+        action = {ACTIVE: "Pause", QUEUED: "Pause", PAUSED: "Resume", FAILED: "Retry", DONE: "Open"}.get(download.state)
+        if download.state in (PAUSED, FAILED) and not download.resumable:
+            action = None  # The web engine can't pick up an interrupted transfer
+        self.action_button.setVisible(action is not None)
+        self.action_button.setText(action or "")
+        self.close_button.setToolTip("Cancel" if download.state in (QUEUED, ACTIVE, PAUSED, FAILED) else "Remove from list")
+
+    def on_action_clicked(self):
+        download = self.manager.downloads.get(self.download_id)
+        if download is None:
+            return
+        if download.state in (ACTIVE, QUEUED):
+            self.manager.pause(self.download_id)
+        elif download.state in (PAUSED, FAILED):
+            self.manager.resume(self.download_id)
+        elif download.state == DONE:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(download.path))
+
+    def on_close_clicked(self):
+        download = self.manager.downloads.get(self.download_id)
+        if download is None:
+            return
+        if download.state in (DONE, CANCELED):
+            self.manager.remove(self.download_id)
+        else:
+            self.manager.cancel(self.download_id)
+
+
+class DownloadsPanel(QWidget):
+    """Popup list of downloads with pause, resume, cancel and a bandwidth limit."""
+
+    def __init__(self, parent, manager):
+        super().__init__(parent, Qt.Popup)
+        self.manager = manager
+        self.rows = {}
+        self.updates = UpdateCoalescer(self)  # Progress of every row repaints at most once per frame
+        self.setFixedSize(PANEL_WIDTH, PANEL_HEIGHT)
+        self.setStyleSheet("""
+            DownloadsPanel {
+                background-color: #ffffff;
+                border: 1px solid #cccccc;
+            }
+            QPushButton {
+                background-color: #ffffff;
+                border: 1px solid #cccccc;
+                border-radius: 6px;
+                padding: 2px 8px;
+            }
+            QPushButton:hover {
+                background-color: #e0e0e0;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        header = QHBoxLayout()
+        header.setContentsMargins(10, 8, 10, 4)
+        title = QLabel("Downloads")
+        title.setStyleSheet("font-size: 14px; font-weight: bold;")
+        self.rate_box = QComboBox()
+        self.rate_box.setToolTip("Bandwidth limit")
+        for label, rate in RATE_LIMITS:
+            self.rate_box.addItem(label, rate)
+        index = self.rate_box.findData(manager.limiter.bytes_per_second)
+        self.rate_box.setCurrentIndex(max(0, index))
+        self.rate_box.currentIndexChanged.connect(
+            lambda index: self.manager.set_rate_limit(self.rate_box.itemData(index))
+        )
+        clear_button = QPushButton("Clear")
+        clear_button.setToolTip("Remove finished downloads from the list")
+        clear_button.clicked.connect(self.manager.clear_finished)
+        folder_button = QPushButton("Folder")
+        folder_button.setToolTip(manager.directory)
+        folder_button.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(self.manager.directory)))
+        header.addWidget(title, 1)
+        header.addWidget(self.rate_box)
+        header.addWidget(clear_button)
+        header.addWidget(folder_button)
+        layout.addLayout(header)
+
+        self.empty_label = QLabel("No downloads")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("color: #666666;")
+        layout.addWidget(self.empty_label)
+
+        self.row_container = QWidget()
+        self.row_layout = QVBoxLayout(self.row_container)
+        self.row_layout.setContentsMargins(0, 0, 0, 0)
+        self.row_layout.setSpacing(0)
+        self.row_layout.addStretch()
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setFrameShape(QScrollArea.NoFrame)
+        scroll_area.setWidget(self.row_container)
+        layout.addWidget(scroll_area, 1)
+
+        for download_id in manager.downloads:
+            self.on_download_added(download_id)
+        manager.download_added.connect(self.on_download_added)
+        manager.download_changed.connect(self.on_download_changed)
+        manager.download_removed.connect(self.on_download_removed)
+        self.update_empty_label()
+
+    def show_below(self, widget):
+        """Open the panel under a widget, right-aligned with it."""
+        position = widget.mapToGlobal(widget.rect().bottomRight())
+        self.move(position.x() - self.width(), position.y() + 4)
+        self.show()
+
+    def on_download_added(self, download_id):
+        row = DownloadRow(self.manager, download_id)
+        self.rows[download_id] = row
+        self.row_layout.insertWidget(0, row)  # Newest first
+        self.update_empty_label()
+
+    def on_download_changed(self, download_id):
+        row = self.rows.get(download_id)
+        if row is not None and self.isVisible():
+            self.updates.submit(row, "refresh", row.refresh)
+
+    def on_download_removed(self, download_id):
+        row = self.rows.pop(download_id, None)
+        if row is not None:
+            self.updates.cancel(row)
+            row.deleteLater()
+        self.update_empty_label()
+
+    def showEvent(self, event):
+        # Rows are not refreshed while hidden; catch up once on opening
+        for row in self.rows.values():
+            row.refresh()
+        super().showEvent(event)
+
+    def update_empty_label(self):
+        self.empty_label.setVisible(not self.rows)
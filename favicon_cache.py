@@ -0,0 +1,124 @@
+import sqlite3
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QTimer, QUrl, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QIcon, QPixmap
+from app_paths import data_path
+
+FAVICON_FILENAME = "favicons.sqlite"
+FAVICON_SIZE = 20  # Matches the tab strip's favicon button
+MEMORY_CAPACITY = 256  # Icons kept decoded in memory
+FLUSH_DELAY_MS = 2000  # New icons are written in batches
+
+
+def origin_key(url):
+    """scheme://host[:port] of a QUrl, or None for URLs without a host."""
+    if not url.host():
+        return None
+    return url.adjusted(
+        QUrl.RemovePath | QUrl.RemoveQuery | QUrl.RemoveFragment | QUrl.RemoveUserInfo
+    ).toString()
+
+
+class FaviconCache(QObject):
+    """Favicons by origin: a small LRU of pre-scaled icons in front of a SQLite store.
+
+    Icons are scaled once when stored, so tabs never rescale them. lookup()
+    returns the same QIcon object for an unchanged icon, which lets callers
+    skip redundant repaints with an identity check.
+    """
+
+    def __init__(self, parent=None, path=None, capacity=MEMORY_CAPACITY):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.icons = OrderedDict()  # origin -> (QIcon, PNG bytes)
+        self.pending = {}  # origin -> PNG bytes not yet written
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(path or data_path(FAVICON_FILENAME))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS favicons (origin TEXT PRIMARY KEY, png BLOB)")
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_DELAY_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def lookup(self, url):
+        """Return the cached icon for a URL's origin, or None."""
+        origin = origin_key(url)
+        if origin is None:
+            return None
+        entry = self.icons.get(origin)
+        if entry is not None:
+            self.icons.move_to_end(origin)
+            self.memory_hits += 1
+            return entry[0]
+
+        row = self.connection.execute("SELECT png FROM favicons WHERE origin = ?", (origin,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(row[0], "PNG"):
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        return self._remember(origin, QIcon(pixmap), row[0])
+
+    def store(self, url, icon):
+        """Cache a page's icon; returns the icon to show, the cached one if unchanged."""
+        origin = origin_key(url)
+        pixmap = icon.pixmap(FAVICON_SIZE, FAVICON_SIZE)
+        if origin is None or pixmap.isNull():
+            return icon
+
+        png = self._encode(pixmap)
+        entry = self.icons.get(origin)
+        if entry is not None and entry[1] == png:
+            self.icons.move_to_end(origin)
+            return entry[0]
+
+        self.pending[origin] = png
+        self.flush_timer.start()
+        return self._remember(origin, QIcon(pixmap), png)
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows, self.pending = list(self.pending.items()), {}
+        try:
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO favicons (origin, png) VALUES (?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Failed to save favicons: {e}")
+
+    def close(self):
+        self.flush_timer.stop()
+        self.flush()
+        self.connection.close()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.icons),
+            "memory_bytes": len(self.icons) * FAVICON_SIZE * FAVICON_SIZE * 4,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, origin, icon, png):
+        self.icons[origin] = (icon, png)
+        self.icons.move_to_end(origin)
+        while len(self.icons) > self.capacity:
+            self.icons.popitem(last=False)
+        return icon
+
+    def _encode(self, pixmap):
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        pixmap.save(buffer, "PNG")
+        return bytes(data)
@@ -0,0 +1,371 @@
+import os
+import re
+import mmap
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"FXFL"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4s8I")
+TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+DOMAIN_RULE_RE = re.compile(r"^\|\|([a-z0-9.-]+)\^?$")
+NO_TOKEN = 0  # Bucket of URL rules without a usable token, checked for every request
+COMPILED_SUFFIX = ".fxfl"
+CACHE_LIMIT = 50000  # Hostnames and tokens whose lookups are remembered
+
+RESOURCE_TYPES = {
+    name: 1 << bit for bit, name in enumerate((
+        "subdocument", "script", "image", "stylesheet", "object", "xmlhttprequest",
+        "ping", "media", "font", "websocket", "other",
+    ))
+}
+ALL_TYPES = (1 << len(RESOURCE_TYPES)) - 1
+
+FLAG_EXCEPTION = 1
+FLAG_THIRD_PARTY = 2
+FLAG_FIRST_PARTY = 4
+FLAG_MATCH_CASE = 8
+FLAG_DOCUMENT = 16  # An exception for every request made by pages on the matched host
+
+# Options that only change how a rule ranks or is reported, so they can be ignored
+IGNORED_OPTIONS = {"important", "all", "collapse"}
+SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "ac", "edu", "ne", "or"}
+
+
+def stable_hash(text):
+    """64-bit hash that is the same in every process (unlike hash()); never 0."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+def base_domain(host):
+    """Approximate registrable domain, used to tell first- from third-party requests."""
+    labels = host.rsplit(".", 3)
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def pattern_to_regex(pattern):
+    """Translate an Adblock Plus URL pattern into a regular expression."""
+    parts = []
+    if pattern.startswith("||"):
+        parts.append(r"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?")
+        pattern = pattern[2:]
+    elif pattern.startswith("|"):
+        parts.append("^")
+        pattern = pattern[1:]
+    end = ""
+    if pattern.endswith("|"):
+        end = "$"
+        pattern = pattern[:-1]
+    for char in pattern:
+        if char == "*":
+            parts.append(".*")
+        elif char == "^":
+            parts.append(r"(?:[^\w.%-]|$)")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts) + end
+
+
+def parse_rule(line):
+    """Parse one filter list line into (flags, type_mask, pattern, domains), or None to skip it."""
+    line = line.strip()
+    if not line or line[0] in "![" or "#" in line and re.search(r"#[@?$]?#", line):
+        return None  # Comments, headers and element hiding rules
+    flags = 0
+    if line.startswith("@@"):
+        flags |= FLAG_EXCEPTION
+        line = line[2:]
+
+    pattern, types, excluded_types, domains = line, 0, 0, ""
+    if "$" in line and not (line.startswith("/") and line.endswith("/")):
+        pattern, _, options = line.rpartition("$")
+        for option in options.split(","):
+            option = option.strip()
+            name = option.lstrip("~").lower()
+            negated = option.startswith("~")
+            if name in RESOURCE_TYPES:
+                if negated:
+                    excluded_types |= RESOURCE_TYPES[name]
+                else:
+                    types |= RESOURCE_TYPES[name]
+            elif name in ("third-party", "3p"):
+                flags |= FLAG_FIRST_PARTY if negated else FLAG_THIRD_PARTY
+            elif name in ("first-party", "1p"):
+                flags |= FLAG_THIRD_PARTY if negated else FLAG_FIRST_PARTY
+            elif name == "match-case":
+                flags |= FLAG_MATCH_CASE
+            elif name in ("document", "doc") and not negated:
+                flags |= FLAG_DOCUMENT
+            elif name.startswith("domain="):
+                domains = option[len("domain="):].lower()
+            elif name not in IGNORED_OPTIONS:
+                return None  # Unsupported option; applying the rule without it could over-block
+
+    if not pattern.strip("*|^") or (pattern.startswith("/") and pattern.endswith("/") and len(pattern) > 1):
+        return None  # Match-everything and regular expression rules are not supported
+    if flags & FLAG_DOCUMENT and not (flags & FLAG_EXCEPTION and DOMAIN_RULE_RE.match(pattern.lower())):
+        return None  # Only page hosts are known here: documents are neither blocked nor matched by URL
+    type_mask = (types or ALL_TYPES) & ~excluded_types
+    if not flags & FLAG_MATCH_CASE:
+        pattern = pattern.lower()
+    return flags, type_mask, pattern, domains
+
+
+def rule_tokens(pattern):
+    """Tokens that every URL matching pattern contains as whole alphanumeric runs."""
+    lowered = pattern.lower()
+    tokens = []
+    for match in TOKEN_RE.finditer(lowered):
+        start, end = match.span()
+        # An unanchored edge or a wildcard next to the token means the URL's run could be longer
+        if start == 0 or end == len(lowered) or lowered[start - 1] == "*" or lowered[end] == "*":
+            continue
+        tokens.append(match.group())
+    return tokens
+
+
+def compile_filter_lists(paths, cache_dir):
+    """Compile filter lists into cache_dir, reusing a previous compilation; returns its path."""
+    key = hashlib.sha256(str(FORMAT_VERSION).encode())
+    for path in paths:
+        stat = os.stat(path)
+        key.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    compiled_path = os.path.join(cache_dir, key.hexdigest()[:16] + COMPILED_SUFFIX)
+    if os.path.exists(compiled_path):
+        return compiled_path
+
+    lines = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as list_file:
+            lines.extend(list_file)
+    write_compiled(lines, compiled_path)
+
+    for name in os.listdir(cache_dir):  # Drop compilations of older lists
+        if name.endswith(COMPILED_SUFFIX) and os.path.join(cache_dir, name) != compiled_path:
+            os.remove(os.path.join(cache_dir, name))
+    return compiled_path
+
+
+def write_compiled(lines, path):
+    """Parse filter rules and write the compact matcher file used by FilterMatcher."""
+    block_domains, allow_domains, document_domains, rules = set(), set(), set(), []
+    for line in lines:
+        rule = parse_rule(line)
+        if rule is None:
+            continue
+        flags, type_mask, pattern, domains = rule
+        domain_match = DOMAIN_RULE_RE.match(pattern.lower())
+        if flags & FLAG_DOCUMENT:
+            if not domains:
+                document_domains.add(stable_hash(domain_match.group(1)))
+        elif domain_match and type_mask == ALL_TYPES and not domains and flags in (0, FLAG_EXCEPTION):
+            target = allow_domains if flags & FLAG_EXCEPTION else block_domains
+            target.add(stable_hash(domain_match.group(1)))
+        else:
+            rules.append(rule)
+
+    # Index each URL rule under its rarest token, so a request checks few rules
+    rule_token_lists = [rule_tokens(pattern) for _, _, pattern, _ in rules]
+    frequency = {}
+    for tokens in rule_token_lists:
+        for token in tokens:
+            frequency[token] = frequency.get(token, 0) + 1
+    buckets = {}
+    for rule_id, tokens in enumerate(rule_token_lists):
+        token_hash = stable_hash(min(tokens, key=lambda t: (frequency[t], -len(t)))) if tokens else NO_TOKEN
+        buckets.setdefault(token_hash, []).append(rule_id)
+
+    token_hashes = array("Q", sorted(buckets))
+    token_starts, rule_refs = array("I"), array("I")
+    for token_hash in token_hashes:
+        token_starts.append(len(rule_refs))
+        rule_refs.extend(buckets[token_hash])
+    token_starts.append(len(rule_refs))
+
+    blob = bytearray()
+    rule_offsets = array("I")
+    for flags, type_mask, pattern, domains in rules:
+        rule_offsets.append(len(blob))
+        blob += f"{flags}\t{type_mask}\t{pattern}\t{domains}".encode("utf-8")
+    rule_offsets.append(len(blob))
+
+    sections = (
+        array("Q", sorted(block_domains)), array("Q", sorted(allow_domains)), array("Q", sorted(document_domains)),
+        token_hashes, token_starts, rule_refs, rule_offsets,
+    )
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as compiled_file:
+        compiled_file.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, len(sections[0]), len(sections[1]), len(sections[2]), len(token_hashes),
+            len(rule_refs), len(rules), len(blob)
+        ))
+        for section in sections:
+            compiled_file.write(section.tobytes())
+        compiled_file.write(blob)
+    os.replace(temp_path, path)
+
+
+class CompiledRule:
+    """A URL rule decoded from the matcher file, with its regular expression."""
+
+    def __init__(self, record):
+        flags, type_mask, pattern, domains = record.decode("utf-8").split("\t")
+        self.flags = int(flags)
+        self.type_mask = int(type_mask)
+        self.pattern = pattern
+        self.regex = re.compile(pattern_to_regex(pattern), 0 if self.flags & FLAG_MATCH_CASE else re.IGNORECASE)
+        self.include_domains = [d for d in domains.split("|") if d and not d.startswith("~")]
+        self.exclude_domains = [d[1:] for d in domains.split("|") if d.startswith("~")]
+
+    def matches(self, url, page_host, type_bit, third_party):
+        if not self.type_mask & type_bit:
+            return False
+        if self.flags & FLAG_THIRD_PARTY and not third_party or self.flags & FLAG_FIRST_PARTY and third_party:
+            return False
+        if self.include_domains and not any(_on_domain(page_host, d) for d in self.include_domains):
+            return False
+        if any(_on_domain(page_host, d) for d in self.exclude_domains):
+            return False
+        return self.regex.search(url) is not None
+
+
+def _on_domain(host, domain):
+    return host == domain or host.endswith("." + domain)
+
+
+class FilterMatcher:
+    """Decide requests against a compiled filter list file, memory-mapped.
+
+    Hostname rules, and $document exceptions for the page's host, are looked
+    up in sorted hash arrays, URL rules through a token index: only rules
+    filed under a token the URL contains (plus the few without a token) are
+    decoded, compiled on first use, and checked. Hostname decisions and
+    token hashes are remembered, since pages repeat them. Safe to call from
+    the web engine's IO thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as compiled_file:
+            self.map = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+        magic, version, block_count, allow_count, document_count, token_count, ref_count, rule_count, blob_size = \
+            HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a compiled filter list")
+
+        offset = HEADER.size
+        sections = []
+        for count, item_format, item_size in (
+            (block_count, "Q", 8), (allow_count, "Q", 8), (document_count, "Q", 8), (token_count, "Q", 8),
+            (token_count + 1, "I", 4), (ref_count, "I", 4), (rule_count + 1, "I", 4),
+        ):
+            sections.append(view[offset:offset + count * item_size].cast(item_format))
+            offset += count * item_size
+        (self.block_domains, self.allow_domains, self.document_domains, self.token_hashes,
+         self.token_starts, self.rule_refs, self.rule_offsets) = sections
+        self.blob = view[offset:offset + blob_size]
+        self.rule_count = rule_count
+        self.rules = {}  # Rule id -> CompiledRule, filled on first use
+        self.buckets = {token_hash: index for index, token_hash in enumerate(self.token_hashes)}
+        self.host_results = {}  # Host -> True (blocked), False (allowed) or None
+        self.page_results = {}  # Page host -> whether a $document exception allows all its requests
+        self.token_hashes_cache = {}
+
+    def should_block(self, url, host, page_host, resource_type="other"):
+        """True if a request for url (on host) made by a page on page_host should be blocked."""
+        if page_host and self.document_domains:
+            page_host = page_host.lower()
+            try:
+                page_allowed = self.page_results[page_host]
+            except KeyError:
+                page_allowed = self._match_page(page_host)
+            if page_allowed:
+                return False
+        host = host.lower()
+        try:
+            host_result = self.host_results[host]
+        except KeyError:
+            host_result = self._match_host(host)
+        if host_result is False:
+            return False
+        blocked = bool(host_result)
+
+        type_bit = RESOURCE_TYPES.get(resource_type, RESOURCE_TYPES["other"])
+        third_party = base_domain(host) != base_domain(page_host.lower()) if page_host else False
+        cache = self.token_hashes_cache
+        if len(cache) > CACHE_LIMIT:
+            cache.clear()
+        for token in (None, *set(TOKEN_RE.findall(url.lower()))):
+            token_hash = NO_TOKEN if token is None else cache.get(token)
+            if token_hash is None:
+                token_hash = cache[token] = stable_hash(token)
+            index = self.buckets.get(token_hash)
+            if index is None:
+                continue
+            for position in range(self.token_starts[index], self.token_starts[index + 1]):
+                rule = self._rule(self.rule_refs[position])
+                exception = rule.flags & FLAG_EXCEPTION
+                if (exception or not blocked) and rule.matches(url, page_host, type_bit, third_party):
+                    if exception:
+                        return False
+                    blocked = True
+        return blocked
+
+    def stats(self):
+        return {
+            "blocked_domains": len(self.block_domains),
+            "allowed_domains": len(self.allow_domains),
+            "allowed_pages": len(self.document_domains),
+            "url_rules": self.rule_count,
+            "compiled_rules": len(self.rules),
+            "file_bytes": len(self.map),
+        }
+
+    def close(self):
+        for section in (self.block_domains, self.allow_domains, self.document_domains, self.token_hashes,
+                        self.token_starts, self.rule_refs, self.rule_offsets, self.blob):
+            section.release()
+        self.map.close()
+
+    def _rule(self, rule_id):
+        rule = self.rules.get(rule_id)
+        if rule is None:
+            start, end = self.rule_offsets[rule_id], self.rule_offsets[rule_id + 1]
+            rule = self.rules[rule_id] = CompiledRule(bytes(self.blob[start:end]))
+        return rule
+
+    def _match_page(self, page_host):
+        """Whether a $document exception covers page_host or a domain above it."""
+        result = any(self._contains(self.document_domains, h) for h in self._suffix_hashes(page_host))
+        if len(self.page_results) > CACHE_LIMIT:
+            self.page_results.clear()
+        self.page_results[page_host] = result
+        return result
+
+    @staticmethod
+    def _suffix_hashes(host):
+        labels = host.split(".")
+        return [stable_hash(".".join(labels[i:])) for i in range(max(1, len(labels) - 1))]
+
+    def _match_host(self, host):
+        """True if a hostname rule blocks host, False if one allows it, else None."""
+        suffixes = self._suffix_hashes(host)
+        result = None
+        if any(self._contains(self.allow_domains, h) for h in suffixes):
+            result = False
+        elif any(self._contains(self.block_domains, h) for h in suffixes):
+            result = True
+        if len(self.host_results) > CACHE_LIMIT:
+            self.host_results.clear()
+        self.host_results[host] = result
+        return result
+
+    @staticmethod
+    def _contains(hashes, value):
+        index = bisect_left(hashes, value)
+        return index < len(hashes) and hashes[index] == value
@@ -0,0 +1,442 @@
+import re
+import time
+import heapq
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left, insort
+from PyQt5.QtCore import QObject, pyqtSignal
+from app_paths import data_path
+
+HISTORY_FILENAME = "history.sqlite"
+FLUSH_INTERVAL = 5.0  # Seconds between batched writes of new visits
+LOAD_DELAY = 2.0  # Seconds to wait after startup before loading the index
+MAX_SUGGESTIONS = 8
+RANGE_SCAN_LIMIT = 2000  # Candidates ranked directly; larger matches are scanned in frecency order
+INDEX_CAPACITY = 50000  # Entries loaded into memory, by frecency; the rest are queried in SQLite
+TOKEN_PREFIX_LIMIT = 32  # Distinct tokens a trailing partial word may expand to
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Frecency recency buckets: (max age in days, weight)
+RECENCY_WEIGHTS = ((4, 100), (14, 70), (31, 50), (90, 30))
+OLD_VISIT_WEIGHT = 10
+
+
+def normalize_url(url):
+    """Lower-case a URL and strip its scheme and "www." so prefixes match what users type."""
+    key = url.lower()
+    for scheme in ("https://", "http://"):
+        if key.startswith(scheme):
+            key = key[len(scheme):]
+            break
+    if key.startswith("www."):
+        key = key[4:]
+    return key
+
+
+def frecency(visit_count, last_visit, now):
+    """Score an entry by how often and how recently it was visited."""
+    age_days = (now - last_visit) / 86400
+    for max_age, weight in RECENCY_WEIGHTS:
+        if age_days <= max_age:
+            return visit_count * weight
+    return visit_count * OLD_VISIT_WEIGHT
+
+
+def entry_tokens(key, title):
+    """Words of an entry's host and title, as indexed for word matches."""
+    host = key.split("/", 1)[0]
+    return TOKEN_RE.findall(host + " " + (title or "").lower())
+
+
+def frecency_sql(now):
+    """frecency() as an SQL expression over the history table, with its parameters."""
+    cases = " ".join("WHEN last_visit >= ? THEN ?" for _ in RECENCY_WEIGHTS)
+    params = []
+    for max_age, weight in RECENCY_WEIGHTS:
+        params += [now - max_age * 86400, weight]
+    return f"visit_count * CASE {cases} ELSE {OLD_VISIT_WEIGHT} END", params
+
+
+class HistoryIndex:
+    """In-memory prefix and token index over history entries.
+
+    Entries live in parallel arrays addressed by id. URL prefixes are found by
+    bisecting a sorted list of normalized URLs, words of titles and hosts by a
+    token -> ids map. Queries that match too many entries to rank directly
+    are answered by scanning entries in frecency order until enough match.
+    Not thread-safe: HistoryService only touches it from its own thread.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.titles = []
+        self.keys = []
+        self.visit_counts = array("I")
+        self.last_visits = array("d")
+        self.ids_by_url = {}
+        self.sorted_keys = []
+        self.sorted_ids = []
+        self.tokens = {}
+        self.sorted_tokens = []
+        self.ranked = []  # Ids by frecency when the index was loaded
+        self.recent = []  # Ids added or visited since then, scanned before ranked
+        self.recent_set = set()
+        self.bulk_loading = False
+
+    def __len__(self):
+        return len(self.urls)
+
+    def load(self, rows):
+        """Bulk-load (url, title, visit_count, last_visit) rows."""
+        self.bulk_loading = True
+        for url, title, visit_count, last_visit in rows:
+            self._append(url, title or "", visit_count, last_visit)
+        count = len(self.keys)
+        self.sorted_ids = sorted(range(count), key=self.keys.__getitem__)
+        self.sorted_keys = [self.keys[entry_id] for entry_id in self.sorted_ids]
+        for entry_id in range(count):
+            self._index_tokens(entry_id)
+        self.sorted_tokens = sorted(self.tokens)
+        self.bulk_loading = False
+        now = time.time()
+        self.ranked = sorted(
+            range(count), key=lambda i: frecency(self.visit_counts[i], self.last_visits[i], now), reverse=True
+        )
+
+    def add_visit(self, url, title=None, when=None):
+        """Count a visit to url, adding it to the index if it is new."""
+        when = when or time.time()
+        entry_id = self.ids_by_url.get(url)
+        if entry_id is None:
+            entry_id = self.add_entry(url, title, 0, when)
+        elif title:
+            self.set_title(url, title)
+        self.visit_counts[entry_id] += 1
+        self.last_visits[entry_id] = when
+        if entry_id not in self.recent_set:
+            self.recent_set.add(entry_id)
+            self.recent.append(entry_id)
+        return entry_id
+
+    def add_entry(self, url, title, visit_count, last_visit):
+        """Index a stored entry without counting a visit; returns its id."""
+        entry_id = self.ids_by_url.get(url)
+        if entry_id is not None:
+            return entry_id
+        entry_id = self._append(url, title or "", visit_count, last_visit)
+        position = bisect_left(self.sorted_keys, self.keys[entry_id])
+        self.sorted_keys.insert(position, self.keys[entry_id])
+        self.sorted_ids.insert(position, entry_id)
+        self._index_tokens(entry_id)
+        return entry_id
+
+    def set_title(self, url, title):
+        entry_id = self.ids_by_url.get(url)
+        if entry_id is None or self.titles[entry_id] == title:
+            return None
+        self.titles[entry_id] = title
+        self._index_tokens(entry_id)  # Old words stay indexed; matches are re-checked against the text
+        return entry_id
+
+    def entry(self, entry_id):
+        return self.urls[entry_id], self.titles[entry_id], self.visit_counts[entry_id], self.last_visits[entry_id]
+
+    def query(self, text, limit=MAX_SUGGESTIONS):
+        """Return up to limit (url, title) pairs matching text, best first."""
+        text = text.strip().lower()
+        if not text:
+            return []
+        key_prefix = normalize_url(text)
+        words = TOKEN_RE.findall(text)
+
+        candidates = set(self._match_prefix(key_prefix, limit))
+        if len(candidates) < limit and words:
+            candidates.update(self._match_words(words, limit))
+
+        now = time.time()
+        best = heapq.nlargest(
+            limit, candidates, key=lambda i: frecency(self.visit_counts[i], self.last_visits[i], now)
+        )
+        return [(self.urls[i], self.titles[i]) for i in best]
+
+    def _match_prefix(self, key_prefix, limit):
+        low = bisect_left(self.sorted_keys, key_prefix)
+        high = bisect_left(self.sorted_keys, key_prefix + "\uffff", low)
+        if high - low <= RANGE_SCAN_LIMIT:
+            return self.sorted_ids[low:high]
+        keys = self.keys
+        return self._scan_by_frecency(lambda i: keys[i].startswith(key_prefix), limit)
+
+    def _match_words(self, words, limit):
+        """Entries whose title or host contains every word, the last one as a prefix."""
+        postings = []
+        for word in words[:-1]:
+            posting = self.tokens.get(word)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        last = words[-1]
+        low = bisect_left(self.sorted_tokens, last)
+        high = bisect_left(self.sorted_tokens, last + "\uffff", low)
+        if high - low <= TOKEN_PREFIX_LIMIT:
+            last_posting = array("I")
+            for token in self.sorted_tokens[low:high]:
+                last_posting.extend(self.tokens[token])
+        else:
+            last_posting = self.tokens.get(last, array("I"))
+        if not last_posting and high == low:
+            return []
+        postings.append(last_posting)
+
+        def matches(entry_id):
+            haystack = self.keys[entry_id] + " " + self.titles[entry_id].lower()
+            return all(word in haystack for word in words)
+
+        smallest = min(postings, key=len)
+        if len(smallest) <= RANGE_SCAN_LIMIT:
+            return [entry_id for entry_id in set(smallest) if matches(entry_id)]
+        return self._scan_by_frecency(matches, limit)
+
+    def _scan_by_frecency(self, predicate, limit):
+        """Collect matches in rough frecency order; stops once there are enough."""
+        found = []
+        for source in (self.recent, self.ranked):
+            for entry_id in source:
+                if predicate(entry_id):
+                    found.append(entry_id)
+                    if len(found) >= limit * 2:
+                        return found
+        return found
+
+    def _append(self, url, title, visit_count, last_visit):
+        entry_id = len(self.urls)
+        self.urls.append(url)
+        self.titles.append(title)
+        self.keys.append(normalize_url(url))
+        self.visit_counts.append(visit_count)
+        self.last_visits.append(last_visit)
+        self.ids_by_url[url] = entry_id
+        return entry_id
+
+    def _index_tokens(self, entry_id):
+        for token in set(entry_tokens(self.keys[entry_id], self.titles[entry_id])):
+            posting = self.tokens.get(token)
+            if posting is None:
+                posting = self.tokens[token] = array("I")
+                if not self.bulk_loading:
+                    insort(self.sorted_tokens, token)
+            if not posting or posting[-1] != entry_id:
+                posting.append(entry_id)
+
+
+class HistoryService(QObject):
+    """Records visits and answers omnibox queries on a background thread.
+
+    The GUI thread only queues work. The history thread owns the index and
+    the SQLite connection, writes new visits in batches, and answers only the
+    most recent query, emitting suggestions_ready(query, suggestions) where
+    each suggestion is a (kind, url, title, tab_id) tuple.
+
+    Only the index_capacity entries with the highest frecency are kept in
+    memory. When they give too few suggestions, the rest of the history is
+    searched in SQLite, by URL prefix on an indexed key column and by words
+    in an FTS5 table, and the longer list is emitted again unless a newer
+    query is waiting.
+    """
+
+    suggestions_ready = pyqtSignal(str, list)
+
+    def __init__(self, parent=None, path=None, flush_interval=FLUSH_INTERVAL, load_delay=LOAD_DELAY,
+                 index_capacity=INDEX_CAPACITY):
+        super().__init__(parent)
+        self.path = path or data_path(HISTORY_FILENAME)
+        self.flush_interval = flush_interval
+        self.load_delay = load_delay
+        self.index_capacity = index_capacity
+        self.index = HistoryIndex()
+        self.loaded = False
+        self.capped = False  # Some entries are only in SQLite
+        self.full_text = False  # Words of those entries are in an FTS5 table, else matched with LIKE
+
+        self.condition = threading.Condition()
+        self.visits = []  # (url, title, when) or (url, title, None) for title updates
+        self.pending_query = None
+        self.stopped = False
+        self.dirty = set()  # Ids with changes not yet written
+        self.thread = threading.Thread(target=self._run, name="History", daemon=True)
+        self.thread.start()
+
+    def record_visit(self, url, title=None):
+        with self.condition:
+            self.visits.append((url, title, time.time()))
+            self.condition.notify()
+
+    def record_title(self, url, title):
+        with self.condition:
+            self.visits.append((url, title, None))
+
+    def request_suggestions(self, text, open_tabs=()):
+        """Ask for suggestions; open_tabs is a list of (tab_id, url, title)."""
+        with self.condition:
+            self.pending_query = (text, list(open_tabs))
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _run(self):
+        connection = sqlite3.connect(self.path)
+        self._open(connection)
+        with self.condition:
+            self.condition.wait_for(lambda: self.stopped, timeout=self.load_delay)
+        self.capped = connection.execute("SELECT COUNT(*) FROM history").fetchone()[0] > self.index_capacity
+        order, params = frecency_sql(time.time())
+        self.index.load(connection.execute(
+            f"SELECT url, title, visit_count, last_visit FROM history ORDER BY {order} DESC LIMIT ?",
+            params + [self.index_capacity],
+        ))
+        self.loaded = True
+
+        last_flush = time.monotonic()
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.stopped or self.pending_query is not None, timeout=self.flush_interval
+                )
+                visits, self.visits = self.visits, []
+                query, self.pending_query = self.pending_query, None
+                stopped = self.stopped
+
+            for url, title, when in visits:
+                if self.capped and url not in self.index.ids_by_url:
+                    self._load_entry(connection, url)  # Keep counting from the stored visits
+                if when is None:
+                    entry_id = self.index.set_title(url, title)
+                else:
+                    entry_id = self.index.add_visit(url, title, when)
+                if entry_id is not None:
+                    self.dirty.add(entry_id)
+
+            if query is not None:
+                text, open_tabs = query
+                suggestions = self._suggest(text, open_tabs)
+                self.suggestions_ready.emit(text, suggestions)
+                if self.capped and len(suggestions) < MAX_SUGGESTIONS and self.pending_query is None:
+                    more = self._suggest_from_store(connection, text, suggestions)
+                    if more and self.pending_query is None:
+                        self.suggestions_ready.emit(text, suggestions + more)
+
+            if stopped or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush(connection)
+                last_flush = time.monotonic()
+            if stopped:
+                connection.close()
+                return
+
+    def _suggest(self, text, open_tabs):
+        needle = text.strip().lower()
+        suggestions = [
+            ("tab", url, title, tab_id) for tab_id, url, title in open_tabs
+            if needle and (needle in url.lower() or needle in title.lower())
+        ][:MAX_SUGGESTIONS // 2]
+        open_urls = {url for _, url, _, _ in suggestions}
+        for url, title in self.index.query(text, MAX_SUGGESTIONS):
+            if url not in open_urls and len(suggestions) < MAX_SUGGESTIONS:
+                suggestions.append(("history", url, title, None))
+        return suggestions
+
+    def _suggest_from_store(self, connection, text, suggestions):
+        """History suggestions from entries that are not in the in-memory index, best first."""
+        text = text.strip().lower()
+        if not text:
+            return []
+        key_prefix = normalize_url(text)
+        words = TOKEN_RE.findall(text)
+        columns = "SELECT url, title, visit_count, last_visit FROM history"
+        rows = connection.execute(
+            f"{columns} WHERE key >= ? AND key < ? LIMIT ?",
+            (key_prefix, key_prefix + "\uffff", RANGE_SCAN_LIMIT),
+        ).fetchall()
+        if len(rows) < MAX_SUGGESTIONS and words and self.full_text:
+            # Every word, the last one as a prefix, as the in-memory token index matches them
+            match = " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+            rows += connection.execute(
+                f"{columns} WHERE rowid IN (SELECT rowid FROM history_words WHERE history_words MATCH ? LIMIT ?)",
+                (match, RANGE_SCAN_LIMIT),
+            ).fetchall()
+        elif len(rows) < MAX_SUGGESTIONS and words:
+            # Without FTS5, words anywhere in the title or URL: a table scan
+            condition = " AND ".join("(key LIKE ? OR title LIKE ?)" for _ in words)
+            params = [pattern for word in words for pattern in (f"%{word}%", f"%{word}%")]
+            rows += connection.execute(f"{columns} WHERE {condition} LIMIT ?", params + [RANGE_SCAN_LIMIT]).fetchall()
+
+        shown = {url for _, url, _, _ in suggestions}
+        now = time.time()
+        candidates = {row[0]: row for row in rows if row[0] not in shown and row[0] not in self.index.ids_by_url}
+        best = heapq.nlargest(
+            MAX_SUGGESTIONS - len(suggestions), candidates.values(), key=lambda row: frecency(row[2], row[3], now)
+        )
+        return [("history", url, title, None) for url, title, _, _ in best]
+
+    def _load_entry(self, connection, url):
+        """Bring an entry that is only in SQLite into the index."""
+        row = connection.execute(
+            "SELECT url, title, visit_count, last_visit FROM history WHERE url = ?", (url,)
+        ).fetchone()
+        if row is not None:
+            self.index.add_entry(*row)
+
+    def _open(self, connection):
+        """Create the table, adding the indexed key column to databases from before it existed."""
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "url TEXT PRIMARY KEY, title TEXT, visit_count INTEGER, last_visit REAL, key TEXT)"
+        )
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(history)")]
+        if "key" not in columns:
+            connection.create_function("normalize_url", 1, normalize_url, deterministic=True)
+            with connection:
+                connection.execute("ALTER TABLE history ADD COLUMN key TEXT")
+                connection.execute("UPDATE history SET key = normalize_url(url)")
+        connection.execute("CREATE INDEX IF NOT EXISTS history_key ON history (key)")
+
+        # Words of every entry, keyed by the history row; rowids are stable as history is never vacuumed
+        try:
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'history_words'").fetchone() is None:
+                connection.create_function(
+                    "entry_words", 2, lambda key, title: " ".join(entry_tokens(key, title)), deterministic=True
+                )
+                with connection:
+                    connection.execute("CREATE VIRTUAL TABLE history_words USING fts5(words)")
+                    connection.execute(
+                        "INSERT INTO history_words (rowid, words) SELECT rowid, entry_words(key, title) FROM history"
+                    )
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False  # SQLite built without FTS5
+
+    def _flush(self, connection):
+        if not self.dirty:
+            return
+        rows = [self.index.entry(entry_id) + (self.index.keys[entry_id],) for entry_id in self.dirty]
+        self.dirty = set()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO history (url, title, visit_count, last_visit, key) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET title = excluded.title, "
+                    "visit_count = excluded.visit_count, last_visit = excluded.last_visit, key = excluded.key",
+                    rows
+                )
+                if self.full_text:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO history_words (rowid, words) SELECT rowid, ? FROM history WHERE url = ?",
+                        [(" ".join(entry_tokens(key, title)), url) for url, title, _, _, key in rows]
+                    )
+        except sqlite3.Error as e:
+            print(f"Failed to save history: {e}")
@@ -0,0 +1,481 @@
+import os
+import time
+import shutil
+import struct
+import hashlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from download_engine import SegmentedDownloader
+
+STAGING_DIR_NAME = ".update_staging"
+BACKUP_DIR_NAME = ".update_backup"
+INSTALL_RECORD_NAME = "installed_files.txt"  # Every file the installer and updater wrote
+REMOVE_WORKERS = 8
+REMOVE_BATCH_SIZE = 64  # Files deleted per worker task, and per progress report
+EXTRACT_WORKERS = 4
+HASH_READ_SIZE = 1024 * 1024
+HASH_BUFFER_SIZE = 64 * 1024 * 1024  # Out-of-order bytes kept in memory until they can be hashed
+PROGRESS_INTERVAL = 0.1  # Seconds between progress reports
+END_OF_CENTRAL_DIRECTORY = b"PK\x05\x06"
+MAX_ZIP_COMMENT = 0xFFFF
+
+
+class InstallError(Exception):
+    """The downloaded archive could not be verified or installed."""
+
+
+def fetch_expected_hash(checksum_url, session=None):
+    """Read a published "<sha256>  <name>" checksum file, or None if there is none."""
+    try:
+        response = (session or requests).get(checksum_url, timeout=10)
+        response.raise_for_status()
+        return response.text.split()[0].lower()
+    except (requests.RequestException, IndexError):
+        return None
+
+
+def swap_in(staging_path, install_path, removed=()):
+    """Move every staged file into the install directory, then delete removed files.
+
+    Each live file is renamed into a backup directory before its replacement
+    is moved in (renaming works even for a running executable on Windows).
+    If anything fails, every change is rolled back and OSError is raised.
+    """
+    backup_path = os.path.join(install_path, BACKUP_DIR_NAME)
+    shutil.rmtree(backup_path, ignore_errors=True)
+
+    staged = []
+    for root, _, names in os.walk(staging_path):
+        for name in names:
+            staged.append(os.path.relpath(os.path.join(root, name), staging_path))
+
+    swapped = []
+    try:
+        for path in staged + list(removed):
+            target = os.path.join(install_path, path)
+            backup_file = os.path.join(backup_path, path)
+            if os.path.exists(target):
+                os.makedirs(os.path.dirname(backup_file), exist_ok=True)
+                os.replace(target, backup_file)
+            swapped.append(path)
+            staged_file = os.path.join(staging_path, path)
+            if os.path.exists(staged_file):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(staged_file, target)
+    except OSError:
+        for path in reversed(swapped):
+            target = os.path.join(install_path, path)
+            backup_file = os.path.join(backup_path, path)
+            if os.path.exists(target) and not os.path.exists(os.path.join(staging_path, path)):
+                os.remove(target)
+            if os.path.exists(backup_file):
+                os.replace(backup_file, target)
+        raise
+
+    shutil.rmtree(staging_path, ignore_errors=True)
+    shutil.rmtree(backup_path, ignore_errors=True)  # A running executable's backup stays until next time
+    return staged
+
+
+def is_safe_path(relative_path):
+    """Reject manifest and record entries that would escape the install directory."""
+    normalized = os.path.normpath(relative_path)
+    return not (os.path.isabs(normalized) or normalized.startswith("..") or ":" in normalized)
+
+
+def read_installed_files(install_path):
+    """Relative paths from the install record, or None if there is no record.
+
+    Entries that would escape the install directory are dropped, so a
+    damaged record can't make the uninstaller delete anything outside it.
+    """
+    try:
+        with open(os.path.join(install_path, INSTALL_RECORD_NAME), "r", encoding="utf-8") as record_file:
+            paths = [line.rstrip("\n") for line in record_file if line.strip()]
+    except FileNotFoundError:
+        return None
+    # Only entries with "..", a drive or a leading separator can escape; skip normpath for the rest
+    return [
+        path for path in paths
+        if not (".." in path or ":" in path or path.startswith(("/", "\\"))) or is_safe_path(path)
+    ]
+
+
+def record_installed_files(install_path, added=(), removed=()):
+    """Add and remove relative paths in the install record the uninstaller works from."""
+    files = set(read_installed_files(install_path) or ())
+    files.update(path.replace(os.sep, "/") for path in added)
+    files.difference_update(path.replace(os.sep, "/") for path in removed)
+    record_path = os.path.join(install_path, INSTALL_RECORD_NAME)
+    with open(record_path + ".tmp", "w", encoding="utf-8") as record_file:
+        record_file.write("".join(f"{path}\n" for path in sorted(files)))
+    os.replace(record_path + ".tmp", record_path)
+
+
+def _scan_tree(directory):
+    """All files and directories below directory, from one os.scandir pass."""
+    files, directories, pending = [], [], [directory]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    pending.append(entry.path)
+                else:
+                    files.append(entry.path)
+    return files, directories
+
+
+def _sweep_leftovers(directories, kept):
+    """Delete what is left in these directories, deepest first, except kept files and their parents."""
+    protected = set(kept)
+    for path in kept:
+        parent = os.path.dirname(path)
+        while parent not in protected and parent != os.path.dirname(parent):
+            protected.add(parent)
+            parent = os.path.dirname(parent)
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+        for entry in entries:
+            if os.path.normcase(os.path.abspath(entry.path)) in protected:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def _remove_files(paths):
+    failed = []
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            failed.append(path)
+    return failed
+
+
+def remove_installation(install_path, keep=(), progress_callback=None, workers=REMOVE_WORKERS):
+    """Delete an installation, working from its install record when there is one.
+
+    Files are deleted in batches on a worker pool, then the emptied
+    directories deepest first; without a record the tree is listed in one
+    os.scandir pass. Directories from the record that are still not empty
+    afterwards hold files the program created itself; only those are swept,
+    never a path listed in keep (a running executable).
+    progress_callback(removed, total) is called once per batch.
+    Returns a dict with file counts, failures, the source of the file list,
+    the time spent building that list and the elapsed time.
+    """
+    start = time.perf_counter()
+    recorded = read_installed_files(install_path)
+    if recorded is None:
+        source = "scan"
+        files, directories = _scan_tree(install_path)
+    else:
+        source = "record"
+        prefix = os.path.join(os.path.abspath(install_path), "")
+        relative_directories = set()
+        for path in recorded:
+            directory = path.rpartition("/")[0]
+            while directory and directory not in relative_directories:
+                relative_directories.add(directory)
+                directory = directory.rpartition("/")[0]
+        # Joined as strings; os.path.join per file costs more than deleting it
+        files = [prefix + path.replace("/", os.sep) for path in recorded]
+        files.append(prefix + INSTALL_RECORD_NAME)
+        directories = [prefix + path.replace("/", os.sep) for path in relative_directories]
+
+    kept = {os.path.normcase(os.path.abspath(path)) for path in keep}
+    if kept:
+        files = [path for path in files if os.path.normcase(os.path.abspath(path)) not in kept]
+    listed = time.perf_counter() - start
+    batches = [files[i:i + REMOVE_BATCH_SIZE] for i in range(0, len(files), REMOVE_BATCH_SIZE)]
+
+    removed, failed = 0, []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_remove_files, batch): len(batch) for batch in batches}
+        for future in as_completed(futures):
+            batch_failed = future.result()
+            failed.extend(batch_failed)
+            removed += futures[future] - len(batch_failed)
+            if progress_callback is not None:
+                progress_callback(removed, len(files))
+
+    leftover = []
+    for directory in sorted(directories, key=len, reverse=True) + [install_path]:
+        try:
+            os.rmdir(directory)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            leftover.append(directory)  # Holds files we didn't install, or a kept file
+    if recorded is not None and leftover:
+        _sweep_leftovers(leftover, kept)
+
+    return {
+        "source": source,
+        "files": len(files),
+        "removed": removed,
+        "failed": failed,
+        "list_seconds": listed,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class InstallPipeline:
+    """Download, verify and extract a release archive in one overlapped pass.
+
+    The archive is hashed in order as it arrives: chunks that arrive ahead
+    of the hashed prefix are held in memory (up to HASH_BUFFER_SIZE) until
+    it reaches them, and only what doesn't fit, or was downloaded by an
+    earlier run, is read back from disk. ZIP entries are extracted into a
+    staging directory on a worker pool as soon as their bytes are on disk;
+    the downloader fetches the archive's tail in its own segment alongside
+    the body segments, so the central directory usually arrives early.
+    Once the hash checks out, the staged files are swapped into the install
+    directory with rollback. progress_callback(downloaded, download_total,
+    extracted, extract_total) is throttled and called from worker threads.
+    """
+
+    def __init__(self, download_url, archive_path, install_path, expected_sha256=None,
+                 progress_callback=None, workers=EXTRACT_WORKERS, session=None):
+        self.archive_path = archive_path
+        self.install_path = install_path
+        self.staging_path = os.path.join(install_path, STAGING_DIR_NAME)
+        self.expected_sha256 = expected_sha256
+        self.progress_callback = progress_callback
+        self.workers = workers
+
+        self.downloader = SegmentedDownloader(
+            download_url, archive_path, session=session, chunk_callback=self._on_chunk, finalize=False
+        )
+        self.part_path = self.downloader.part_path
+        self.digest = hashlib.sha256()
+        self.hashed = 0
+        self.hash_buffer = {}  # offset -> chunk that arrived ahead of the hashed prefix
+        self.hash_buffered = 0
+        self.hash_lock = threading.Lock()
+        self.data_arrived = threading.Condition()
+        self.download_done = False
+        self.download_error = None
+
+        self.local = threading.local()  # One ZipFile handle per extraction worker
+        self.archives = []
+        self.extracted = 0
+        self.extract_total = 0
+        self.extract_lock = threading.Lock()
+        self.last_report = 0.0
+        self.timings = {}
+
+    def cancel(self):
+        self.downloader.cancel()
+
+    def run(self):
+        """Install the archive; returns the list of installed paths."""
+        start = time.perf_counter()
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        os.makedirs(self.staging_path)
+
+        download_thread = threading.Thread(target=self._download, name="InstallDownload", daemon=True)
+        download_thread.start()
+
+        pending = None  # ZIP entries not yet extracted, once the central directory is in
+        futures = []
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                with self.data_arrived:
+                    if not self.download_done:
+                        self.data_arrived.wait(PROGRESS_INTERVAL)
+                    done = self.download_done
+                if self.download_error is not None:
+                    break
+                if pending is None:
+                    pending = self._read_entries(done)
+                if pending:
+                    still_pending = []
+                    for info, entry_start, entry_end in pending:
+                        if done or self._is_available(entry_start, entry_end):
+                            futures.append(executor.submit(self._extract, info))
+                        else:
+                            still_pending.append((info, entry_start, entry_end))
+                    pending = still_pending
+                self._report()
+                if done:
+                    break
+            if self.download_error is not None:
+                self.downloader.cancel()
+            for future in futures:
+                future.result()
+        except BaseException:
+            # A corrupt entry (CRC, BadZipFile) or an interruption: stop everything and leave nothing behind
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+            self._abort(download_thread)
+            raise
+        executor.shutdown()
+        download_thread.join()
+        self._close_handles()
+
+        if self.download_error is not None:
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+            raise self.download_error
+        self.timings["download_and_extract"] = time.perf_counter() - start
+
+        with self.hash_lock:
+            self._catch_up_hash()
+            actual_sha256 = self.digest.hexdigest()
+        if self.expected_sha256 and actual_sha256 != self.expected_sha256:
+            self._abort(download_thread)
+            raise InstallError("Downloaded archive failed verification.")
+
+        swap_start = time.perf_counter()
+        try:
+            installed = swap_in(self.staging_path, self.install_path)  # Rolls back the install directory itself
+        except BaseException:
+            self._abort(download_thread)
+            raise
+        record_installed_files(self.install_path, installed)
+        os.remove(self.part_path)
+        self.timings["swap"] = time.perf_counter() - swap_start
+        self._report(force=True)
+        return installed
+
+    def _abort(self, download_thread):
+        """Stop the download and delete the staging directory, the partial archive and its resume state."""
+        self.downloader.cancel()
+        download_thread.join()
+        self._close_handles()
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        self.downloader.discard_partial()
+
+    def _download(self):
+        try:
+            self.downloader.run()
+        except Exception as e:
+            self.download_error = e
+        with self.data_arrived:
+            self.download_done = True
+            self.data_arrived.notify_all()
+
+    def _on_chunk(self, offset, chunk):
+        """Hash the archive in order: in-order chunks directly, later ones once the prefix reaches them."""
+        with self.hash_lock:
+            if offset == self.hashed:
+                self.digest.update(chunk)
+                self.hashed += len(chunk)
+            elif offset > self.hashed and self.hash_buffered + len(chunk) <= HASH_BUFFER_SIZE:
+                self.hash_buffer[offset] = chunk
+                self.hash_buffered += len(chunk)
+            self._catch_up_hash()
+        with self.data_arrived:
+            self.data_arrived.notify_all()
+
+    def _catch_up_hash(self):
+        """Hash data that arrived out of order and is now contiguous with the hashed prefix."""
+        end = self.downloader.available_until(self.hashed)
+        part_file = None
+        try:
+            while self.hashed < end:
+                chunk = self.hash_buffer.pop(self.hashed, None)
+                if chunk is not None:
+                    self.hash_buffered -= len(chunk)
+                    self.digest.update(chunk)
+                    self.hashed += len(chunk)
+                    continue
+                # Not buffered: it didn't fit, or an earlier run downloaded it. Read up to the next buffered chunk.
+                stop = min((offset for offset in self.hash_buffer if self.hashed < offset < end), default=end)
+                if part_file is None:
+                    part_file = open(self.part_path, "rb")
+                part_file.seek(self.hashed)
+                data = part_file.read(min(HASH_READ_SIZE, stop - self.hashed))
+                if not data:
+                    break
+                self.digest.update(data)
+                self.hashed += len(data)
+        finally:
+            if part_file is not None:
+                part_file.close()
+
+    def _is_available(self, start, end):
+        return self.downloader.available_until(start) >= end
+
+    def _read_entries(self, done):
+        """Return [(ZipInfo, start, end)] once the central directory is downloaded, else None."""
+        size = self.downloader.total_size
+        if not done and not size:
+            return None
+        if not done:
+            tail_start = max(0, size - MAX_ZIP_COMMENT - 22)
+            if not self._is_available(tail_start, size):
+                return None
+            with open(self.part_path, "rb") as part_file:
+                part_file.seek(tail_start)
+                tail = part_file.read()
+            index = tail.rfind(END_OF_CENTRAL_DIRECTORY)
+            if index < 0 or len(tail) < index + 22:
+                return None
+            directory_size, directory_offset = struct.unpack("<II", tail[index + 12:index + 20])
+            if directory_offset == 0xFFFFFFFF or not self._is_available(directory_offset, size):
+                return None  # ZIP64 archives are only read once complete
+
+        with zipfile.ZipFile(self.part_path) as archive:
+            infos = sorted(archive.infolist(), key=lambda info: info.header_offset)
+            directory_start = archive.start_dir
+        entries = []
+        for index, info in enumerate(infos):
+            end = infos[index + 1].header_offset if index + 1 < len(infos) else directory_start
+            if not info.is_dir():
+                entries.append((info, info.header_offset, end))
+        self.extract_total = sum(info.file_size for info, _, _ in entries)
+        return entries
+
+    def _extract(self, info):
+        archive = getattr(self.local, "archive", None)
+        if archive is None:
+            archive = zipfile.ZipFile(self.part_path)
+            self.local.archive = archive
+            with self.extract_lock:
+                self.archives.append(archive)
+        try:
+            archive.extract(info, self.staging_path)
+        except FileExistsError:
+            archive.extract(info, self.staging_path)  # Another worker created the same parent directory first
+        with self.extract_lock:
+            self.extracted += info.file_size
+        self._report()
+
+    def _close_handles(self):
+        for archive in self.archives:
+            archive.close()
+        self.archives = []
+
+    def _report(self, force=False):
+        if self.progress_callback is None:
+            return
+        now = time.monotonic()
+        with self.extract_lock:
+            if not force and now - self.last_report < PROGRESS_INTERVAL:
+                return
+            self.last_report = now
+        self.progress_callback(
+            self.downloader.downloaded, self.downloader.total_size, self.extracted, self.extract_total
+        )
@@ -0,0 +1,42 @@
+from PyQt5.QtCore import QBuffer, QIODevice
+from PyQt5.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob
+
+INTERNAL_SCHEME = b"foxbr"
+
+
+def register_internal_scheme():
+    """Declare the foxbr:// scheme; must be called before QApplication is created."""
+    scheme = QWebEngineUrlScheme(INTERNAL_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.LocalScheme | QWebEngineUrlScheme.LocalAccessAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class InternalPages(QWebEngineUrlSchemeHandler):
+    """Serve foxbr://<host>/<path> pages rendered by Python callbacks.
+
+    add_page(host, render) registers render(path) -> (content_type, body),
+    both bytes. Pages are rendered on the UI thread when requested.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pages = {}
+
+    def add_page(self, host, render):
+        self.pages[host] = render
+
+    def install(self, profile):
+        profile.installUrlSchemeHandler(INTERNAL_SCHEME, self)
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        render = self.pages.get(url.host())
+        if render is None:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+        content_type, body = render(url.path())
+        buffer = QBuffer(job)  # Lives as long as the request
+        buffer.setData(body)
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(content_type, buffer)
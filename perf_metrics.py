@@ -0,0 +1,194 @@
+import os
+import html
+import json
+import time
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+LOAD_HISTORY_SIZE = 500  # Page loads kept in the ring buffer
+SAMPLE_INTERVAL_MS = 5 * 1000  # How often renderer memory and CPU are sampled
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# Navigation Timing of the current document, in milliseconds
+NAVIGATION_TIMING_SCRIPT = """
+(function () {
+    var n = performance.getEntriesByType("navigation")[0];
+    if (!n) return null;
+    return {
+        dns: n.domainLookupEnd - n.domainLookupStart,
+        connect: n.connectEnd - n.connectStart,
+        ttfb: n.responseStart - n.requestStart,
+        response: n.responseEnd - n.responseStart,
+        dom_interactive: n.domInteractive,
+        dom_content_loaded: n.domContentLoadedEventEnd,
+        load_event: n.loadEventEnd,
+        transfer_size: n.transferSize
+    };
+})()
+"""
+
+
+def read_process_stats(pid):
+    """(RSS in KiB, CPU ticks used) of a process from /proc, or None if unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as status_file:
+            rss_kb = next((int(line.split()[1]) for line in status_file if line.startswith("VmRSS:")), 0)
+        with open(f"/proc/{pid}/stat", "r") as stat_file:
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        return rss_kb, int(fields[11]) + int(fields[12])  # utime + stime
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+
+class TabMetrics:
+    """Latest measurements for one tab."""
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.load_started = None
+        self.load_ms = None
+        self.navigation = None
+        self.pid = 0
+        self.rss_kb = None
+        self.cpu_percent = None
+
+    def to_dict(self):
+        url = self.tab.url.toString() if self.tab.url is not None else ""
+        return {
+            "tab_id": self.tab.id, "title": self.tab.title, "url": url, "pid": self.pid,
+            "load_ms": self.load_ms, "navigation": self.navigation,
+            "rss_kb": self.rss_kb, "cpu_percent": self.cpu_percent,
+        }
+
+
+class PerfMonitor(QObject):
+    """Per-tab load timing, Navigation Timing and renderer memory/CPU.
+
+    Finished loads go into a fixed-size ring buffer; renderer processes are
+    sampled on a timer, once per process however many tabs share it.
+    Everything is served at foxbr://perf, and as JSON at foxbr://perf/json.
+    """
+
+    def __init__(self, parent, tabs, history_size=LOAD_HISTORY_SIZE):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.metrics = {}
+        self.loads = deque(maxlen=history_size)
+        self.process_samples = {}  # pid -> (rss_kb, cpu_ticks, monotonic time)
+
+        self.sample_timer = QTimer(self)
+        self.sample_timer.setInterval(SAMPLE_INTERVAL_MS)
+        self.sample_timer.timeout.connect(self.sample_processes)
+        self.sample_timer.start()
+
+    def attach(self, tab, browser):
+        """Instrument a tab's view; the view pool disconnects this when it takes the view back."""
+        metrics = self.metrics.get(tab)
+        if metrics is None:
+            metrics = self.metrics[tab] = TabMetrics(tab)
+        browser.loadStarted.connect(lambda: self._on_load_started(metrics))
+        browser.loadFinished.connect(lambda ok: self._on_load_finished(metrics, browser, ok))
+
+    def detach(self, tab):
+        self.metrics.pop(tab, None)
+
+    def memory_mb(self, browser):
+        """Renderer memory of a view from the latest sample (read now if never sampled), or None."""
+        pid = self._renderer_pid(browser)
+        if not pid:
+            return None
+        sample = self.process_samples.get(pid)
+        if sample is None:
+            stats = read_process_stats(pid)
+            if stats is None:
+                return None
+            sample = self.process_samples[pid] = (stats[0], stats[1], time.monotonic())
+        return sample[0] / 1024
+
+    def sample_processes(self):
+        """Read memory and CPU of every live renderer process."""
+        now = time.monotonic()
+        samples = {}
+        for tab, metrics in self.metrics.items():
+            pid = self._renderer_pid(tab.browser)
+            metrics.pid = pid
+            if not pid:
+                metrics.rss_kb = metrics.cpu_percent = None
+                continue
+            if pid not in samples:
+                stats = read_process_stats(pid)
+                if stats is None:
+                    continue
+                rss_kb, ticks = stats
+                cpu_percent = None
+                previous = self.process_samples.get(pid)
+                if previous is not None and now > previous[2]:
+                    cpu_percent = (ticks - previous[1]) / CLOCK_TICKS / (now - previous[2]) * 100
+                samples[pid] = (rss_kb, ticks, now, cpu_percent)
+            metrics.rss_kb, _, _, metrics.cpu_percent = samples[pid]
+        self.process_samples = {pid: sample[:3] for pid, sample in samples.items()}
+
+    def snapshot(self):
+        return {
+            "time": time.time(),
+            "tabs": [self.metrics[tab].to_dict() for tab in self.tabs if tab in self.metrics],
+            "loads": list(self.loads),
+        }
+
+    def render_page(self, path):
+        """foxbr://perf handler: an HTML report, or JSON for /json."""
+        snapshot = self.snapshot()
+        if path.rstrip("/") == "/json":
+            return b"application/json", json.dumps(snapshot, indent=2).encode("utf-8")
+
+        def cell(value, unit=""):
+            return "" if value is None else f"{value:.0f}{unit}" if isinstance(value, float) else f"{value}{unit}"
+
+        tab_rows = "".join(
+            f"<tr><td>{html.escape(t['title'])}</td><td>{t['pid'] or ''}</td><td>{cell(t['load_ms'], ' ms')}</td>"
+            f"<td>{cell(t['rss_kb'] and t['rss_kb'] / 1024, ' MB')}</td><td>{cell(t['cpu_percent'], '%')}</td></tr>"
+            for t in sorted(snapshot["tabs"], key=lambda t: t["rss_kb"] or 0, reverse=True)
+        )
+        load_rows = "".join(
+            f"<tr><td>{html.escape(load['url'])}</td><td>{cell(load['load_ms'], ' ms')}</td>"
+            f"<td>{cell((load['navigation'] or {}).get('ttfb'), ' ms')}</td><td>{'ok' if load['ok'] else 'failed'}</td></tr>"
+            for load in reversed(snapshot["loads"])
+        )
+        page = (
+            "<html><head><title>Performance</title><style>"
+            "body{font-family:sans-serif;margin:20px}table{border-collapse:collapse;margin-bottom:24px}"
+            "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}</style></head><body>"
+            "<h1>Performance</h1><p><a href='foxbr://perf/json'>Export as JSON</a></p>"
+            "<h2>Tabs</h2><table><tr><th>Tab</th><th>Renderer PID</th><th>Last load</th><th>Memory</th><th>CPU</th></tr>"
+            f"{tab_rows}</table>"
+            "<h2>Recent loads</h2><table><tr><th>URL</th><th>Load</th><th>Time to first byte</th><th>Result</th></tr>"
+            f"{load_rows}</table></body></html>"
+        )
+        return b"text/html", page.encode("utf-8")
+
+    def _on_load_started(self, metrics):
+        metrics.load_started = time.perf_counter()
+
+    def _on_load_finished(self, metrics, browser, ok):
+        if metrics.load_started is None or browser.url().scheme() == "data":
+            return  # Placeholder content
+        metrics.load_ms = (time.perf_counter() - metrics.load_started) * 1000
+        metrics.load_started = None
+        metrics.pid = self._renderer_pid(browser)
+        load = {
+            "tab_id": metrics.tab.id, "url": browser.url().toString(), "time": time.time(),
+            "load_ms": metrics.load_ms, "ok": ok, "pid": metrics.pid, "navigation": None,
+        }
+        self.loads.append(load)
+
+        def on_navigation_timing(result):
+            if isinstance(result, dict):
+                metrics.navigation = load["navigation"] = result
+        browser.page().runJavaScript(NAVIGATION_TIMING_SCRIPT, QWebEngineScript.ApplicationWorld, on_navigation_timing)
+
+    def _renderer_pid(self, browser):
+        if browser is None:
+            return 0
+        page = browser.page()
+        return page.renderProcessPid() if hasattr(page, "renderProcessPid") else 0
@@ -0,0 +1,190 @@
+import os
+import json
+import threading
+from app_paths import data_path
+
+SNAPSHOT_FILENAME = "session.json"
+JOURNAL_FILENAME = "session.journal"
+FLUSH_INTERVAL = 2.0  # Seconds between journal writes while browsing
+COMPACT_AFTER = 500  # Journal records written before the snapshot is rewritten
+
+
+class SessionJournal:
+    """Write-behind journal of open tabs, compacted into a snapshot from time to time.
+
+    The GUI thread only queues records; a writer thread appends them to the
+    journal, merging repeated updates of the same tab so title and URL storms
+    cost a single line per flush.
+    """
+
+    def __init__(self, directory=None, flush_interval=FLUSH_INTERVAL, compact_after=COMPACT_AFTER):
+        directory = directory or os.path.dirname(data_path("session", SNAPSHOT_FILENAME))
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILENAME)
+        self.journal_path = os.path.join(directory, JOURNAL_FILENAME)
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+
+        self.lock = threading.Lock()
+        self.pending = []
+        self.pending_updates = {}  # Tab id -> pending update record, merged in place
+        self.wake = threading.Event()
+        self.stopped = False
+
+        # Session state mirrored by the writer thread, used for compaction
+        self.order = []
+        self.entries = {}
+        self.active_id = None
+        self.records_since_compaction = 0
+        self.bytes_written = 0
+
+        self.thread = threading.Thread(target=self._run, name="SessionWriter", daemon=True)
+        self.thread.start()
+
+    def load(self):
+        """Read the saved session as (entries in tab order, index of the active tab)."""
+        order, entries, active_id = [], {}, None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            for entry in snapshot.get("tabs", []):
+                order.append(entry["id"])
+                entries[entry["id"]] = entry
+            active_id = snapshot.get("active")
+        except (OSError, ValueError, KeyError):
+            pass
+
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # A torn write at the end of the journal
+                    active_id = self._apply(record, order, entries, active_id)
+        except OSError:
+            pass
+
+        tabs = [entries[tab_id] for tab_id in order]
+        active_index = order.index(active_id) if active_id in entries else 0
+        return tabs, active_index
+
+    def reset(self, tabs, active_tab):
+        """Start a fresh session from the given tabs (after a restore)."""
+        with self.lock:
+            self.pending = [{"op": "reset"}]
+            self.pending_updates = {}
+            for tab in tabs:
+                self.pending.append(self._open_record(tab, tab.index))
+            if active_tab is not None:
+                self.pending.append({"op": "active", "id": active_tab.id})
+        self.wake.set()
+
+    def tab_opened(self, tab):
+        self._queue(self._open_record(tab, tab.index))
+
+    def tab_closed(self, tab):
+        self._queue({"op": "close", "id": tab.id})
+
+    def tab_activated(self, tab):
+        self._queue({"op": "active", "id": tab.id})
+
+    def tab_updated(self, tab, url=None, title=None):
+        """Record a new URL or title, merged with any update still pending for this tab."""
+        fields = {}
+        if url is not None:
+            fields["url"] = url
+        if title is not None:
+            fields["title"] = title
+        if not fields:
+            return
+        with self.lock:
+            record = self.pending_updates.get(tab.id)
+            if record is None:
+                record = {"op": "update", "id": tab.id}
+                self.pending_updates[tab.id] = record
+                self.pending.append(record)
+            record.update(fields)
+
+    def close(self):
+        """Flush pending records, write a compact snapshot and stop the writer."""
+        with self.lock:
+            self.stopped = True
+        self.wake.set()
+        self.thread.join()
+
+    def _open_record(self, tab, index):
+        url = tab.url.toString() if hasattr(tab.url, "toString") else (tab.url or "")
+        return {"op": "open", "id": tab.id, "index": index, "url": url, "title": tab.title}
+
+    def _queue(self, record):
+        with self.lock:
+            self.pending.append(record)
+            if record["op"] == "close":
+                self.pending_updates.pop(record["id"], None)
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            with self.lock:
+                records, self.pending, self.pending_updates = self.pending, [], {}
+                stopped = self.stopped
+            try:
+                self._write(records)
+                dirty = self.records_since_compaction > 0
+                if self.records_since_compaction >= self.compact_after or (stopped and dirty):
+                    self._compact()
+            except OSError as e:
+                print(f"Failed to save session: {e}")
+            if stopped:
+                return
+
+    def _write(self, records):
+        if not records:
+            return
+        lines = []
+        for record in records:
+            if record["op"] == "reset":
+                self.order, self.entries, self.active_id = [], {}, None
+                self.records_since_compaction = self.compact_after  # Force a compaction
+                continue
+            self.active_id = self._apply(record, self.order, self.entries, self.active_id)
+            lines.append(json.dumps(record, separators=(",", ":")))
+        if lines:
+            data = "\n".join(lines) + "\n"
+            with open(self.journal_path, "a", encoding="utf-8") as journal_file:
+                journal_file.write(data)
+            self.bytes_written += len(data)
+            self.records_since_compaction += len(lines)
+
+    def _compact(self):
+        """Replace the snapshot with the current state and empty the journal."""
+        snapshot = {
+            "tabs": [self.entries[tab_id] for tab_id in self.order],
+            "active": self.active_id,
+        }
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+            json.dump(snapshot, snapshot_file, separators=(",", ":"))
+        os.replace(temp_path, self.snapshot_path)
+        open(self.journal_path, "w").close()
+        self.records_since_compaction = 0
+
+    @staticmethod
+    def _apply(record, order, entries, active_id):
+        """Apply one journal record to a session state; returns the active tab id."""
+        op = record.get("op")
+        tab_id = record.get("id")
+        if op == "open":
+            entries[tab_id] = {"id": tab_id, "url": record.get("url", ""), "title": record.get("title", "")}
+            order.insert(min(record.get("index", len(order)), len(order)), tab_id)
+        elif op == "update" and tab_id in entries:
+            for field in ("url", "title"):
+                if field in record:
+                    entries[tab_id][field] = record[field]
+        elif op == "close" and tab_id in entries:
+            del entries[tab_id]
+            order.remove(tab_id)
+        elif op == "active":
+            active_id = tab_id
+        return active_id
@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from app_paths import data_path
+
+SERVER_PREFIX = "FoxBr-"
+CONNECT_TIMEOUT_MS = 200  # A running instance accepts at once; longer means there is none
+ACK_TIMEOUT_MS = 2000
+NEW_INSTANCE_FLAG = "--new-instance"  # Start a separate browser even if one is running
+ASFW_ANY = -1
+
+
+def server_name():
+    """Local socket name for this user's profile; separate data directories get separate instances."""
+    profile_dir = os.path.dirname(data_path("instance"))
+    return SERVER_PREFIX + hashlib.sha1(os.path.normcase(profile_dir).encode("utf-8")).hexdigest()[:16]
+
+
+def forward_to_running_instance(args):
+    """Hand the launch arguments to a running browser; returns False if there is none."""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    if os.name == "nt":
+        import ctypes  # Let the running instance bring its window to the front
+        ctypes.windll.user32.AllowSetForegroundWindow(ASFW_ANY)
+
+    socket.write(json.dumps({"args": args, "cwd": os.getcwd()}).encode("utf-8") + b"\n")
+    socket.waitForBytesWritten(ACK_TIMEOUT_MS)
+    if not socket.waitForReadyRead(ACK_TIMEOUT_MS):
+        print("The running FoxBr did not answer; it will open the request when it is responsive.")
+    socket.disconnectFromServer()
+    return True
+
+
+def urls_from_args(args, cwd=None):
+    """Addresses and local files among launch arguments, as URLs to open."""
+    urls = []
+    for arg in args:
+        if arg.startswith("-"):
+            continue
+        # Existing files relative to the launch directory, else web addresses ("example.com" -> http)
+        urls.append(QUrl.fromUserInput(arg, cwd or os.getcwd()).toString())
+    return urls
+
+
+class InstanceServer(QObject):
+    """Listen for later launches and pass on their arguments.
+
+    Each launch connects, sends one JSON line with its arguments and
+    working directory, and waits for "ok" before exiting.
+    """
+
+    launch_requested = pyqtSignal(list, str)  # Arguments, working directory
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)  # Other users can't open tabs here
+        self.buffers = {}
+        self.requests = 0
+        name = server_name()
+        if not self.server.listen(name):
+            probe = QLocalSocket()
+            probe.connectToServer(name)
+            if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+                print("Another FoxBr instance is already listening; this one won't take launches.")
+                return
+            # A crashed instance can leave its socket behind
+            QLocalServer.removeServer(name)
+            if not self.server.listen(name):
+                print(f"Single-instance server unavailable: {self.server.errorString()}")
+        self.server.newConnection.connect(self._on_new_connection)
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_ready_read(self, socket):
+        data = self.buffers.get(socket, b"") + socket.readAll().data()
+        if b"\n" not in data:
+            self.buffers[socket] = data
+            return
+        self.buffers[socket] = b""
+        try:
+            message = json.loads(data.split(b"\n", 1)[0].decode("utf-8"))
+            args, cwd = list(message["args"]), str(message.get("cwd", ""))
+        except (ValueError, KeyError, TypeError):
+            socket.disconnectFromServer()
+            return
+        socket.write(b"ok\n")
+        socket.flush()
+        self.requests += 1
+        self.launch_requested.emit(args, cwd)
+
+    def _on_disconnected(self, socket):
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
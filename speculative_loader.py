@@ -0,0 +1,182 @@
+import json
+import time
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+from history import normalize_url
+
+PRERENDER_MIN_CHARS = 4  # Typed characters before a history match is trusted enough to preload
+PRERENDER_TTL_MS = 30 * 1000  # An unused preloaded page is dropped after this long
+PRERENDERS_PER_MINUTE = 6
+PRECONNECTS_PER_MINUTE = 30
+PRECONNECT_REUSE_SECONDS = 10  # Don't warm the same origin again within this time
+
+# Ask Chromium's network stack to resolve and connect to an origin ahead of a navigation
+PRECONNECT_SCRIPT = """
+(function (origin) {
+    ["dns-prefetch", "preconnect"].forEach(function (rel) {
+        var link = document.createElement("link");
+        link.rel = rel;
+        link.href = origin;
+        document.head.appendChild(link);
+    });
+})(%s)
+"""
+
+
+def same_destination(first, second):
+    """Compare URLs the way the omnibox treats them: scheme, "www." and a trailing "/" don't matter."""
+    return normalize_url(first).rstrip("/") == normalize_url(second).rstrip("/")
+
+
+def origin_of(url):
+    return QUrl(url).adjusted(QUrl.RemovePath | QUrl.RemoveQuery | QUrl.RemoveFragment).toString()
+
+
+def strong_match(typed, url):
+    """Whether url is safe and likely enough to preload for the typed text.
+
+    Only http(s) pages qualify, and only when the typed text already spells
+    out the whole host and the URL has no query string: loading a page can
+    change state (logout links, form actions, internal foxbr:// pages), so a
+    guess is never allowed to pick one.
+    """
+    if not url.startswith(("http://", "https://")) or QUrl(url).hasQuery():
+        return False
+    typed = normalize_url(typed.strip())
+    key = normalize_url(url)
+    host = key.split("/", 1)[0]
+    return len(typed) >= PRERENDER_MIN_CHARS and key.startswith(typed) and len(typed) > len(host)
+
+
+class SpeculativeLoader(QObject):
+    """Warm up likely omnibox destinations while the user is still typing.
+
+    Any destination the typed text points at gets a DNS prefetch and
+    preconnect, issued from a hidden page so the connections land in the
+    profile's shared socket pool. A confident history match is preloaded
+    into a hidden, muted view, which take() hands over when Enter is
+    pressed for the same destination. Per-minute budgets cap both, and a
+    preload is cancelled as soon as the typed text stops pointing at it.
+    Only http(s) destinations are warmed; see strong_match() for preloads.
+    """
+
+    def __init__(self, parent, view_pool, enabled=True):
+        super().__init__(parent)
+        self.view_pool = view_pool
+        self.enabled = enabled
+        self.hint_view = None  # Hidden page that issues preconnect hints, created on first use
+        self.preconnected = {}  # Origin -> time it was last warmed
+        self.preconnect_times = deque()
+        self.prerender_times = deque()
+        self.prerender_view = None
+        self.prerender_url = None
+
+        self.expiry_timer = QTimer(self)
+        self.expiry_timer.setSingleShot(True)
+        self.expiry_timer.setInterval(PRERENDER_TTL_MS)
+        self.expiry_timer.timeout.connect(self.cancel)
+
+        self.preconnects = 0
+        self.preconnect_hits = 0
+        self.prerenders = 0
+        self.prerender_hits = 0
+        self.prerender_misses = 0
+        self.over_budget = 0
+
+    def on_input(self, url):
+        """The typed text now resolves to url; warm its origin."""
+        if not self.enabled:
+            return
+        if self.prerender_url is not None and not same_destination(self.prerender_url, url):
+            self.cancel()
+        self.preconnect(url)
+
+    def on_suggestions(self, query, suggestions):
+        """Preload the top history suggestion when the typed text is a strong match for its URL."""
+        if not self.enabled:
+            return
+        top = next((s for s in suggestions if s[0] == "history"), None)
+        if top is None or not strong_match(query, top[1]):
+            return
+        self.preconnect(top[1])
+        self.prerender(top[1])
+
+    def preconnect(self, url):
+        origin = origin_of(url)
+        if not origin.startswith(("http://", "https://")):
+            return
+        now = time.monotonic()
+        if now - self.preconnected.get(origin, float("-inf")) < PRECONNECT_REUSE_SECONDS:
+            return
+        if not self._within_budget(self.preconnect_times, PRECONNECTS_PER_MINUTE, now):
+            return
+        # Forget origins warmed over a minute ago; their connections have likely closed
+        self.preconnected = {o: t for o, t in self.preconnected.items() if now - t < 60}
+        if self.hint_view is None:
+            self.hint_view = QWebEngineView()
+            self.hint_view.setPage(QWebEnginePage(self.view_pool.profile, self.hint_view))
+            self.hint_view.setHtml("<html><head></head></html>")
+        self.hint_view.page().runJavaScript(PRECONNECT_SCRIPT % json.dumps(origin))
+        self.preconnected[origin] = now
+        self.preconnects += 1
+
+    def prerender(self, url):
+        if not url.startswith(("http://", "https://")):
+            return
+        if self.prerender_url is not None and same_destination(self.prerender_url, url):
+            return
+        if not self._within_budget(self.prerender_times, PRERENDERS_PER_MINUTE, time.monotonic()):
+            return
+        self.cancel()
+        view = self.view_pool.acquire()
+        view.page().setAudioMuted(True)
+        view.setUrl(QUrl(url))
+        self.prerender_view = view
+        self.prerender_url = url
+        self.prerenders += 1
+        self.expiry_timer.start()
+
+    def take(self, url):
+        """Return the preloaded view if it is for url (unmuted, ready to show), else None."""
+        if origin_of(url) in self.preconnected:
+            self.preconnect_hits += 1
+        if self.prerender_view is None or not same_destination(self.prerender_url, url):
+            self.cancel()
+            return None
+        view = self.prerender_view
+        self.prerender_view = self.prerender_url = None
+        self.expiry_timer.stop()
+        view.page().setAudioMuted(False)
+        self.prerender_hits += 1
+        return view
+
+    def cancel(self):
+        """Drop the preloaded page, if any, stopping its load."""
+        if self.prerender_view is None:
+            return
+        self.expiry_timer.stop()
+        view, self.prerender_view, self.prerender_url = self.prerender_view, None, None
+        view.stop()
+        view.page().setAudioMuted(False)
+        self.view_pool.release(view)
+        self.prerender_misses += 1
+
+    def stats(self):
+        return {
+            "preconnects": self.preconnects,
+            "preconnect_hits": self.preconnect_hits,
+            "prerenders": self.prerenders,
+            "prerender_hits": self.prerender_hits,
+            "prerender_misses": self.prerender_misses,
+            "over_budget": self.over_budget,
+        }
+
+    def _within_budget(self, times, per_minute, now):
+        while times and now - times[0] > 60:
+            times.popleft()
+        if len(times) >= per_minute:
+            self.over_budget += 1
+            return False
+        times.append(now)
+        return True
@@ -0,0 +1,52 @@
+import sys
+import time
+from PyQt5.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+
+class StartupTrace(QObject):
+    """Record startup phase timings and tell when the first frame was painted."""
+
+    first_paint = pyqtSignal()
+
+    def __init__(self, start_time, enabled=False):
+        super().__init__()
+        self.start_time = start_time
+        self.last_time = start_time
+        self.enabled = enabled  # Print each phase as it completes (--startup-trace)
+        self.phases = []
+        self.painted = False
+
+    def mark(self, phase):
+        """Record the end of a startup phase."""
+        now = time.perf_counter()
+        delta, total = now - self.last_time, now - self.start_time
+        self.last_time = now
+        self.phases.append((phase, delta, total))
+        if self.enabled:
+            print(f"[Startup] {phase:<24} +{delta * 1000:8.1f} ms  (total {total * 1000:8.1f} ms)", file=sys.stderr)
+
+    def watch_first_paint(self):
+        """Watch application events until any widget paints."""
+        QApplication.instance().installEventFilter(self)
+
+    def watch_page_load(self, browser):
+        """Mark the first real page load of a view (not its placeholder HTML)."""
+        def on_load_finished(ok):
+            if browser.url().scheme() == "data":
+                return
+            browser.loadFinished.disconnect(on_load_finished)
+            self.mark("first page load" if ok else "first page load (failed)")
+        browser.loadFinished.connect(on_load_finished)
+
+    def eventFilter(self, source, event):
+        if not self.painted and event.type() == QEvent.Paint:
+            self.painted = True
+            QApplication.instance().removeEventFilter(self)
+            # Let the paint finish before reporting it
+            QTimer.singleShot(0, self._on_first_paint)
+        return False
+
+    def _on_first_paint(self):
+        self.mark("first paint")
+        self.first_paint.emit()
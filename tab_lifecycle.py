@@ -0,0 +1,231 @@
+import time
+from collections import Counter
+from PyQt5.QtCore import QObject, QTimer, QPointF
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+# Lifecycle states a tab can be in
+STATE_ACTIVE = "active"
+STATE_BACKGROUND = "background"
+STATE_FROZEN = "frozen"
+STATE_DISCARDED = "discarded"
+
+FREEZE_AFTER_SECONDS = 5 * 60  # Idle time before a background tab is frozen
+MAX_LIVE_TABS = 20  # Live views kept before the least recently used are discarded
+MEMORY_BUDGET_MB = 2048  # Combined renderer memory allowed for live views
+ESTIMATED_TAB_MEMORY_MB = 120  # Used when a renderer's memory can't be read
+SWEEP_INTERVAL_MS = 10 * 1000  # How often background tabs are checked
+
+
+class TabRecord:
+    """Lifecycle bookkeeping for a single tab."""
+
+    def __init__(self, tab, browser):
+        self.tab = tab
+        self.browser = browser
+        self.state = STATE_BACKGROUND
+        self.last_active = time.monotonic()
+        self.url = None
+        self.title = None
+        self.icon = None
+        self.scroll_position = QPointF()
+
+
+class TabLifecycleManager(QObject):
+    """Freeze idle background tabs and discard the least recently used ones."""
+
+    def __init__(self, parent, create_view, freeze_after=FREEZE_AFTER_SECONDS,
+                 max_live_tabs=MAX_LIVE_TABS, memory_budget_mb=MEMORY_BUDGET_MB):
+        super().__init__(parent)
+        self.parent = parent
+        self.create_view = create_view  # Callable rebuilding the view of a tab
+        self.freeze_after = freeze_after
+        self.max_live_tabs = max_live_tabs
+        self.memory_budget_mb = memory_budget_mb
+        self.records = {}
+        self.active_record = None
+        self.discard_count = 0
+        self.restore_count = 0
+
+        self.sweep_timer = QTimer(self)
+        self.sweep_timer.setInterval(SWEEP_INTERVAL_MS)
+        self.sweep_timer.timeout.connect(self.sweep)
+        self.sweep_timer.start()
+
+    def register(self, tab, browser):
+        """Start tracking a newly created tab."""
+        self.records[tab] = TabRecord(tab, browser)
+
+    def register_placeholder(self, tab, url):
+        """Track a tab that has no view yet; it is built on first activation."""
+        record = TabRecord(tab, None)
+        record.state = STATE_DISCARDED
+        record.url = url
+        record.title = tab.title
+        self.records[tab] = record
+
+    def unregister(self, tab):
+        """Stop tracking a closed tab."""
+        record = self.records.pop(tab, None)
+        if record is self.active_record:
+            self.active_record = None
+
+    def replace_view(self, tab, browser):
+        """Track a new live view for a tab, e.g. a preloaded page swapped in."""
+        record = self.records.get(tab)
+        if record is not None:
+            record.browser = browser
+
+    def browser_for(self, tab):
+        """Return the live view for a tab, rebuilding it if it was discarded."""
+        record = self.records.get(tab)
+        if record is None:
+            return None
+        if record.state == STATE_DISCARDED:
+            self.restore(record)
+        return record.browser
+
+    def activate(self, tab):
+        """Mark a tab as the active one and wake it up if needed."""
+        record = self.records.get(tab)
+        if record is None:
+            return
+        if self.active_record is not None and self.active_record is not record:
+            self.active_record.state = STATE_BACKGROUND
+            self.active_record.last_active = time.monotonic()
+
+        if record.state == STATE_DISCARDED:
+            self.restore(record)
+        elif record.state == STATE_FROZEN:
+            self._set_page_state(record.browser, "Active")
+
+        record.state = STATE_ACTIVE
+        record.last_active = time.monotonic()
+        self.active_record = record
+        self.enforce_budget()
+
+    def sweep(self):
+        """Freeze idle background tabs, then trim live views to the budget."""
+        now = time.monotonic()
+        for record in self.records.values():
+            if record.state == STATE_BACKGROUND and now - record.last_active >= self.freeze_after:
+                self.freeze(record)
+        self.enforce_budget()
+
+    def freeze(self, record):
+        """Suspend timers and scripts of a background tab."""
+        if record.state != STATE_BACKGROUND or self._is_busy(record.browser):
+            return
+        if self._set_page_state(record.browser, "Frozen"):
+            record.state = STATE_FROZEN
+
+    def enforce_budget(self):
+        """Discard least recently used tabs beyond the count or memory budget."""
+        live = [r for r in self.records.values() if r.state != STATE_DISCARDED]
+        candidates = sorted(
+            (r for r in live if r is not self.active_record and not self._is_busy(r.browser)),
+            key=lambda r: r.last_active
+        )
+        live_count = len(live)
+
+        # Tabs can share a renderer process: count each process once, and only
+        # count its memory as freed once its last view is discarded
+        views_per_process = Counter(self._process_key(r.browser) for r in live)
+        process_memory = {self._process_key(r.browser): self._memory_mb(r.browser) for r in live}
+        memory_mb = sum(process_memory.values())
+        discardable = set(candidates)
+        pinned = {self._process_key(r.browser) for r in live if r not in discardable}
+
+        for record in candidates:
+            over_count = live_count > self.max_live_tabs
+            if not over_count and memory_mb <= self.memory_budget_mb:
+                break
+            key = self._process_key(record.browser)
+            if not over_count and key in pinned:
+                continue  # The process stays up for the active or a busy tab; nothing would be freed
+            self.discard(record)
+            live_count -= 1
+            views_per_process[key] -= 1
+            if views_per_process[key] == 0:
+                memory_mb -= process_memory.pop(key)
+
+    def discard(self, record):
+        """Destroy the view of a tab, keeping only what is needed to rebuild it."""
+        browser = record.browser
+        if browser is None or record.state == STATE_DISCARDED:
+            return
+        record.url = browser.url()
+        record.title = browser.title()
+        record.icon = browser.icon()
+        record.scroll_position = browser.page().scrollPosition()
+
+        self.parent.ui_updates.cancel(browser)
+        self.parent.content_stack.removeWidget(browser)
+        self.parent.tabs.set_browser(record.tab, None)
+        self.parent.view_pool.release(browser)
+        record.browser = None
+        record.state = STATE_DISCARDED
+        self.discard_count += 1
+
+    def restore(self, record):
+        """Rebuild the view of a discarded tab and return to its scroll position."""
+        record.tab.restoring = True
+        browser = self.create_view(record.tab, record.url)
+        record.browser = browser
+        record.state = STATE_BACKGROUND
+        record.last_active = time.monotonic()
+        self.restore_count += 1
+
+        scroll_position = record.scroll_position
+        if not scroll_position.isNull():
+            def restore_scroll(ok):
+                if browser.url().scheme() == "data":
+                    return  # The pool's placeholder content, not the restored page
+                browser.loadFinished.disconnect(restore_scroll)
+                if ok:
+                    browser.page().runJavaScript(
+                        f"window.scrollTo({scroll_position.x()}, {scroll_position.y()});"
+                    )
+            browser.loadFinished.connect(restore_scroll)
+
+    def stats(self):
+        """Return counters for live, frozen and discarded views."""
+        counts = {STATE_ACTIVE: 0, STATE_BACKGROUND: 0, STATE_FROZEN: 0, STATE_DISCARDED: 0}
+        for record in self.records.values():
+            counts[record.state] += 1
+        return {
+            "live": counts[STATE_ACTIVE] + counts[STATE_BACKGROUND],
+            "frozen": counts[STATE_FROZEN],
+            "discarded": counts[STATE_DISCARDED],
+            "total_discards": self.discard_count,
+            "total_restores": self.restore_count,
+        }
+
+    def _set_page_state(self, browser, state_name):
+        """Apply a page lifecycle state, if this Qt version supports it."""
+        lifecycle_state = getattr(QWebEnginePage, "LifecycleState", None)
+        if browser is None or lifecycle_state is None:
+            return False
+        browser.page().setLifecycleState(getattr(lifecycle_state, state_name))
+        return True
+
+    def _is_busy(self, browser):
+        """Tabs playing audio are never frozen or discarded."""
+        if browser is None:
+            return False
+        page = browser.page()
+        return hasattr(page, "recentlyAudible") and page.recentlyAudible()
+
+    def _process_key(self, browser):
+        """The renderer process of a view, or the view itself when its process is unknown."""
+        page = browser.page()
+        pid = page.renderProcessPid() if hasattr(page, "renderProcessPid") else 0
+        return pid or browser
+
+    def _memory_mb(self, browser):
+        """Resident memory of a view's renderer process as last sampled, or an estimate."""
+        if browser is None:
+            return 0
+        if self.parent.perf is None:
+            return ESTIMATED_TAB_MEMORY_MB  # Not sampled before the services start
+        memory_mb = self.parent.perf.memory_mb(browser)
+        return ESTIMATED_TAB_MEMORY_MB if memory_mb is None else memory_mb
@@ -0,0 +1,90 @@
+import itertools
+
+_tab_ids = itertools.count(1)
+
+
+class Tab:
+    """A browser tab, independent of the widgets that display it."""
+
+    def __init__(self, url=None, title="Loading..."):
+        self.id = next(_tab_ids)  # Stable identifier, e.g. for the session journal
+        self.index = -1  # Position in the model, kept current by TabModel
+        self.browser = None
+        self.url = url
+        self.title = title
+        self.icon = None
+        self.restoring = False  # Reloading a discarded or restored page, which is not a new visit
+
+
+class TabModel:
+    """Ordered tabs with constant-time browser and index lookups."""
+
+    def __init__(self):
+        self.tabs = []
+        self.browser_tabs = {}
+        self.active_tab = None
+
+    def __len__(self):
+        return len(self.tabs)
+
+    def __iter__(self):
+        return iter(self.tabs)
+
+    def __contains__(self, tab):
+        return 0 <= tab.index < len(self.tabs) and self.tabs[tab.index] is tab
+
+    def append(self, tab):
+        """Add a tab at the end of the strip."""
+        self.insert(len(self.tabs), tab)
+
+    def insert(self, index, tab):
+        """Add a tab at the given position."""
+        self.tabs.insert(index, tab)
+        self._reindex(index)
+        if tab.browser is not None:
+            self.browser_tabs[tab.browser] = tab
+
+    def remove(self, tab):
+        """Remove a tab and return the position it had.
+
+        Removing the active tab makes its right-hand neighbour active, or
+        the left one if it was the last tab (None once the strip is empty).
+        """
+        index = tab.index
+        del self.tabs[index]
+        self._reindex(index)
+        self.browser_tabs.pop(tab.browser, None)
+        tab.index = -1
+        if self.active_tab is tab:
+            self.active_tab = self.tab_at(index) or self.tab_at(index - 1)
+        return index
+
+    def move(self, tab, index):
+        """Move a tab to a new position, shifting the tabs in between."""
+        start = tab.index
+        del self.tabs[start]
+        self.tabs.insert(index, tab)
+        self._reindex(min(start, index))
+
+    def tab_at(self, index):
+        """Return the tab at a position, or None if out of range."""
+        if 0 <= index < len(self.tabs):
+            return self.tabs[index]
+        return None
+
+    def tab_for_browser(self, browser):
+        """Return the tab owning the given view."""
+        return self.browser_tabs.get(browser)
+
+    def set_browser(self, tab, browser):
+        """Attach a view to a tab, or detach it by passing None."""
+        if tab.browser is not None:
+            self.browser_tabs.pop(tab.browser, None)
+        tab.browser = browser
+        if browser is not None:
+            self.browser_tabs[browser] = tab
+
+    def _reindex(self, start):
+        """Refresh the cached positions of tabs from start onwards."""
+        for index in range(start, len(self.tabs)):
+            self.tabs[index].index = index
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, pyqtSignal
+from PyQt5.QtGui import QPixmap, QPainter, QColor
+from thumbnail_cache import THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT
+
+DECODED_CAPACITY = 64  # Decoded thumbnails kept while the overview is open; about two screens
+PLACEHOLDER_ICON_SIZE = 32
+TAB_ROLE = Qt.UserRole
+
+
+class TabOverviewModel(QAbstractListModel):
+    """Tabs as grid items; thumbnails are decoded only when the view asks for them.
+
+    The view only requests data for items on screen, so opening the grid
+    costs the same with hundreds of tabs as with ten.
+    """
+
+    def __init__(self, tabs, thumbnails, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.thumbnails = thumbnails
+        self.rows = []
+        self.decoded = OrderedDict()  # Tab id -> QPixmap
+
+    def refresh(self):
+        """Snapshot the current tab order."""
+        self.beginResetModel()
+        self.rows = list(self.tabs)
+        self.decoded.clear()
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.decoded.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tab = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return tab.title
+        if role == Qt.DecorationRole:
+            return self.thumbnail(tab)
+        if role == Qt.ToolTipRole:
+            return tab.url.toString() if tab.url is not None else tab.title
+        if role == TAB_ROLE:
+            return tab
+        return None
+
+    def thumbnail(self, tab):
+        pixmap = self.decoded.get(tab.id)
+        if pixmap is not None:
+            self.decoded.move_to_end(tab.id)
+            return pixmap
+        pixmap = self.thumbnails.pixmap(tab.id) or self.placeholder(tab)
+        self.decoded[tab.id] = pixmap
+        if len(self.decoded) > DECODED_CAPACITY:
+            self.decoded.popitem(last=False)
+        return pixmap
+
+    def placeholder(self, tab):
+        """Favicon on a blank card, for tabs never shown since they were opened or restored."""
+        pixmap = QPixmap(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+        pixmap.fill(QColor("#f0f0f0"))
+        if tab.icon is not None:
+            painter = QPainter(pixmap)
+            size = PLACEHOLDER_ICON_SIZE
+            painter.drawPixmap(
+                (THUMBNAIL_WIDTH - size) // 2, (THUMBNAIL_HEIGHT - size) // 2, tab.icon.pixmap(size, size)
+            )
+            painter.end()
+        return pixmap
+
+    def on_thumbnail_ready(self, tab_id):
+        """A newer thumbnail was encoded; repaint its item if it is listed."""
+        self.decoded.pop(tab_id, None)
+        for row, tab in enumerate(self.rows):
+            if tab.id == tab_id:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+                break
+
+
+class TabOverview(QListView):
+    """Grid of all tabs with page thumbnails; activating one switches to it."""
+
+    tab_chosen = pyqtSignal(object)
+    dismissed = pyqtSignal()
+
+    def __init__(self, tabs, thumbnails, parent=None):
+        super().__init__(parent)
+        self.overview_model = TabOverviewModel(tabs, thumbnails, self)
+        self.setModel(self.overview_model)
+        thumbnails.thumbnail_ready.connect(self.overview_model.on_thumbnail_ready)
+
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)  # Layout never measures each item
+        self.setLayoutMode(QListView.Batched)
+        self.setWordWrap(False)
+        self.setTextElideMode(Qt.ElideRight)
+        self.setIconSize(QSize(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT))
+        self.setGridSize(QSize(THUMBNAIL_WIDTH + 24, THUMBNAIL_HEIGHT + 40))
+        self.setSpacing(8)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setStyleSheet("""
+            QListView {
+                background-color: #e8e8e8;
+                border: none;
+            }
+            QListView::item:selected {
+                background-color: #cce4f7;
+                color: #000000;
+            }
+        """)
+        self.activated.connect(self.on_activated)
+        self.clicked.connect(self.on_activated)
+
+    def open(self, active_tab=None):
+        """Load the current tabs and select the active one."""
+        self.overview_model.refresh()
+        if active_tab is not None and active_tab in self.overview_model.rows:
+            index = self.overview_model.index(active_tab.index)
+            self.setCurrentIndex(index)
+            self.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def close_overview(self):
+        """Release the decoded thumbnails; the grid is rebuilt on next open."""
+        self.overview_model.clear()
+
+    def on_activated(self, index):
+        tab = index.data(TAB_ROLE)
+        if tab is not None:
+            self.tab_chosen.emit(tab)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.dismissed.emit()
+        else:
+            super().keyPressEvent(event)
@@ -0,0 +1,241 @@
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton, QScrollBar, QSizePolicy
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QIcon
+
+TAB_WIDTH = 200
+TAB_HEIGHT = 40
+TAB_SPACING = 5  # Spacing between tabs
+STRIP_MARGIN = 5  # Margin around the row of tabs
+SCROLL_BAR_HEIGHT = 4
+
+# One stylesheet shared by every tab; the active tab is picked by a dynamic property
+TAB_STRIP_STYLE = """
+    QWidget#tab_strip {
+        background-color: #f0f0f0;
+    }
+    QWidget#tab {
+        background-color: #ffffff;
+        border: 1px solid #cccccc;
+        border-radius: 5px;
+    }
+    QWidget#tab:hover {
+        background-color: #e0e0e0;
+    }
+    QWidget#tab[active="true"] {
+        background-color: #d0d0d0;
+    }
+    QPushButton#tab_icon {
+        border: none;
+        background-color: transparent;
+    }
+    QPushButton#tab_title {
+        border: none;
+        background-color: transparent;
+        text-align: left;
+        font-size: 14px;
+        color: black;
+    }
+    QPushButton#tab_close {
+        border: none;
+        background-color: transparent;
+        color: #ff0000;
+    }
+    QPushButton#tab_close:hover {
+        color: #cc0000;
+        background-color: rgba(255, 0, 0, 0.1);
+    }
+    QScrollBar:horizontal {
+        background: transparent;
+        height: 4px;
+    }
+    QScrollBar::handle:horizontal {
+        background: #b0b0b0;
+        border-radius: 2px;
+    }
+    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
+        width: 0px;
+    }
+"""
+
+
+class TabWidget(QWidget):
+    """A reusable tab button (favicon, title and close button) bound to one Tab at a time."""
+
+    def __init__(self, strip):
+        super().__init__(strip)
+        self.strip = strip
+        self.tab = None
+        self.setObjectName("tab")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setFixedSize(TAB_WIDTH, TAB_HEIGHT)
+        self.setProperty("active", False)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(5, 0, 5, 0)
+        layout.setSpacing(5)
+
+        # Favicon (icon on the left)
+        self.icon_button = QPushButton(self)
+        self.icon_button.setObjectName("tab_icon")
+        self.icon_button.setFlat(True)
+        self.icon_button.setFixedSize(20, 20)
+        self.icon_button.setIconSize(self.icon_button.size())
+        self.icon_button.clicked.connect(self.select)
+
+        # Tab Title
+        self.title_button = QPushButton(self)
+        self.title_button.setObjectName("tab_title")
+        self.title_button.setFlat(True)
+        self.title_button.setFixedHeight(20)
+        self.title_button.clicked.connect(self.select)
+
+        # Close Button
+        self.close_button = QPushButton("✕", self)
+        self.close_button.setObjectName("tab_close")
+        self.close_button.setFlat(True)
+        self.close_button.setFixedSize(20, 20)
+        self.close_button.clicked.connect(self.request_close)
+
+        layout.addWidget(self.icon_button)
+        layout.addWidget(self.title_button)
+        layout.addStretch()
+        layout.addWidget(self.close_button)
+
+    def bind(self, tab):
+        """Show the given tab's title and favicon."""
+        self.tab = tab
+        self.title_button.setText(tab.title)
+        self.icon_button.setIcon(tab.icon if tab.icon is not None else QIcon())
+        self.set_active(tab is self.strip.model.active_tab)
+
+    def set_active(self, active):
+        """Toggle the active style, re-polishing only when it actually changes."""
+        if self.property("active") != active:
+            self.setProperty("active", active)
+            self.style().unpolish(self)
+            self.style().polish(self)
+
+    def select(self):
+        if self.tab is not None:
+            self.strip.tab_clicked.emit(self.tab)
+
+    def request_close(self):
+        if self.tab is not None:
+            self.strip.tab_close_requested.emit(self.tab)
+
+    def mouseReleaseEvent(self, event):
+        """Select on left click, close on middle click."""
+        if event.button() == Qt.LeftButton:
+            self.select()
+        elif event.button() == Qt.MiddleButton:
+            self.request_close()
+        event.accept()
+
+
+class TabStrip(QWidget):
+    """Scrollable tab strip that only creates widgets for the tabs in view."""
+
+    tab_clicked = pyqtSignal(object)
+    tab_close_requested = pyqtSignal(object)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.offset = 0
+        self.highlighted_tab = None
+        self.bound_widgets = {}  # Visible Tab -> TabWidget
+        self.spare_widgets = []
+
+        self.setObjectName("tab_strip")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setStyleSheet(TAB_STRIP_STYLE)
+        self.setFixedHeight(TAB_HEIGHT + 2 * STRIP_MARGIN)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+        self.scroll_bar = QScrollBar(Qt.Horizontal, self)
+        self.scroll_bar.setSingleStep(TAB_WIDTH + TAB_SPACING)
+        self.scroll_bar.valueChanged.connect(self.set_offset)
+        self.scroll_bar.hide()
+
+    def content_width(self):
+        """Width needed to show every tab."""
+        count = len(self.model)
+        if not count:
+            return 0
+        return count * (TAB_WIDTH + TAB_SPACING) - TAB_SPACING + 2 * STRIP_MARGIN
+
+    def relayout(self):
+        """Bind widgets to the tabs in view and position them."""
+        stride = TAB_WIDTH + TAB_SPACING
+        width = self.width()
+        max_offset = max(0, self.content_width() - width)
+        self.offset = min(self.offset, max_offset)
+
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setRange(0, max_offset)
+        self.scroll_bar.setPageStep(width)
+        self.scroll_bar.setValue(self.offset)
+        self.scroll_bar.blockSignals(False)
+        self.scroll_bar.setGeometry(0, self.height() - SCROLL_BAR_HEIGHT, width, SCROLL_BAR_HEIGHT)
+        self.scroll_bar.setVisible(max_offset > 0)
+
+        first = max(0, (self.offset - STRIP_MARGIN) // stride)
+        last = min(len(self.model), (self.offset + width - STRIP_MARGIN) // stride + 1)
+        visible = self.model.tabs[first:last]
+        visible_set = set(visible)
+
+        # Return widgets of tabs that scrolled out of view (or were closed) to the spares
+        for tab in [tab for tab in self.bound_widgets if tab not in visible_set]:
+            widget = self.bound_widgets.pop(tab)
+            widget.hide()
+            widget.tab = None
+            self.spare_widgets.append(widget)
+
+        for tab in visible:
+            widget = self.bound_widgets.get(tab)
+            if widget is None:
+                widget = self.spare_widgets.pop() if self.spare_widgets else TabWidget(self)
+                widget.bind(tab)
+                self.bound_widgets[tab] = widget
+            widget.move(STRIP_MARGIN + tab.index * stride - self.offset, STRIP_MARGIN)
+            widget.show()
+
+    def refresh_tab(self, tab):
+        """Redraw a tab's title and favicon if it is in view."""
+        widget = self.bound_widgets.get(tab)
+        if widget is not None:
+            widget.bind(tab)
+
+    def set_active(self, tab):
+        """Move the active style from the previous tab to this one and scroll it into view."""
+        for previous in (self.highlighted_tab, tab):
+            widget = self.bound_widgets.get(previous)
+            if widget is not None:
+                widget.set_active(previous is tab)
+        self.highlighted_tab = tab
+        self.ensure_visible(tab)
+
+    def ensure_visible(self, tab):
+        """Scroll just enough to show the given tab."""
+        left = STRIP_MARGIN + tab.index * (TAB_WIDTH + TAB_SPACING)
+        right = left + TAB_WIDTH + STRIP_MARGIN
+        if left - STRIP_MARGIN < self.offset:
+            self.set_offset(left - STRIP_MARGIN)
+        elif right > self.offset + self.width():
+            self.set_offset(right - self.width())
+        else:
+            self.relayout()
+
+    def set_offset(self, offset):
+        self.offset = max(0, offset)
+        self.relayout()
+
+    def resizeEvent(self, event):
+        self.relayout()
+        super().resizeEvent(event)
+
+    def wheelEvent(self, event):
+        """Scroll the strip with the mouse wheel."""
+        delta = event.angleDelta().y() or event.angleDelta().x()
+        self.set_offset(self.offset - delta)
+        event.accept()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def data_directory(tmp_path, monkeypatch):
+    """Keep data_path() inside the test's temporary directory."""
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "appdata"))
+    return tmp_path / "appdata"
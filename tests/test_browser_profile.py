@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("QTWEBENGINE_CHROMIUM_FLAGS", "--disable-gpu")
+# Must be imported before the QApplication; skipped where the engine cannot load
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt5.QtWidgets import QApplication
+
+from browser_profile import BrowserProfile
+
+
+@pytest.fixture
+def profile():
+    app = QApplication.instance() or QApplication([])
+    profile = BrowserProfile(app, name="FoxBrTest")
+    yield profile
+    profile.deleteLater()
+
+
+def test_cache_links_change_settings_once(profile):
+    token = profile.action_token
+    _, page = profile.render_page(f"/http/memory/{token}")
+    assert profile.settings["http_cache_type"] == "memory"
+    assert profile.action_token != token
+    assert profile.action_token.encode() in page
+
+    profile.render_page(f"/http/none/{token}")  # Replayed from history
+    assert profile.settings["http_cache_type"] == "memory"
+
+
+def test_cache_links_without_the_token_change_nothing(profile):
+    _, page = profile.render_page("/clear")
+    assert b"nothing was changed" in page
+    assert not profile.settings.get("clear_code_cache")
+    assert profile.render_page("/json")[0] == b"application/json"
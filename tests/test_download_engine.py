@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import download_engine
+from download_engine import SegmentedDownloader, DownloadCanceled
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 12345)
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    """Serves server.payload; server.ranges is "all", "probe" (only bytes=0-0) or "none"."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payload = self.server.payload
+        range_header = self.headers.get("Range", "")
+        with self.server.lock:
+            self.server.requests.append(range_header)
+        start, end = 0, len(payload) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", range_header)
+        honored = self.server.ranges == "all" or self.server.ranges == "probe" and range_header == "bytes=0-0"
+        if match and honored:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        try:
+            self.wfile.write(payload[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PayloadHandler)
+    server.daemon_threads = True
+    server.payload = PAYLOAD
+    server.ranges = "all"
+    server.etag = '"v1"'
+    server.lock = threading.Lock()
+    server.requests = []
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/FoxBr.zip"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def small_buffers(monkeypatch):
+    monkeypatch.setattr(download_engine, "BUFFER_SIZE", 64 * 1024)  # Several chunks per segment
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def interrupted_download(server, save_path, after_bytes):
+    """Start a download and cancel it once after_bytes have been written."""
+    written = []
+
+    def on_chunk(offset, chunk):
+        written.append(len(chunk))
+        if sum(written) >= after_bytes:
+            downloader.cancel()
+
+    downloader = SegmentedDownloader(server.url, save_path, chunk_callback=on_chunk)
+    with pytest.raises(DownloadCanceled):
+        downloader.run()
+    return downloader
+
+
+def test_segmented_download(server, tmp_path):
+    save_path = str(tmp_path / "FoxBr.zip")
+    downloader = SegmentedDownloader(server.url, save_path)
+
+    assert downloader.run() == len(PAYLOAD)
+    assert read(save_path) == PAYLOAD
+    assert len(downloader.segments) > 1
+    assert not os.path.exists(downloader.part_path)
+    assert not os.path.exists(downloader.state_path)
+
+
+def test_resume_fetches_only_the_missing_bytes(server, tmp_path):
+    save_path = str(tmp_path / "FoxBr.zip")
+    first = interrupted_download(server, save_path, 512 * 1024)
+    with open(first.state_path) as state_file:
+        saved = sum(segment[2] for segment in json.load(state_file)["segments"])
+    assert 0 < saved < len(PAYLOAD)
+
+    first_requests = len(server.requests)
+    resumed = SegmentedDownloader(server.url, save_path)
+    assert resumed.run() == len(PAYLOAD)
+
+    requested = 0
+    for range_header in server.requests[first_requests:]:
+        start, end = re.match(r"bytes=(\d+)-(\d+)", range_header).groups()
+        requested += int(end) - int(start) + 1
+    assert resumed.resumed_bytes == saved
+    assert requested == len(PAYLOAD) - saved + 1  # Plus the one-byte probe
+    assert read(save_path) == PAYLOAD
+
+
+def test_changed_file_restarts_the_download(server, tmp_path):
+    save_path = str(tmp_path / "FoxBr.zip")
+    interrupted_download(server, save_path, 512 * 1024)
+
+    server.etag = '"v2"'
+    restarted = SegmentedDownloader(server.url, save_path)
+    restarted.run()
+
+    assert restarted.resumed_bytes == 0
+    assert read(save_path) == PAYLOAD
+
+
+def test_server_without_ranges_gets_one_request(server, tmp_path):
+    server.ranges = "none"
+    save_path = str(tmp_path / "FoxBr.zip")
+    downloader = SegmentedDownloader(server.url, save_path)
+
+    assert downloader.run() == len(PAYLOAD)
+    assert read(save_path) == PAYLOAD
+    assert server.requests == ["bytes=0-0"]  # The probe's full answer is the download
+
+
+def test_ranges_refused_after_the_probe_fall_back_to_one_request(server, tmp_path):
+    server.ranges = "probe"
+    save_path = str(tmp_path / "FoxBr.zip")
+    downloader = SegmentedDownloader(server.url, save_path)
+
+    assert downloader.run() == len(PAYLOAD)
+    assert read(save_path) == PAYLOAD
+    assert server.requests[-1] == ""
+    assert not os.path.exists(downloader.state_path)
+
+
+def test_small_file_is_not_split(server, tmp_path):
+    server.payload = PAYLOAD[:1000]
+    save_path = str(tmp_path / "small.bin")
+    downloader = SegmentedDownloader(server.url, save_path)
+
+    assert downloader.run() == 1000
+    assert read(save_path) == PAYLOAD[:1000]
+    assert server.requests == ["bytes=0-0", ""]
+
+
+def test_finalize_false_leaves_the_data_in_the_part_file(server, tmp_path):
+    save_path = str(tmp_path / "FoxBr.zip")
+    chunks = {}
+    downloader = SegmentedDownloader(
+        server.url, save_path, finalize=False, chunk_callback=lambda offset, chunk: chunks.update({offset: chunk})
+    )
+    downloader.run()
+
+    assert not os.path.exists(save_path)
+    assert read(downloader.part_path) == PAYLOAD
+    assert b"".join(chunks[offset] for offset in sorted(chunks)) == PAYLOAD
+    assert downloader.available_until(0) == len(PAYLOAD)
@@ -0,0 +1,319 @@
+import os
+import re
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+from PyQt5.QtCore import QCoreApplication, QObject, QUrl, pyqtSignal
+
+import download_engine
+from download_manager import DownloadManager, RateLimiter, RATE_BURST_SECONDS, QUEUED, ACTIVE, PAUSED, DONE, FAILED
+from download_manager import CANCELED
+
+PAYLOAD = os.urandom(200 * 1024)
+SEND_CHUNK_SIZE = 16 * 1024
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD at any path at server.rate bytes per second per connection, honoring Range."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        try:
+            for offset in range(start, end + 1, SEND_CHUNK_SIZE):
+                self.wfile.write(PAYLOAD[offset:min(offset + SEND_CHUNK_SIZE, end + 1)])
+                if self.server.rate:
+                    time.sleep(SEND_CHUNK_SIZE / self.server.rate)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeDownloadItem(QObject):
+    """The parts of QWebEngineDownloadItem the manager uses."""
+
+    DownloadInProgress, DownloadCompleted, DownloadCancelled, DownloadInterrupted = 1, 2, 3, 4
+    downloadProgress = pyqtSignal("qint64", "qint64")
+    finished = pyqtSignal()
+
+    def __init__(self, url, total=-1, mime_type="application/octet-stream"):
+        super().__init__()
+        self._url = QUrl(url)
+        self._path = os.path.basename(self._url.path()) or "download"
+        self._total = total
+        self._mime_type = mime_type
+        self._state = self.DownloadInProgress
+        self.accepted = False
+        self.paused = False
+        self.resumes = 0
+
+    def url(self):
+        return self._url
+
+    def path(self):
+        return self._path
+
+    def setPath(self, path):
+        self._path = path
+
+    def page(self):
+        return None
+
+    def totalBytes(self):
+        return self._total
+
+    def mimeType(self):
+        return self._mime_type
+
+    def isSavePageDownload(self):
+        return False
+
+    def accept(self):
+        self.accepted = True
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        self.resumes += 1
+
+    def cancel(self):
+        self.finish(self.DownloadCancelled)
+
+    def isFinished(self):
+        return self._state != self.DownloadInProgress
+
+    def state(self):
+        return self._state
+
+    def interruptReasonString(self):
+        return "Network error" if self._state == self.DownloadInterrupted else ""
+
+    def finish(self, state):
+        self._state = state
+        self.finished.emit()
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    server.daemon_threads = True
+    server.rate = 400 * 1024
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_manager(app, tmp_path):
+    managers = []
+
+    def make_manager(**options):
+        manager = DownloadManager(
+            directory=str(tmp_path), state_path=str(tmp_path / "downloads.json"), segments=2, **options
+        )
+        managers.append(manager)
+        return manager
+
+    yield make_manager
+    for manager in managers:
+        if not manager.closed:
+            manager.close()
+
+
+@pytest.fixture(autouse=True)
+def small_buffers(monkeypatch):
+    monkeypatch.setattr(download_engine, "BUFFER_SIZE", SEND_CHUNK_SIZE)
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+    return predicate()
+
+
+def url(server, name, host="127.0.0.1"):
+    return f"http://{host}:{server.server_address[1]}/{name}"
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_rate_limiter_allows_a_burst_then_spaces_reservations():
+    limiter = RateLimiter(1000)
+    assert limiter.reserve(500) == pytest.approx(0.5 - RATE_BURST_SECONDS, abs=0.01)
+    assert limiter.reserve(500) == pytest.approx(1.0 - RATE_BURST_SECONDS, abs=0.01)
+    assert RateLimiter(0).reserve(10 ** 9) == 0.0
+
+
+def test_queue_respects_overall_and_per_host_limits(make_manager, server):
+    manager = make_manager(max_active=2, max_per_host=1)
+    hosts = ("127.0.0.1", "localhost")
+    downloads = [manager.add(url(server, f"file{n}.bin", host)) for n in range(3) for host in hosts]
+    assert [download.state for download in downloads].count(ACTIVE) == 2
+
+    assert wait_for(lambda: all(download.state == DONE for download in downloads))
+    stats = manager.stats()
+    assert stats["peak_active"] == 2
+    assert stats["peak_per_host"] == 1
+    assert stats["completed"] == 6
+    assert all(read(download.path) == PAYLOAD for download in downloads)
+    assert len({download.path for download in downloads}) == 6
+
+
+def test_downloads_start_in_the_order_they_were_added(make_manager, server):
+    manager = make_manager(max_active=1)
+    downloads = [manager.add(url(server, f"file{n}.bin")) for n in range(3)]
+    started = []
+    manager.download_changed.connect(
+        lambda download_id: started.append(download_id)
+        if manager.downloads[download_id].state == ACTIVE and download_id not in started else None
+    )
+
+    assert wait_for(lambda: all(download.state == DONE for download in downloads))
+    assert started == [download.id for download in downloads]
+
+
+def test_rate_limit_caps_the_combined_speed(make_manager, server):
+    server.rate = 0
+    manager = make_manager()
+    manager.set_rate_limit(256 * 1024)
+    start = time.monotonic()
+    downloads = [manager.add(url(server, f"file{n}.bin")) for n in range(2)]
+
+    assert wait_for(lambda: all(download.state == DONE for download in downloads))
+    elapsed = time.monotonic() - start
+    assert elapsed >= 2 * len(PAYLOAD) / (256 * 1024) - RATE_BURST_SECONDS - 0.1
+    assert manager.stats()["bytes_received"] == 2 * len(PAYLOAD)
+
+
+def test_pause_survives_a_restart_and_resumes(make_manager, server):
+    server.rate = 100 * 1024
+    manager = make_manager()
+    download = manager.add(url(server, "file.bin"))
+    assert wait_for(lambda: download.received > 0)
+
+    manager.pause(download.id)
+    assert wait_for(lambda: download.state == PAUSED)
+    assert os.path.exists(download.path + ".part")
+    manager.close()
+
+    server.rate = 0
+    restarted = make_manager()
+    resumed = restarted.downloads[download.id]
+    assert resumed.state == PAUSED
+    restarted.resume(download.id)
+    assert wait_for(lambda: resumed.state == DONE)
+    assert read(resumed.path) == PAYLOAD
+
+
+def test_cancel_deletes_the_partial_file(make_manager, server):
+    server.rate = 50 * 1024
+    manager = make_manager()
+    download = manager.add(url(server, "file.bin"))
+    assert wait_for(lambda: download.received > 0)
+
+    manager.cancel(download.id)
+    assert wait_for(lambda: download.state == CANCELED)
+    assert not os.path.exists(download.path + ".part")
+    assert not os.path.exists(download.path)
+
+
+def test_page_download_is_taken_over_before_the_engine_fetches_it(make_manager, server):
+    server.rate = 0
+    manager = make_manager()
+    item = FakeDownloadItem(url(server, "page.bin"), total=len(PAYLOAD))
+    download = manager.on_download_requested(item)
+    assert item.accepted and item.paused and download.state == QUEUED
+
+    assert wait_for(lambda: download.state == DONE)
+    assert item.resumes == 0 and item.state() == item.DownloadCancelled
+    assert not download.engine and download.item is None
+    assert read(download.path) == PAYLOAD
+    assert manager.stats()["takeovers"] == 1
+    assert list(manager.downloads) == [download.id]
+
+
+def test_page_download_the_probe_rejects_stays_in_the_engine_queue(make_manager, server):
+    manager = make_manager()
+    item = FakeDownloadItem(url(server, "page.bin"), total=len(PAYLOAD) + 1)  # A POST answer, say
+    download = manager.on_download_requested(item)
+
+    assert wait_for(lambda: download.state == ACTIVE)
+    assert download.engine and not item.paused
+    item.downloadProgress.emit(1000, len(PAYLOAD) + 1)
+    item.finish(item.DownloadCompleted)
+
+    assert download.state == DONE
+    assert manager.stats()["takeovers"] == 0
+    assert manager.stats()["bytes_received"] == 1000
+
+
+def test_engine_downloads_count_against_the_queue(make_manager):
+    manager = make_manager(max_active=1)
+    items = [FakeDownloadItem(f"blob:https://example.com/{n}") for n in range(2)]
+    first, second = [manager.on_download_requested(item) for item in items]
+    assert (first.state, second.state) == (ACTIVE, QUEUED)
+    assert items[1].paused
+
+    manager.pause(first.id)
+    assert items[0].paused and first.state == PAUSED
+    assert second.state == ACTIVE and not items[1].paused
+
+    items[1].finish(items[1].DownloadInterrupted)
+    assert second.state == FAILED and second.error == "Network error" and not second.resumable
+    assert first.state == PAUSED
+    manager.resume(first.id)
+    assert first.state == ACTIVE and not items[0].paused
+
+    manager.cancel(first.id)
+    assert first.state == CANCELED and items[0].state() == items[0].DownloadCancelled
+
+
+def test_engine_download_is_paused_while_over_the_rate_limit(make_manager):
+    manager = make_manager()
+    manager.set_rate_limit(100 * 1024)
+    item = FakeDownloadItem("blob:https://example.com/1")
+    download = manager.on_download_requested(item)
+    assert download.state == ACTIVE
+
+    item.downloadProgress.emit(50 * 1024, -1)
+    assert item.paused and download.state == ACTIVE
+    assert wait_for(lambda: not item.paused, timeout=2)
+
+
+def test_unfinished_engine_downloads_fail_on_restart(make_manager):
+    manager = make_manager()
+    download = manager.on_download_requested(FakeDownloadItem("blob:https://example.com/1"))
+    manager.close()
+
+    restarted = make_manager()
+    assert restarted.downloads[download.id].state == FAILED
+    assert not restarted.downloads[download.id].resumable
@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from filter_lists import FilterMatcher, compile_filter_lists, parse_rule, FLAG_EXCEPTION, FLAG_DOCUMENT
+
+RULES = """\
+[Adblock Plus 2.0]
+! Comments, headers and element hiding rules are skipped
+example.com##.ad
+||ads.example.com^
+@@||good.ads.example.com^
+@@||ads.example.com/allowed/
+/banner/*$image
+@@/banner/allowed.gif
+||tracker.net/pixel$third-party
+||cdn.example.org/ads/$script,domain=news.com|~sports.news.com
+||exact.com/Path$match-case
+/popup/$popup
+@@||trusted.com^$document
+||trusted.com/ad.js
+||blocked-page.com^$document
+@@/landing/$document
+"""
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    list_path = tmp_path / "list.txt"
+    list_path.write_text(RULES, encoding="utf-8")
+    matcher = FilterMatcher(compile_filter_lists([str(list_path)], str(tmp_path)))
+    yield matcher
+    matcher.close()
+
+
+@pytest.mark.parametrize("url, page_host, resource_type, blocked", [
+    # Hostname rules cover subdomains, not hosts that merely end the same way
+    ("https://ads.example.com/a.js", "site.com", "script", True),
+    ("https://sub.ads.example.com/a.js", "site.com", "script", True),
+    ("https://notads.example.com/a.js", "site.com", "script", False),
+    ("https://good.ads.example.com/a.js", "site.com", "script", False),
+    # A URL exception lifts a hostname block
+    ("https://ads.example.com/allowed/a.js", "site.com", "script", False),
+    # Resource types
+    ("https://site.com/banner/top.png", "site.com", "image", True),
+    ("https://site.com/banner/top.js", "site.com", "script", False),
+    ("https://site.com/banner/allowed.gif", "site.com", "image", False),
+    # Third-party only
+    ("https://tracker.net/pixel?id=1", "news.com", "image", True),
+    ("https://tracker.net/pixel?id=1", "www.tracker.net", "image", False),
+    # Included and excluded page domains
+    ("https://cdn.example.org/ads/a.js", "news.com", "script", True),
+    ("https://cdn.example.org/ads/a.js", "www.news.com", "script", True),
+    ("https://cdn.example.org/ads/a.js", "sports.news.com", "script", False),
+    ("https://cdn.example.org/ads/a.js", "other.com", "script", False),
+    ("https://cdn.example.org/ads/a.png", "news.com", "image", False),
+    # Case-sensitive patterns
+    ("https://exact.com/Path", "site.com", "other", True),
+    ("https://exact.com/path", "site.com", "other", False),
+    # Rules with unsupported options are dropped rather than applied too widely
+    ("https://site.com/popup/", "site.com", "other", False),
+    # A $document exception allows every request made by pages on its host, and only those
+    ("https://ads.example.com/a.js", "trusted.com", "script", False),
+    ("https://ads.example.com/a.js", "www.trusted.com", "script", False),
+    ("https://trusted.com/ad.js", "other.org", "script", True),
+    ("https://ads.example.com/a.js", "untrusted.com", "script", True),
+    # $document rules that need the page URL, or block documents, are skipped
+    ("https://blocked-page.com/x.js", "site.com", "script", False),
+    ("https://ads.example.com/landing/a.js", "site.com", "script", True),
+])
+def test_should_block(matcher, url, page_host, resource_type, blocked):
+    host = url.split("/")[2]
+    assert matcher.should_block(url, host, page_host, resource_type) is blocked
+
+
+def test_decisions_are_the_same_from_the_caches(matcher):
+    args = ("https://sub.ads.example.com/banner/x.png", "sub.ads.example.com", "site.com", "image")
+    assert [matcher.should_block(*args) for _ in range(3)] == [True, True, True]
+    assert "sub.ads.example.com" in matcher.host_results
+
+
+def test_only_url_rules_are_indexed(matcher):
+    stats = matcher.stats()
+    assert stats["blocked_domains"] == 1
+    assert stats["allowed_domains"] == 1
+    assert stats["allowed_pages"] == 1
+    assert stats["url_rules"] == 7
+
+
+def test_parse_rule_skips_what_it_cannot_apply():
+    assert parse_rule("! comment") is None
+    assert parse_rule("example.com#@#.ad") is None
+    assert parse_rule("/ads[0-9]+/") is None
+    assert parse_rule("*") is None
+    assert parse_rule("/ad.js$rewrite=abp-resource:blank-js") is None
+    assert parse_rule("/AD.js$important") == (0, parse_rule("/ad.js")[1], "/ad.js", "")
+    assert parse_rule("||site.com^$document") is None
+    assert parse_rule("@@/page.html$document") is None
+    assert parse_rule("@@||site.com^$document")[0] == FLAG_EXCEPTION | FLAG_DOCUMENT
+
+
+def test_compilation_is_reused_until_a_list_changes(tmp_path):
+    list_path = tmp_path / "list.txt"
+    list_path.write_text("||ads.example.com^\n", encoding="utf-8")
+    first = compile_filter_lists([str(list_path)], str(tmp_path))
+    assert compile_filter_lists([str(list_path)], str(tmp_path)) == first
+
+    list_path.write_text("||ads.example.com^\n||more.example.com^\n", encoding="utf-8")
+    os.utime(list_path, ns=(0, os.stat(list_path).st_mtime_ns + 1))
+    second = compile_filter_lists([str(list_path)], str(tmp_path))
+    assert second != first
+    assert not os.path.exists(first)
+    matcher = FilterMatcher(second)
+    try:
+        assert matcher.should_block("https://more.example.com/", "more.example.com", "site.com")
+    finally:
+        matcher.close()
@@ -0,0 +1,146 @@
+import time
+import sqlite3
+import threading
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from history import HistoryIndex, HistoryService, RANGE_SCAN_LIMIT, normalize_url
+
+DAY = 86400
+
+
+@pytest.fixture
+def index():
+    now = time.time()
+    index = HistoryIndex()
+    index.load([
+        ("https://github.com/rust-lang/rust", "rust-lang/rust: Empowering everyone", 40, now - DAY),
+        ("https://www.github.com/rustsec/advisory-db", "RustSec Advisory Database", 4, now - DAY),
+        ("https://gitlab.com/rustls", "rustls on GitLab", 50, now - 200 * DAY),
+        ("https://docs.python.org/3/", "3.12 Documentation", 30, now - 2 * DAY),
+        ("http://www.example.com/weather", "Weather forecast", 2, now),
+        ("https://news.example.org/python", "Python news", 1, now - 3 * DAY),
+    ])
+    return index
+
+
+def urls(results):
+    return [url for url, _ in results]
+
+
+def test_normalize_url_drops_scheme_and_www():
+    assert normalize_url("HTTPS://WWW.Example.com/Path") == "example.com/path"
+    assert normalize_url("http://example.com") == "example.com"
+    assert normalize_url("ftp://www.example.com") == "ftp://www.example.com"
+
+
+def test_prefix_matches_whatever_scheme_and_www_were_typed(index):
+    expected = ["https://github.com/rust-lang/rust", "https://www.github.com/rustsec/advisory-db"]
+    assert urls(index.query("github.com/rust")) == expected
+    assert urls(index.query("https://www.github.com/rust")) == expected
+    assert urls(index.query("HTTP://GITHUB.COM/RUST")) == expected
+
+
+def test_results_are_ranked_by_frecency(index):
+    # Fifty visits 200 days ago score below forty visits yesterday
+    assert urls(index.query("rust")) == [
+        "https://github.com/rust-lang/rust", "https://gitlab.com/rustls", "https://www.github.com/rustsec/advisory-db",
+    ]
+    assert len(index.query("rust", limit=2)) == 2
+
+
+def test_words_match_titles_and_hosts_in_any_order(index):
+    assert urls(index.query("documentation python")) == ["https://docs.python.org/3/"]
+    assert urls(index.query("python")) == ["https://docs.python.org/3/", "https://news.example.org/python"]
+    assert urls(index.query("example weather")) == ["http://www.example.com/weather"]
+    assert index.query("python weather") == []
+
+
+def test_last_word_matches_as_a_prefix(index):
+    assert urls(index.query("python docu")) == ["https://docs.python.org/3/"]
+    assert urls(index.query("advis")) == ["https://www.github.com/rustsec/advisory-db"]
+    assert index.query("pythonx") == []
+
+
+def test_new_visits_and_titles_are_searchable(index):
+    index.add_visit("https://zig.example.net/start", "Learn Zig")
+    assert urls(index.query("zig.exa")) == ["https://zig.example.net/start"]
+    assert urls(index.query("learn z")) == ["https://zig.example.net/start"]
+
+    index.set_title("https://zig.example.net/start", "Getting started")
+    assert urls(index.query("getting")) == ["https://zig.example.net/start"]
+    assert index.query("learn") == []  # Old words stay indexed but no longer match
+
+
+def test_repeat_visits_raise_an_entry(index):
+    for _ in range(60):
+        index.add_visit("https://www.github.com/rustsec/advisory-db")
+    assert urls(index.query("github.com/"))[0] == "https://www.github.com/rustsec/advisory-db"
+
+
+def test_broad_prefix_is_answered_in_frecency_order():
+    now = time.time()
+    count = RANGE_SCAN_LIMIT + 500
+    index = HistoryIndex()
+    index.load([(f"https://site.example/{n}", f"Page {n}", n + 1, now) for n in range(count)])
+
+    assert urls(index.query("site.example/", limit=3)) == [
+        f"https://site.example/{n}" for n in (count - 1, count - 2, count - 3)
+    ]
+    index.add_visit("https://site.example/7", when=now)
+    assert "https://site.example/7" not in urls(index.query("site.example/", limit=3))
+
+
+def fill_store(path, count, now):
+    """Write count entries; entry n has n + 1 visits, so low numbers rank last."""
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE history (url TEXT PRIMARY KEY, title TEXT, visit_count INTEGER, last_visit REAL)"
+    )
+    with connection:
+        connection.executemany(
+            "INSERT INTO history VALUES (?, ?, ?, ?)",
+            [(f"https://site{n}.example/page", f"Topic{n} page", n + 1, now) for n in range(count)],
+        )
+    connection.close()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_service_searches_entries_beyond_the_index_capacity(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    fill_store(path, 100, time.time())
+    service = HistoryService(path=path, load_delay=0, flush_interval=60, index_capacity=10)
+    emitted, arrived = [], threading.Event()
+
+    def on_suggestions(query, suggestions):
+        emitted.append((query, [url for _, url, _, _ in suggestions]))
+        arrived.set()
+
+    service.suggestions_ready.connect(on_suggestions, Qt.DirectConnection)
+    try:
+        assert wait_for(lambda: service.loaded)
+        assert service.capped and len(service.index) == 10
+
+        for text in ("site3.example/", "topic3 page"):
+            emitted.clear()
+            service.request_suggestions(text)
+            assert wait_for(lambda: len(emitted) == 2)
+            memory, combined = emitted[0][1], emitted[1][1]
+            assert memory == []  # Entry 3 ranks far below the ten in memory
+            assert combined == ["https://site3.example/page"]
+
+        service.record_visit("https://site3.example/page", "Topic3 page")
+    finally:
+        service.close()
+
+    connection = sqlite3.connect(path)
+    visits = connection.execute("SELECT visit_count FROM history WHERE url = ?", ("https://site3.example/page",))
+    assert visits.fetchone()[0] == 5  # The stored four and the new one
+    connection.close()
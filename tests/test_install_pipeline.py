@@ -0,0 +1,252 @@
+import io
+import os
+import re
+import hashlib
+import zipfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import download_engine
+import install_pipeline
+from install_pipeline import (
+    swap_in, remove_installation, record_installed_files, InstallError, InstallPipeline,
+    BACKUP_DIR_NAME, STAGING_DIR_NAME, INSTALL_RECORD_NAME,
+)
+
+INSTALLED = {"FoxBr.exe": "old exe", "lib/core.dll": "old core", "lib/legacy.dll": "legacy", "version.txt": "1.0"}
+STAGED = {"FoxBr.exe": "new exe", "lib/core.dll": "new core", "lib/extra.dll": "extra", "version.txt": "2.0"}
+
+
+def write_files(root, files):
+    for path, text in files.items():
+        full_path = os.path.join(root, *path.split("/"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as file:
+            file.write(text)
+
+
+def read_files(root, skip=()):
+    files = {}
+    for current, directories, names in os.walk(root):
+        directories[:] = [name for name in directories if name not in skip]
+        for name in names:
+            path = os.path.join(current, name)
+            with open(path) as file:
+                files[os.path.relpath(path, root).replace(os.sep, "/")] = file.read()
+    return files
+
+
+@pytest.fixture
+def install(tmp_path):
+    install_path = str(tmp_path / "FoxBr")
+    staging_path = os.path.join(install_path, STAGING_DIR_NAME)
+    write_files(install_path, INSTALLED)
+    write_files(staging_path, STAGED)
+    return install_path, staging_path
+
+
+def fail_on(monkeypatch, name):
+    """Make os.replace fail whenever it moves a file called name."""
+    replace = os.replace
+
+    def failing_replace(source, destination):
+        if os.path.basename(source) == name:
+            raise PermissionError(13, "In use", source)
+        replace(source, destination)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+
+
+def test_swap_in_replaces_and_removes_files(install):
+    install_path, staging_path = install
+    staged = swap_in(staging_path, install_path, removed=[os.path.join("lib", "legacy.dll")])
+
+    assert sorted(path.replace(os.sep, "/") for path in staged) == sorted(STAGED)
+    assert read_files(install_path) == STAGED
+    assert not os.path.exists(staging_path)
+    assert not os.path.exists(os.path.join(install_path, BACKUP_DIR_NAME))
+
+
+@pytest.mark.parametrize("failing", ["version.txt", "extra.dll", "legacy.dll"])
+def test_failed_swap_restores_every_file(install, monkeypatch, failing):
+    install_path, staging_path = install
+    fail_on(monkeypatch, failing)
+
+    with pytest.raises(OSError):
+        swap_in(staging_path, install_path, removed=[os.path.join("lib", "legacy.dll")])
+
+    monkeypatch.undo()
+    assert read_files(install_path, skip={STAGING_DIR_NAME, BACKUP_DIR_NAME}) == INSTALLED
+    assert not read_files(os.path.join(install_path, BACKUP_DIR_NAME))
+
+
+def test_backup_of_an_earlier_swap_is_replaced(install):
+    install_path, staging_path = install
+    write_files(os.path.join(install_path, BACKUP_DIR_NAME), {"FoxBr.exe": "from the last update"})
+
+    swap_in(staging_path, install_path)
+
+    assert read_files(install_path) == {**STAGED, "lib/legacy.dll": "legacy"}
+
+
+def make_installation(tmp_path, recorded=True):
+    """An installation with a file the program created, next to an unrelated directory."""
+    install_path = str(tmp_path / "FoxBr")
+    write_files(install_path, INSTALLED)
+    if recorded:
+        record_installed_files(install_path, INSTALLED)
+    write_files(install_path, {"lib/cache/shaders.bin": "created by the program"})
+    write_files(str(tmp_path / "Other"), {"data.txt": "not ours", "lib/core.dll": "not ours either"})
+    return install_path
+
+
+def test_uninstall_works_from_the_record(tmp_path):
+    installed = make_installation(tmp_path)
+    result = remove_installation(installed)
+
+    assert result["source"] == "record"
+    assert result["removed"] == len(INSTALLED) + 1  # The record itself
+    assert not result["failed"]
+    assert not os.path.exists(installed)  # Including lib/cache, which only the sweep knows about
+
+
+def test_uninstall_scans_without_a_record(tmp_path):
+    installed = make_installation(tmp_path, recorded=False)
+    result = remove_installation(installed)
+
+    assert result["source"] == "scan"
+    assert result["removed"] == len(INSTALLED) + 1  # The program's own cache file
+    assert not os.path.exists(installed)
+
+
+@pytest.mark.parametrize("recorded", [True, False])
+def test_uninstall_keeps_kept_files_and_their_directories(tmp_path, recorded):
+    install_path = str(tmp_path / "FoxBr")
+    files = {**INSTALLED, "bin/x64/updater.exe": "running"}
+    write_files(install_path, files)
+    if recorded:
+        record_installed_files(install_path, files)
+    write_files(install_path, {"bin/x64/updater.log": "created by the program", "bin/stray.txt": "stray"})
+    kept = os.path.join(install_path, "bin", "x64", "updater.exe")
+
+    remove_installation(install_path, keep=[kept])
+
+    assert read_files(install_path) == {"bin/x64/updater.exe": "running"}
+
+
+def test_uninstall_never_touches_paths_outside_the_install_directory(tmp_path):
+    installed = make_installation(tmp_path)
+    with open(os.path.join(installed, INSTALL_RECORD_NAME), "a") as record_file:
+        record_file.write("../Other/data.txt\n../Other/lib/core.dll\n")
+    try:
+        os.symlink(str(tmp_path / "Other"), os.path.join(installed, "lib", "cache", "other"))
+    except (OSError, NotImplementedError):
+        pass  # No symlinks here (Windows without the privilege); the record entries are still checked
+
+    remove_installation(installed)
+
+    assert not os.path.exists(installed)
+    assert read_files(str(tmp_path / "Other")) == {"data.txt": "not ours", "lib/core.dll": "not ours either"}
+
+
+def build_archive():
+    files = {"FoxBr.exe": os.urandom(2 * 1024 * 1024), "lib/core.dll": os.urandom(1024 * 1024), "version.txt": b"2.0"}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:  # Stored, so the archive splits into segments
+        for path, data in files.items():
+            archive.writestr(path, data)
+    return files, buffer.getvalue()
+
+
+ARCHIVE_FILES, ARCHIVE = build_archive()
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        start, end = 0, len(ARCHIVE) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(ARCHIVE)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", '"v2"')
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        try:
+            self.wfile.write(ARCHIVE[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def archive_url(monkeypatch):
+    monkeypatch.setattr(download_engine, "BUFFER_SIZE", 64 * 1024)  # Several chunks per segment
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/FoxBr.zip"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def hash_reads(monkeypatch):
+    """Count the bytes the pipeline reads back from disk in sized reads, which only hashing uses."""
+    counted = []
+
+    class CountingFile(io.FileIO):
+        def read(self, size=-1):
+            data = super().read(size)
+            if size >= 0:
+                counted.append(len(data))
+            return data
+
+    def counting_open(path, mode="r", **kwargs):
+        return CountingFile(path) if mode == "rb" else open(path, mode, **kwargs)
+
+    monkeypatch.setattr(install_pipeline, "open", counting_open, raising=False)
+    return counted
+
+
+def run_pipeline(tmp_path, url, expected_sha256):
+    install_path = str(tmp_path / "FoxBr")
+    write_files(install_path, INSTALLED)
+    pipeline = InstallPipeline(url, str(tmp_path / "FoxBr.zip"), install_path, expected_sha256=expected_sha256)
+    return install_path, pipeline
+
+
+@pytest.mark.parametrize("buffer_size", [install_pipeline.HASH_BUFFER_SIZE, 0])
+def test_pipeline_hashes_segments_as_they_stream(tmp_path, archive_url, hash_reads, monkeypatch, buffer_size):
+    monkeypatch.setattr(install_pipeline, "HASH_BUFFER_SIZE", buffer_size)
+    install_path, pipeline = run_pipeline(tmp_path, archive_url, hashlib.sha256(ARCHIVE).hexdigest())
+
+    pipeline.run()
+
+    assert len(pipeline.downloader.segments) > 2
+    with open(os.path.join(install_path, "lib", "core.dll"), "rb") as file:
+        assert file.read() == ARCHIVE_FILES["lib/core.dll"]
+    assert not pipeline.hash_buffer
+    if buffer_size:
+        assert sum(hash_reads) == 0
+    else:
+        assert sum(hash_reads) > 0  # Without a buffer, segments after the first are read back
+
+
+def test_pipeline_rejects_an_archive_with_the_wrong_hash(tmp_path, archive_url):
+    install_path, pipeline = run_pipeline(tmp_path, archive_url, hashlib.sha256(b"other").hexdigest())
+
+    with pytest.raises(InstallError):
+        pipeline.run()
+
+    assert read_files(install_path) == INSTALLED
+    assert not os.path.exists(pipeline.part_path)
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+
+from session import SessionJournal
+from tab_model import Tab
+
+
+def make_tab(url, title, index):
+    tab = Tab(url, title)
+    tab.index = index
+    return tab
+
+
+def write_lines(path, records):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("".join(json.dumps(record) + "\n" for record in records))
+
+
+def test_load_replays_journal_over_snapshot(tmp_path):
+    journal = SessionJournal(str(tmp_path), flush_interval=60)
+    try:
+        with open(journal.snapshot_path, "w", encoding="utf-8") as file:
+            json.dump({"tabs": [{"id": 1, "url": "a", "title": "A"}, {"id": 2, "url": "b", "title": "B"}],
+                       "active": 1}, file)
+        write_lines(journal.journal_path, [
+            {"op": "open", "id": 3, "index": 1, "url": "c", "title": "C"},
+            {"op": "update", "id": 1, "url": "a2"},
+            {"op": "close", "id": 2},
+            {"op": "update", "id": 2, "title": "closed tabs stay closed"},
+            {"op": "active", "id": 3},
+        ])
+
+        tabs, active_index = journal.load()
+    finally:
+        journal.close()
+
+    assert [(tab["id"], tab["url"], tab["title"]) for tab in tabs] == [(1, "a2", "A"), (3, "c", "C")]
+    assert active_index == 1
+
+
+def test_load_stops_at_a_torn_last_record(tmp_path):
+    journal = SessionJournal(str(tmp_path), flush_interval=60)
+    try:
+        write_lines(journal.journal_path, [{"op": "open", "id": 1, "index": 0, "url": "a", "title": "A"}])
+        with open(journal.journal_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "open", "id": 2, "ind')
+
+        tabs, active_index = journal.load()
+    finally:
+        journal.close()
+
+    assert [tab["id"] for tab in tabs] == [1]
+    assert active_index == 0
+
+
+def test_updates_of_a_tab_are_merged_into_one_record(tmp_path):
+    journal = SessionJournal(str(tmp_path), flush_interval=60, compact_after=1000)
+    tab = make_tab("about:blank", "New Tab", 0)
+    journal.tab_opened(tab)
+    for step in range(20):
+        journal.tab_updated(tab, url=f"https://example.com/{step}")
+        journal.tab_updated(tab, title=f"Page {step}")
+    with journal.lock:
+        records = list(journal.pending)
+    journal.close()
+
+    assert records == [
+        {"op": "open", "id": tab.id, "index": 0, "url": "about:blank", "title": "New Tab"},
+        {"op": "update", "id": tab.id, "url": "https://example.com/19", "title": "Page 19"},
+    ]
+
+
+def test_compaction_writes_a_snapshot_and_empties_the_journal(tmp_path):
+    journal = SessionJournal(str(tmp_path), flush_interval=60, compact_after=1000)
+    tabs = [make_tab(f"https://example.com/{index}", f"Tab {index}", index) for index in range(3)]
+    for tab in tabs:
+        journal.tab_opened(tab)
+    journal.tab_closed(tabs[1])
+    journal.tab_updated(tabs[2], title="Renamed")
+    journal.tab_activated(tabs[2])
+    journal.close()  # Flushes and compacts
+
+    with open(journal.journal_path, encoding="utf-8") as file:
+        assert file.read() == ""
+    with open(journal.snapshot_path, encoding="utf-8") as file:
+        snapshot = json.load(file)
+    assert [tab["id"] for tab in snapshot["tabs"]] == [tabs[0].id, tabs[2].id]
+    assert snapshot["active"] == tabs[2].id
+
+    reopened = SessionJournal(str(tmp_path), flush_interval=60)
+    try:
+        restored, active_index = reopened.load()
+    finally:
+        reopened.close()
+    assert [(tab["url"], tab["title"]) for tab in restored] == [
+        ("https://example.com/0", "Tab 0"), ("https://example.com/2", "Renamed"),
+    ]
+    assert active_index == 1
+
+
+def test_compaction_runs_once_enough_records_are_written(tmp_path):
+    journal = SessionJournal(str(tmp_path), flush_interval=60, compact_after=5)
+    try:
+        for index in range(6):
+            journal.tab_opened(make_tab(f"https://example.com/{index}", "", index))
+        journal.wake.set()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(journal.snapshot_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with open(journal.snapshot_path, encoding="utf-8") as file:
+            assert len(json.load(file)["tabs"]) == 6
+    finally:
+        journal.close()
+
+
+def test_reset_replaces_the_saved_session(tmp_path):
+    journal = SessionJournal(str(tmp_path), flush_interval=60)
+    old = make_tab("https://old.example", "Old", 0)
+    journal.tab_opened(old)
+    new = [make_tab("https://new.example/1", "One", 0), make_tab("https://new.example/2", "Two", 1)]
+    journal.reset(new, new[1])
+    journal.close()
+
+    reopened = SessionJournal(str(tmp_path), flush_interval=60)
+    try:
+        tabs, active_index = reopened.load()
+    finally:
+        reopened.close()
+    assert [tab["url"] for tab in tabs] == ["https://new.example/1", "https://new.example/2"]
+    assert active_index == 1
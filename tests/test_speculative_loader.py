@@ -0,0 +1,20 @@
+import pytest
+
+# The loader builds web views; skipped where the web engine cannot load
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+
+from speculative_loader import strong_match
+
+
+@pytest.mark.parametrize("typed, url, expected", [
+    ("github.com/r", "https://github.com/rust-lang/rust", True),
+    ("www.github.com/", "https://github.com/rust-lang/rust", True),
+    ("github.co", "https://github.com/rust-lang/rust", False),  # The host isn't typed out yet
+    ("git", "https://github.com/", False),
+    ("foxbr://cache/c", "foxbr://cache/clear", False),
+    ("example.com/log", "https://example.com/logout?token=1", False),
+    ("ftp.example.com/", "ftp://ftp.example.com/file", False),
+    ("github.com/x", "https://github.com/rust-lang/rust", False),
+])
+def test_strong_match(typed, url, expected):
+    assert strong_match(typed, url) is expected
@@ -0,0 +1,75 @@
+import pytest
+
+from tab_model import Tab, TabModel
+
+
+@pytest.fixture
+def model():
+    model = TabModel()
+    for name in "abcde":
+        model.append(Tab(url=f"https://{name}.example/", title=name))
+    return model
+
+
+def titles(model):
+    return "".join(tab.title for tab in model)
+
+
+def assert_indexed(model):
+    assert [tab.index for tab in model] == list(range(len(model)))
+    assert all(tab in model for tab in model)
+
+
+def test_insert_and_remove_keep_positions_current(model):
+    inserted = Tab(title="x")
+    model.insert(2, inserted)
+
+    assert titles(model) == "abxcde"
+    assert_indexed(model)
+
+    removed = model.tab_at(0)
+    assert model.remove(removed) == 0
+    assert titles(model) == "bxcde"
+    assert removed.index == -1 and removed not in model
+    assert model.tab_at(len(model)) is None
+    assert_indexed(model)
+
+
+@pytest.mark.parametrize("source, target, expected", [(0, 3, "bcdae"), (4, 1, "aebcd"), (2, 2, "abcde")])
+def test_move_reorders_tabs(model, source, target, expected):
+    model.move(model.tab_at(source), target)
+
+    assert titles(model) == expected
+    assert_indexed(model)
+
+
+def test_browser_lookup_follows_the_tab(model):
+    tab, browser = model.tab_at(1), object()
+    model.set_browser(tab, browser)
+    model.move(tab, 4)
+
+    assert model.tab_for_browser(browser) is tab
+    model.remove(tab)
+    assert model.tab_for_browser(browser) is None
+
+
+@pytest.mark.parametrize("active, closed, expected", [
+    ("c", "c", "d"),  # The right-hand neighbour
+    ("e", "e", "d"),  # The last tab: the left-hand neighbour
+    ("b", "d", "b"),  # Another tab: unchanged
+])
+def test_active_tab_after_closing(model, active, closed, expected):
+    by_title = {tab.title: tab for tab in model}
+    model.active_tab = by_title[active]
+
+    model.remove(by_title[closed])
+
+    assert model.active_tab is by_title[expected]
+
+
+def test_closing_every_tab_leaves_none_active(model):
+    model.active_tab = model.tab_at(0)
+    while len(model):
+        model.remove(model.active_tab)
+
+    assert model.active_tab is None
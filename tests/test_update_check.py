@@ -0,0 +1,129 @@
+import types
+
+import pytest
+import requests
+
+import update_check
+from update_check import UpdateChecker, CHECK_INTERVAL, RETRY_DELAY, MAX_RETRY_DELAY
+
+
+def make_response(status_code, text="", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode("utf-8")
+    response.headers.update(headers or {})
+    response.url = "https://example.com/version"
+    return response
+
+
+class FakeSession:
+    """Answers get() from a queue of responses or exceptions, recording the request headers."""
+
+    def __init__(self):
+        self.answers = []
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(update_check, "time", types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "update_check.json")
+
+
+def test_first_check_fetches_and_keeps_the_validators(clock, session, state_path):
+    validators = {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    session.answers.append(make_response(200, "2.0\n", validators))
+    checker = UpdateChecker(state_path, session=session)
+
+    assert checker.check() == "2.0"
+    assert checker.last_result == "fetched"
+    assert session.requests == [{}]
+    assert checker.state["etag"] == '"abc"'
+    assert checker.state["next_check"] == clock.now + CHECK_INTERVAL
+
+
+def test_check_before_it_is_due_stays_off_the_network(clock, session, state_path):
+    session.answers.append(make_response(200, "2.0", {"ETag": '"abc"'}))
+    UpdateChecker(state_path, session=session).check()
+
+    clock.now += CHECK_INTERVAL - 1
+    checker = UpdateChecker(state_path, session=session)  # State survives a restart
+    assert checker.check() == "2.0"
+    assert checker.last_result == "skipped"
+    assert len(session.requests) == 1
+
+
+def test_due_check_is_conditional_and_accepts_304(clock, session, state_path):
+    session.answers.append(make_response(200, "2.0", {"ETag": '"abc"', "Last-Modified": "yesterday"}))
+    checker = UpdateChecker(state_path, session=session)
+    checker.check()
+
+    clock.now += CHECK_INTERVAL
+    session.answers.append(make_response(304))
+    assert checker.check() == "2.0"
+
+    assert checker.last_result == "not_modified"
+    assert session.requests[-1] == {"If-None-Match": '"abc"', "If-Modified-Since": "yesterday"}
+    assert checker.state["next_check"] == clock.now + CHECK_INTERVAL
+
+
+def test_new_version_replaces_the_cached_one(clock, session, state_path):
+    session.answers.append(make_response(200, "2.0", {"ETag": '"abc"'}))
+    checker = UpdateChecker(state_path, session=session)
+    checker.check()
+
+    session.answers.append(make_response(200, "2.1", {"ETag": '"def"'}))
+    assert checker.check(force=True) == "2.1"
+    assert checker.state["etag"] == '"def"'
+    assert checker.state["last_modified"] is None
+
+
+def test_failures_back_off_exponentially_until_a_success(clock, session, state_path):
+    checker = UpdateChecker(state_path, session=session)
+    delays = []
+    for failure in range(10):
+        session.answers.append(requests.ConnectionError("offline") if failure % 2 else make_response(503))
+        assert checker.check() is None
+        assert checker.last_result == "failed"
+        delays.append(checker.state["next_check"] - clock.now)
+        clock.now = checker.state["next_check"]
+
+    assert delays[:4] == [RETRY_DELAY, RETRY_DELAY * 2, RETRY_DELAY * 4, RETRY_DELAY * 8]
+    assert max(delays) == MAX_RETRY_DELAY
+    assert checker.stats()["failures"] == 10
+
+    clock.now -= 1
+    assert checker.check() is None
+    assert checker.last_result == "skipped"
+
+    clock.now += 1
+    session.answers.append(make_response(200, "2.0"))
+    assert checker.check() == "2.0"
+    assert checker.stats()["failures"] == 0
+    assert checker.state["next_check"] == clock.now + CHECK_INTERVAL
+
+
+def test_update_available_compares_with_the_installed_version(clock, session, state_path):
+    session.answers.append(make_response(200, "2.0"))
+    checker = UpdateChecker(state_path, session=session)
+
+    assert checker.update_available("1.0") == "2.0"
+    assert checker.update_available("2.0") is None
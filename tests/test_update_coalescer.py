@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from update_coalescer import UpdateCoalescer, FRAME_INTERVAL_MS
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def coalescer(app):
+    coalescer = UpdateCoalescer()
+    yield coalescer
+    coalescer.deleteLater()
+
+
+def run_events(milliseconds=5 * FRAME_INTERVAL_MS):
+    deadline = time.monotonic() + milliseconds / 1000
+    while time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.002)
+
+
+def test_repeated_updates_for_one_key_are_merged(coalescer):
+    tab, window = object(), object()
+    applied = []
+    coalescer.submit(tab, "title", applied.append, "Loading")
+    coalescer.submit(window, "move", applied.append, (10, 10))
+    coalescer.submit(tab, "title", applied.append, "Example")
+    coalescer.submit(window, "move", applied.append, (20, 20))
+    coalescer.submit(tab, "title", applied.append, "Example Domain")
+
+    assert applied == []  # Nothing before the frame
+    run_events()
+
+    assert applied == [(20, 20), "Example Domain"]  # Latest arguments, in the order they last changed
+    assert coalescer.stats() == {"submitted": 5, "applied": 2, "dropped": 3}
+
+
+def test_flush_delivers_pending_updates_immediately(coalescer):
+    tab = object()
+    applied = []
+    coalescer.submit(tab, "url", applied.append, "https://example.com/")
+
+    coalescer.flush()
+
+    assert applied == ["https://example.com/"]
+    assert not coalescer.timer.isActive()
+    run_events()
+    assert applied == ["https://example.com/"]  # Not applied a second time by the frame timer
+
+
+def test_nothing_is_delivered_for_a_canceled_owner(coalescer):
+    closed, open_tab = object(), object()
+    applied = []
+    coalescer.submit(closed, "title", applied.append, "closed")
+    coalescer.submit(open_tab, "title", applied.append, "open")
+
+    coalescer.cancel(closed)  # What a tab does when it closes
+    run_events()
+    coalescer.flush()
+
+    assert applied == ["open"]
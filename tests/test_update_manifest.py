@@ -0,0 +1,135 @@
+import os
+import shutil
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from install_pipeline import record_installed_files, BACKUP_DIR_NAME, STAGING_DIR_NAME
+from update_manifest import (
+    MANIFEST_FILENAME, build_manifest, save_manifest, load_manifest, publish_release, diff_manifests,
+    apply_delta_update, is_safe_path,
+)
+
+OLD_RELEASE = {"FoxBr.exe": "exe 1.0", "lib/core.dll": "core 1.0", "lib/legacy.dll": "legacy", "readme.txt": "same"}
+NEW_RELEASE = {"FoxBr.exe": "exe 2.0", "lib/core.dll": "core 2.0", "lib/extra.dll": "extra", "readme.txt": "same"}
+
+
+def write_files(root, files):
+    for path, text in files.items():
+        full_path = os.path.join(root, *path.split("/"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as file:
+            file.write(text)
+
+
+def read_files(root):
+    files = {}
+    for current, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(current, name)
+            with open(path, "rb") as file:
+                files[os.path.relpath(path, root).replace(os.sep, "/")] = file.read()
+    return files
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def release(tmp_path):
+    """Publish NEW_RELEASE to a directory served over HTTP; returns (url, manifest, served directory)."""
+    release_dir, served = str(tmp_path / "release"), str(tmp_path / "served")
+    write_files(release_dir, NEW_RELEASE)
+    manifest = publish_release(release_dir, "2.0", served)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=served))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", manifest, served
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def install(tmp_path):
+    """An installed OLD_RELEASE with its cached manifest and install record."""
+    install_path = str(tmp_path / "FoxBr")
+    write_files(install_path, OLD_RELEASE)
+    save_manifest(build_manifest(install_path, "1.0"), os.path.join(install_path, MANIFEST_FILENAME))
+    record_installed_files(install_path, list(OLD_RELEASE) + [MANIFEST_FILENAME])
+    return install_path
+
+
+def test_diff_reports_added_changed_and_removed_files(tmp_path):
+    old_dir, new_dir = str(tmp_path / "old"), str(tmp_path / "new")
+    write_files(old_dir, OLD_RELEASE)
+    write_files(new_dir, NEW_RELEASE)
+
+    changed, removed = diff_manifests(build_manifest(old_dir, "1.0"), build_manifest(new_dir, "2.0"))
+
+    assert sorted(changed) == ["FoxBr.exe", "lib/core.dll", "lib/extra.dll"]  # Changed and added
+    assert removed == ["lib/legacy.dll"]
+
+
+def test_delta_update_fetches_only_changed_files(release, install):
+    url, manifest, _ = release
+
+    result = apply_delta_update(url, install, manifest)
+
+    assert result["changed_files"] == 3
+    assert result["removed_files"] == 1
+    fetched = ("FoxBr.exe", "lib/core.dll", "lib/extra.dll")
+    assert result["bytes_downloaded"] == sum(len(NEW_RELEASE[path]) for path in fetched)
+    installed = read_files(install)
+    assert {path: installed.pop(path).decode() for path in NEW_RELEASE} == NEW_RELEASE
+    assert sorted(installed) == ["installed_files.txt", MANIFEST_FILENAME]
+    assert load_manifest(os.path.join(install, MANIFEST_FILENAME))["version"] == "2.0"
+
+
+def test_hash_mismatch_leaves_the_install_untouched(release, install):
+    url, manifest, served = release
+    with open(os.path.join(served, manifest["files"]["lib/extra.dll"]["sha256"]), "w") as asset:
+        asset.write("tampered")
+    before = read_files(install)
+
+    assert apply_delta_update(url, install, manifest) is None
+
+    assert read_files(install) == before
+    assert not os.path.exists(os.path.join(install, STAGING_DIR_NAME))
+
+
+@pytest.mark.parametrize("unsafe", ["../outside.dll", "/etc/outside.dll", "C:/outside.dll"])
+def test_unsafe_path_is_refused(release, install, tmp_path, unsafe):
+    url, manifest, served = release
+    entry = manifest["files"]["lib/extra.dll"]
+    manifest["files"][unsafe] = entry
+    before = read_files(install)
+
+    assert not is_safe_path(unsafe)
+    assert apply_delta_update(url, install, manifest) is None
+
+    assert read_files(install) == before
+    assert not os.path.exists(tmp_path / "outside.dll")
+
+
+def test_failed_swap_is_rolled_back(release, install, monkeypatch):
+    url, manifest, _ = release
+    before = read_files(install)
+    replace = os.replace
+
+    def failing_replace(source, destination):
+        if os.path.basename(source) == "extra.dll":
+            raise PermissionError(13, "In use", source)
+        replace(source, destination)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    assert apply_delta_update(url, install, manifest) is None
+    monkeypatch.undo()
+
+    assert not read_files(os.path.join(install, BACKUP_DIR_NAME))
+    shutil.rmtree(os.path.join(install, BACKUP_DIR_NAME), ignore_errors=True)
+    assert read_files(install) == before
+    assert not os.path.exists(os.path.join(install, STAGING_DIR_NAME))
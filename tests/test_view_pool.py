@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("QTWEBENGINE_CHROMIUM_FLAGS", "--disable-gpu")
+# Must be imported before the QApplication; skipped where the engine cannot load
+pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtWidgets import QApplication
+
+from view_pool import WebViewPool
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def delete_later_now():
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def test_released_view_gets_a_fresh_page_and_is_reused(app):
+    pool = WebViewPool(None, size=1)
+    pool.refill_timer.stop()
+    view = pool.acquire()
+    old_page = view.page()
+
+    pool.release(view)
+    delete_later_now()
+
+    assert sip.isdeleted(old_page)
+    assert not sip.isdeleted(view) and not sip.isdeleted(view.page())
+    assert view.page() is not old_page
+    assert pool.acquire() is view
+    assert pool.stats()["recycled"] == 1
+    view.deleteLater()
+    delete_later_now()
+
+
+def test_view_is_deleted_when_the_pool_is_full(app):
+    pool = WebViewPool(None, size=0)
+    view = pool.acquire()
+
+    pool.release(view)
+    delete_later_now()
+
+    assert sip.isdeleted(view)
+    assert pool.stats()["ready"] == 0
@@ -0,0 +1,164 @@
+import time
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QObject, QTimer, QBuffer, QIODevice, pyqtSignal
+from PyQt5.QtGui import QPixmap
+
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_HEIGHT = 200
+JPEG_QUALITY = 75
+BYTE_BUDGET = 8 * 1024 * 1024  # Compressed thumbnails kept; about 500 tabs at 15 KB each
+CAPTURE_DELAY_MS = 500  # After a load or tab switch, so the page has painted
+
+
+class ThumbnailCache(QObject):
+    """Compressed page thumbnails by tab id, in an LRU bounded by total bytes.
+
+    Only grabbing the view happens on the GUI thread; downscaling and JPEG
+    encoding run on a worker thread, which keeps just the newest capture
+    per tab when it falls behind. Thumbnails outlive the view, so tabs
+    whose view was discarded still have one.
+    """
+
+    thumbnail_ready = pyqtSignal(int)  # Tab id; emitted from the worker thread
+
+    def __init__(self, parent=None, byte_budget=BYTE_BUDGET):
+        super().__init__(parent)
+        self.byte_budget = byte_budget
+        self.entries = OrderedDict()  # Tab id -> JPEG bytes, least recently used first
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.captures = 0
+        self.capture_seconds = 0.0  # GUI thread
+        self.encodes = 0
+        self.encode_seconds = 0.0  # Worker thread
+
+        self.scheduled_tab = None
+        self.capture_timer = QTimer(self)
+        self.capture_timer.setSingleShot(True)
+        self.capture_timer.setInterval(CAPTURE_DELAY_MS)
+        self.capture_timer.timeout.connect(self._capture_scheduled)
+
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()  # Tab id -> full-size QImage awaiting encoding
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="Thumbnails", daemon=True)
+        self.thread.start()
+
+    def schedule_capture(self, tab):
+        """Capture a tab shortly, if its view is still on screen by then."""
+        self.scheduled_tab = tab
+        self.capture_timer.start()
+
+    def capture(self, tab_id, view):
+        """Grab a visible view now and queue the image for encoding."""
+        start = time.perf_counter()
+        image = view.grab().toImage()
+        self.capture_seconds += time.perf_counter() - start
+        self.captures += 1
+        if image.isNull():
+            return
+        with self.condition:
+            self.pending.pop(tab_id, None)
+            self.pending[tab_id] = image
+            self.condition.notify()
+
+    def get(self, tab_id):
+        """Return a tab's thumbnail as JPEG bytes, or None."""
+        with self.lock:
+            data = self.entries.get(tab_id)
+            if data is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(tab_id)
+            self.hits += 1
+            return data
+
+    def pixmap(self, tab_id):
+        """Decode a tab's thumbnail, or None."""
+        data = self.get(tab_id)
+        if data is None:
+            return None
+        pixmap = QPixmap()
+        pixmap.loadFromData(data, "JPEG")
+        return pixmap
+
+    def remove(self, tab_id):
+        """Forget a closed tab."""
+        with self.condition:
+            self.pending.pop(tab_id, None)
+        with self.lock:
+            data = self.entries.pop(tab_id, None)
+            if data is not None:
+                self.bytes -= len(data)
+        if self.scheduled_tab is not None and self.scheduled_tab.id == tab_id:
+            self.capture_timer.stop()
+            self.scheduled_tab = None
+
+    def stats(self):
+        with self.lock:
+            entries, size = len(self.entries), self.bytes
+        return {
+            "entries": entries,
+            "bytes": size,
+            "byte_budget": self.byte_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "captures": self.captures,
+            "mean_capture_ms": self.capture_seconds / self.captures * 1000 if self.captures else 0.0,
+            "mean_encode_ms": self.encode_seconds / self.encodes * 1000 if self.encodes else 0.0,
+        }
+
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _capture_scheduled(self):
+        tab, self.scheduled_tab = self.scheduled_tab, None
+        view = tab.browser if tab is not None else None
+        if view is None or not view.isVisible() or view.url().scheme() == "data":
+            return  # Switched away, discarded, or still showing the placeholder
+        self.capture(tab.id, view)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                tab_id, image = self.pending.popitem(last=False)
+
+            start = time.perf_counter()
+            data = self._encode(image)
+            self.encode_seconds += time.perf_counter() - start
+            self.encodes += 1
+            self._store(tab_id, data)
+            self.thumbnail_ready.emit(tab_id)
+
+    def _encode(self, image):
+        """Scale to the thumbnail width, keep the top of the page, and compress."""
+        scaled = image.scaledToWidth(THUMBNAIL_WIDTH, Qt.SmoothTransformation)
+        scaled = scaled.copy(0, 0, THUMBNAIL_WIDTH, min(THUMBNAIL_HEIGHT, scaled.height()))
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        scaled.save(buffer, "JPEG", JPEG_QUALITY)
+        return bytes(buffer.data())
+
+    def _store(self, tab_id, data):
+        with self.lock:
+            previous = self.entries.pop(tab_id, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self.entries[tab_id] = data
+            self.bytes += len(data)
+            while self.bytes > self.byte_budget and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
@@ -1,5 +1,6 @@
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QToolButton, QPushButton
 from PyQt5.QtCore import Qt, QPoint
+from tab_strip import TabStrip
 
 
 class CustomTitleBar(QWidget):
@@ -19,28 +20,19 @@ class CustomTitleBar(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
-        # Tab Bar
-        self.tab_bar = QWidget(self)
-        self.tab_bar_layout = QHBoxLayout()
-        self.tab_bar_layout.setContentsMargins(5, 5, 5, 5)  # Internal margins for the tab bar
-        self.tab_bar_layout.setSpacing(5)  # Spacing between tabs
-        self.tab_bar_layout.setAlignment(Qt.AlignLeft)  # Strict left alignment for tabs
-        self.tab_bar.setLayout(self.tab_bar_layout)
-        self.tab_bar.setStyleSheet("background-color: #f0f0f0;")
-        
+        # Tab Strip (only the tabs in view get widgets)
+        self.tab_strip = TabStrip(parent.tabs, self)
+        self.tab_strip.tab_clicked.connect(parent.switch_to_tab)
+        self.tab_strip.tab_close_requested.connect(parent.close_tab)
+        layout.addWidget(self.tab_strip, 1)
+
         # Add "+" button for opening new tabs
         self.add_tab_button = QToolButton(self)
         self.add_tab_button.setText("+")
         self.add_tab_button.setFixedSize(50, 40)
         self.add_tab_button.setToolTip("Open a new tab")
         self.add_tab_button.clicked.connect(lambda: parent.add_new_tab("https://www.google.com"))
-        self.tab_bar_layout.addWidget(self.add_tab_button)
-
-        # Add the tab bar to the title bar layout
-        layout.addWidget(self.tab_bar)
-
-        # Spacer to push control buttons to the right
-        layout.addStretch()
+        layout.addWidget(self.add_tab_button)
 
         # Action Buttons (Minimize, Maximize/Restore, Close)
         self.minimize_btn = QPushButton("–")
@@ -87,11 +79,13 @@ class CustomTitleBar(QWidget):
             if not self.drag_started and distance_moved > self.DRAG_THRESHOLD:
                 self.drag_started = True  # Start the drag only after exceeding the threshold
             if self.drag_started:
-                self.parent.move(event.globalPos() - self.drag_position)
+                # At most one move per frame, to the latest position
+                self.parent.ui_updates.submit(self.parent, "move", self.parent.move, event.globalPos() - self.drag_position)
             event.accept()
 
     def mouseReleaseEvent(self, event):
         """Maximize the window if dragged to the top of the screen."""
+        self.parent.ui_updates.flush()  # Finish the drag before deciding
         if self.drag_started:
             # Only maximize if the drag ended at the top of the screen
             if event.globalPos().y() <= 0:  # Top of the screen
@@ -1,10 +1,26 @@
-from PyQt5.QtWidgets import QToolBar, QLineEdit, QPushButton
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QToolBar, QLineEdit, QPushButton, QCompleter
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtCore import Qt, QModelIndex, QTimer, pyqtSignal
+
+SUGGESTION_URL_ROLE = Qt.UserRole
+SUGGESTION_TAB_ROLE = Qt.UserRole + 1
+SEARCH_URL = "https://www.google.com/search?q="
+
+
+def url_from_input(text):
+    """Turn text typed in the URL field into the URL to load (a search if it isn't an address)."""
+    if text.startswith("http://") or text.startswith("https://") or text.startswith("foxbr://"):
+        return text
+    if "." in text:  # Likely a domain
+        return "http://" + text
+    return SEARCH_URL + text.replace(" ", "+")
 
 
 class CustomToolBar(QToolBar):
     """Custom Toolbar with navigation buttons, URL field, and settings button."""
 
+    suggestion_chosen = pyqtSignal(str, object)  # URL, and the open tab's id for "switch to tab"
+
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
@@ -59,9 +75,25 @@ class CustomToolBar(QToolBar):
         # URL Field
         self.url_field = QLineEdit()
         self.url_field.setPlaceholderText("Enter URL")
-        self.url_field.returnPressed.connect(self.parent.on_url_entered)
+        self.url_field.returnPressed.connect(self.on_return_pressed)
+        self.url_field.textEdited.connect(self.parent.on_url_text_edited)
         self.addWidget(self.url_field)
 
+        # Suggestion popup; the suggestions themselves are computed off the UI thread
+        self.suggestion_model = QStandardItemModel(self)
+        self.completer = QCompleter(self.suggestion_model, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setCompletionRole(SUGGESTION_URL_ROLE)
+        self.completer.setWidget(self.url_field)
+        self.completer.activated[QModelIndex].connect(self.on_suggestion_activated)
+        self.suppress_return = False
+
+        # Tab Overview Button
+        self.overview_button = QPushButton("▦")
+        self.overview_button.setToolTip("Tab overview")
+        self.overview_button.clicked.connect(self.parent.on_overview_clicked)
+        self.addWidget(self.overview_button)
+
         # Settings Button
         self.settings_button = QPushButton(" ⠇")
         self.settings_button.setToolTip("Settings")
@@ -72,3 +104,29 @@ class CustomToolBar(QToolBar):
         """Update the URL field."""
         self.url_field.setText(url.toString())
         self.url_field.setCursorPosition(0)
+
+    def show_suggestions(self, query, suggestions):
+        """Show (kind, url, title, tab_id) suggestions unless the text has changed since."""
+        if query != self.url_field.text() or not self.url_field.hasFocus():
+            return
+        self.suggestion_model.clear()
+        for kind, url, title, tab_id in suggestions:
+            label = f"{title} — {url}" if title else url
+            item = QStandardItem(f"Switch to tab: {label}" if kind == "tab" else label)
+            item.setData(url, SUGGESTION_URL_ROLE)
+            item.setData(tab_id, SUGGESTION_TAB_ROLE)
+            self.suggestion_model.appendRow(item)
+        if suggestions:
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def on_suggestion_activated(self, index):
+        """Open the chosen suggestion; the Enter key that chose it must not load the typed text."""
+        self.suppress_return = True
+        QTimer.singleShot(0, lambda: setattr(self, "suppress_return", False))
+        self.suggestion_chosen.emit(index.data(SUGGESTION_URL_ROLE), index.data(SUGGESTION_TAB_ROLE))
+
+    def on_return_pressed(self):
+        if not self.suppress_return:
+            self.parent.on_url_entered()
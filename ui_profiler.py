@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import threading
+from collections import deque, Counter
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from app_paths import data_path
+
+PROFILE_FLAG = "--profile"  # cProfile of the UI thread plus the stall watchdog
+WATCH_STALLS_FLAG = "--watch-stalls"  # The stall watchdog alone
+PROFILES_DIR_NAME = "profiles"
+STALL_THRESHOLD_MS = 100  # Event loop latency that counts as a stall
+PING_INTERVAL_MS = 50  # Time between latency probes
+SAMPLE_INTERVAL_MS = 5  # Stack sampling period during a stall
+MAX_SAMPLES_PER_STALL = 2000
+LATENCY_HISTORY_SIZE = 10000
+NATIVE_HANDLER = "[native]"  # A stall with no Python code on the stack, e.g. layout or painting
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)})"
+
+
+def stack_frames(frame):
+    """Frames of a stack, outermost first."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def handler_name(frames, loop_depth):
+    """The slot the event loop is running: the first frame above the one that entered the loop.
+
+    Lambdas used as connection adapters are skipped in favour of the method they call.
+    """
+    handlers = frames[loop_depth + 1:]
+    if not handlers:
+        return NATIVE_HANDLER
+    code = next((frame.f_code for frame in handlers if frame.f_code.co_name != "<lambda>"), handlers[0].f_code)
+    return getattr(code, "co_qualname", code.co_name)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class StallWatchdog(QObject):
+    """Measure UI event loop latency from a helper thread and sample the UI thread's stack during stalls.
+
+    The helper posts a queued ping to the UI thread every ping interval and
+    waits for it to be serviced. Once the wait passes the threshold, the UI
+    thread's Python stack is sampled until the ping gets through. Each stall
+    is tagged with the handler that was running, found from the stack.
+    """
+
+    _ping = pyqtSignal()
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, interval_ms=PING_INTERVAL_MS,
+                 sample_interval_ms=SAMPLE_INTERVAL_MS, loop_depth=None):
+        super().__init__()
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.sample_interval = sample_interval_ms / 1000
+        # Depth of the frame that runs the event loop (app.exec_()); by default the caller's
+        self.loop_depth = len(stack_frames(sys._getframe(1))) - 1 if loop_depth is None else loop_depth
+        self.main_thread_id = threading.main_thread().ident
+        self.latencies = deque(maxlen=LATENCY_HISTORY_SIZE)
+        self.stalls = []
+        self.stacks = Counter()  # Folded stack -> samples, over all stalls
+        self.pong = threading.Event()
+        self.stopped = threading.Event()
+        self._ping.connect(self.pong.set, Qt.QueuedConnection)
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="StallWatchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.pong.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def stats(self):
+        latencies = [latency * 1000 for latency in self.latencies]
+        return {
+            "probes": len(latencies),
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": max(latencies, default=0.0),
+            "stalls": len(self.stalls),
+            "stall_ms": sum(stall["duration_ms"] for stall in self.stalls),
+            "by_handler": dict(Counter(stall["handler"] for stall in self.stalls)),
+        }
+
+    def write(self, prefix):
+        """Write <prefix>.stalls.folded (flame graph stacks) and <prefix>.stalls.json; returns their paths."""
+        folded_path, json_path = prefix + ".stalls.folded", prefix + ".stalls.json"
+        with open(folded_path, "w", encoding="utf-8") as folded_file:
+            for stack, count in self.stacks.most_common():
+                folded_file.write(f"{stack} {count}\n")
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump({
+                "threshold_ms": self.threshold * 1000,
+                "sample_interval_ms": self.sample_interval * 1000,
+                "latency": self.stats(),
+                "stalls": self.stalls,
+            }, json_file, indent=2)
+        return [folded_path, json_path]
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.pong.clear()
+            sent = time.perf_counter()
+            self._ping.emit()
+            if not self.pong.wait(self.threshold):
+                self._sample_stall(sent)
+            if self.stopped.is_set():
+                return
+            self.latencies.append(time.perf_counter() - sent)
+            self.stopped.wait(self.interval)
+
+    def _sample_stall(self, sent):
+        """Sample the UI thread's stack until the ping is serviced."""
+        samples = Counter()
+        handlers = Counter()
+        sample_count = 0
+        while not self.pong.wait(self.sample_interval):
+            if sample_count >= MAX_SAMPLES_PER_STALL:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                continue
+            frames = stack_frames(frame)
+            handler = handler_name(frames, self.loop_depth)
+            del frame
+            stack = ";".join([f"[{handler}]"] + [frame_name(f) for f in frames])
+            del frames
+            samples[stack] += 1
+            handlers[handler] += 1
+            sample_count += 1
+        if self.stopped.is_set():
+            return
+        self.stacks.update(samples)
+        handler = handlers.most_common(1)[0][0] if handlers else NATIVE_HANDLER
+        self.stalls.append({
+            "time": time.time(),
+            "duration_ms": (time.perf_counter() - sent) * 1000,
+            "handler": handler,
+            "samples": sample_count,
+            "top_stack": samples.most_common(1)[0][0] if samples else None,
+        })
+        print(f"[Profiler] UI stalled {self.stalls[-1]['duration_ms']:.0f} ms in {handler}", file=sys.stderr)
+
+
+class UiProfiler:
+    """Opt-in profiling for an entry point: cProfile of the UI thread and the stall watchdog.
+
+    Results go to the profiles directory when the process exits: a .prof
+    file (pstats; snakeviz, tuna, flameprof) and folded stall stacks
+    (speedscope, flamegraph.pl, inferno) with a JSON summary.
+    """
+
+    def __init__(self, name, profile=False, watch_stalls=False):
+        self.name = name
+        self.profile = cProfile.Profile() if profile else None
+        self.watch_stalls = watch_stalls or profile
+        self.watchdog = None
+        self.prefix = data_path(PROFILES_DIR_NAME, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        if self.profile is not None:
+            self.profile.enable()
+        atexit.register(self.stop)
+
+    @classmethod
+    def from_argv(cls, name, argv):
+        """Build a profiler from the command line flags; returns it (or None) and the remaining arguments."""
+        profile = PROFILE_FLAG in argv
+        watch_stalls = WATCH_STALLS_FLAG in argv
+        argv = [arg for arg in argv if arg not in (PROFILE_FLAG, WATCH_STALLS_FLAG)]
+        if not (profile or watch_stalls):
+            return None, argv
+        return cls(name, profile, watch_stalls), argv
+
+    def watch(self, app):
+        """Start the stall watchdog for an application's event loop; call from the frame that runs it."""
+        if not self.watch_stalls or self.watchdog is not None:
+            return
+        self.watchdog = StallWatchdog(loop_depth=len(stack_frames(sys._getframe(1))) - 1)
+        self.watchdog.start()
+        app.aboutToQuit.connect(self.watchdog.stop)
+
+    def stop(self):
+        """Stop profiling and write the results; runs at exit."""
+        paths = []
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.prefix + ".prof")
+            paths.append(self.prefix + ".prof")
+            self.profile = None
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            paths.extend(self.watchdog.write(self.prefix))
+            print(f"[Profiler] Event loop latency: {self.watchdog.stats()}", file=sys.stderr)
+            self.watchdog = None
+        for path in paths:
+            print(f"[Profiler] Wrote {path}", file=sys.stderr)
@@ -1,12 +1,13 @@
 import sys
 import os
-import shutil
 import ctypes
 import winshell  # pip install winshell
 from PyQt5.QtWidgets import (
     QApplication, QVBoxLayout, QLabel, QPushButton, QProgressBar, QMessageBox, QWidget
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from update_coalescer import UpdateCoalescer
+from install_pipeline import remove_installation
 import winreg
 
 REGISTRY_KEY_PATH = r"SOFTWARE\FoxTeam\FoxBr"
@@ -67,29 +68,24 @@ class UninstallerWorker(QThread):
         self.uninstaller_path = uninstaller_path
 
     def run(self):
+        last_progress = -1
+
+        def report(removed, total):
+            nonlocal last_progress
+            progress = int(removed / total * 100) if total else 100
+            if progress != last_progress:
+                last_progress = progress
+                self.progress_updated.emit(progress)
+
         try:
-            # Count total files, excluding the uninstaller itself
-            total_files = sum(len(files) for _, _, files in os.walk(self.uninstall_path))
-            total_files -= 1  # Exclude the uninstaller itself
-            deleted_files = 0
-
-            for root, dirs, files in os.walk(self.uninstall_path, topdown=False):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if file_path == self.uninstaller_path:
-                        continue  # Skip the uninstaller
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    deleted_files += 1
-                    progress = int((deleted_files / total_files) * 100)
-                    self.progress_updated.emit(progress)
-                for directory in dirs:
-                    dir_path = os.path.join(root, directory)
-                    if os.path.exists(dir_path):
-                        shutil.rmtree(dir_path)
-
-            if os.path.exists(self.uninstall_path):
-                shutil.rmtree(self.uninstall_path, ignore_errors=True)
+            # Skip the uninstaller itself; it is still running
+            stats = remove_installation(self.uninstall_path, keep=[self.uninstaller_path], progress_callback=report)
+            print(
+                f"Removed {stats['removed']} of {stats['files']} files in {stats['seconds']:.2f} s "
+                f"(file list from {stats['source']})."
+            )
+            for path in stats["failed"]:
+                print(f"Failed to remove {path}")
 
             self.progress_updated.emit(100)  # Ensure progress reaches 100%
             self.uninstallation_complete.emit()
@@ -126,6 +122,7 @@ class Uninstaller(QWidget):
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setAlignment(Qt.AlignCenter)
+        self.progress_updates = UpdateCoalescer(self)  # At most one repaint per frame
         self.layout.addWidget(self.progress_bar)
 
         self.uninstall_button = QPushButton("Uninstall")
@@ -173,11 +170,12 @@ class Uninstaller(QWidget):
         )
 
     def update_progress(self, progress):
-        """Update the progress bar."""
-        self.progress_bar.setValue(progress)
+        """Update the progress bar, once per frame at most."""
+        self.progress_updates.submit(self.progress_bar, "value", self.progress_bar.setValue, progress)
 
     def complete_uninstallation(self):
         """Handle the completion of the uninstallation process."""
+        self.progress_updates.flush()
         remove_registry_entry()
         QMessageBox.information(self, "Uninstallation Complete", "FoxBr has been successfully removed.")
         self.delete_uninstaller()
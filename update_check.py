@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from app_paths import data_path
+
+VERSION_URL = "https://raw.githubusercontent.com/FoxH2010/FoxBr/refs/heads/main/version"
+STATE_FILENAME = "update_check.json"
+CHECK_INTERVAL = 6 * 60 * 60  # Seconds between checks when the last one succeeded
+RETRY_DELAY = 15 * 60  # First retry after a failed check; doubles per failure
+MAX_RETRY_DELAY = 24 * 60 * 60
+POOL_SIZE = 8  # Connections kept per host: the download's parallel segments plus the checks
+VERSION_FILENAME = "version.txt"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def shared_session():
+    """Return the process-wide pooled HTTP session used for version checks and downloads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def read_installed_version(install_path):
+    """Read the installed version from the version file."""
+    version_file_path = os.path.join(install_path, VERSION_FILENAME)
+    if os.path.exists(version_file_path):
+        with open(version_file_path, "r") as version_file:
+            return version_file.read().strip()
+    return None
+
+
+class UpdateChecker:
+    """Check the published version at most once per interval, with conditional requests.
+
+    The time of the last check, the version it found and the response's
+    ETag and Last-Modified are kept in a small JSON file, so a check that is
+    not due yet costs one file read and no network. A due check sends
+    If-None-Match/If-Modified-Since and usually gets an empty 304 back.
+    Failed checks are retried with exponential backoff.
+    """
+
+    def __init__(self, state_path=None, session=None, url=VERSION_URL, interval=CHECK_INTERVAL):
+        self.state_path = state_path or data_path(STATE_FILENAME)
+        self.session = session or shared_session()
+        self.url = url
+        self.interval = interval
+        self.state = self._load()
+        self.last_result = None  # "skipped", "not_modified", "fetched" or "failed"
+        self.last_error = None
+
+    def due(self, now=None):
+        now = time.time() if now is None else now
+        return now >= self.state.get("next_check", 0)
+
+    def check(self, force=False):
+        """Return the latest published version, or None if it is not known.
+
+        Before the next check is due the cached version is returned without
+        touching the network, unless force is set.
+        """
+        now = time.time()
+        if not force and not self.due(now):
+            self.last_result = "skipped"
+            return self.state.get("version")
+
+        headers = {}
+        if self.state.get("version"):
+            if self.state.get("etag"):
+                headers["If-None-Match"] = self.state["etag"]
+            if self.state.get("last_modified"):
+                headers["If-Modified-Since"] = self.state["last_modified"]
+        try:
+            response = self.session.get(self.url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                self.last_result = "not_modified"
+            else:
+                response.raise_for_status()
+                self.state["version"] = response.text.strip()
+                self.state["etag"] = response.headers.get("ETag")
+                self.state["last_modified"] = response.headers.get("Last-Modified")
+                self.last_result = "fetched"
+        except requests.RequestException as e:
+            print(f"[Updater] Error fetching version: {e}")
+            self.last_error = str(e)
+            failures = self.state.get("failures", 0) + 1
+            self.state["failures"] = failures
+            self.state["next_check"] = now + min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (failures - 1))
+            self.last_result = "failed"
+            self._save()
+            return None
+
+        self.state["failures"] = 0
+        self.state["last_check"] = now
+        self.state["next_check"] = now + self.interval
+        self._save()
+        return self.state["version"]
+
+    def update_available(self, installed_version, force=False):
+        """Return the newer version if one is published, else None."""
+        latest = self.check(force)
+        if latest and latest != installed_version:
+            return latest
+        return None
+
+    def stats(self):
+        return {
+            "last_result": self.last_result,
+            "version": self.state.get("version"),
+            "last_check": self.state.get("last_check"),
+            "next_check": self.state.get("next_check"),
+            "failures": self.state.get("failures", 0),
+        }
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r") as state_file:
+                state = json.load(state_file)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        temp_path = self.state_path + ".tmp"
+        try:
+            with open(temp_path, "w") as state_file:
+                json.dump(self.state, state_file)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            print(f"[Updater] Failed to save update check state: {e}")
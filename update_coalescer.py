@@ -0,0 +1,56 @@
+import time
+from PyQt5.QtCore import QObject, QTimer
+
+FRAME_INTERVAL_MS = 16  # One display frame at 60 Hz
+
+
+class UpdateCoalescer(QObject):
+    """Collapse bursts of UI updates into at most one apply per display frame.
+
+    submit(owner, name, apply, *args) keeps only the latest arguments for
+    each (owner, name); everything pending is applied together on the next
+    frame. Updates replaced before they were applied are counted as dropped.
+    Must be used from the UI thread.
+    """
+
+    def __init__(self, parent=None, interval_ms=FRAME_INTERVAL_MS):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.pending = {}  # (owner, name) -> (apply, args), in submission order
+        self.last_flush = 0.0
+        self.submitted = 0
+        self.applied = 0
+        self.dropped = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def submit(self, owner, name, apply, *args):
+        key = (owner, name)
+        self.submitted += 1
+        if key in self.pending:
+            self.dropped += 1
+            del self.pending[key]  # Re-insert so updates apply in the order they last changed
+        self.pending[key] = (apply, args)
+        if not self.timer.isActive():
+            # Apply on the next event loop pass if a frame has gone by, else at the frame boundary
+            elapsed_ms = (time.monotonic() - self.last_flush) * 1000
+            self.timer.start(max(0, int(self.interval_ms - elapsed_ms)))
+
+    def cancel(self, owner):
+        """Drop pending updates of an owner, e.g. a view that is being released."""
+        for key in [key for key in self.pending if key[0] is owner]:
+            del self.pending[key]
+
+    def flush(self):
+        """Apply everything pending now."""
+        self.timer.stop()
+        self.last_flush = time.monotonic()
+        pending, self.pending = self.pending, {}
+        for apply, args in pending.values():
+            self.applied += 1
+            apply(*args)
+
+    def stats(self):
+        return {"submitted": self.submitted, "applied": self.applied, "dropped": self.dropped}
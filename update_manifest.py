@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import requests
+from download_engine import PART_SUFFIX, STATE_SUFFIX
+from install_pipeline import (
+    STAGING_DIR_NAME, BACKUP_DIR_NAME, INSTALL_RECORD_NAME, swap_in, record_installed_files, is_safe_path,
+)
+
+MANIFEST_FILENAME = "manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Files in the install directory that are never part of a release
+IGNORED_NAMES = {
+    MANIFEST_FILENAME, STAGING_DIR_NAME, BACKUP_DIR_NAME, INSTALL_RECORD_NAME,
+    "version.txt", "FoxBr_Update.zip", "FoxBr.zip",
+}
+
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_directory(directory):
+    """Hash every release file under a directory, keyed by its relative POSIX path."""
+    files = {}
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in IGNORED_NAMES]
+        for name in names:
+            if root == directory and (name in IGNORED_NAMES or name.endswith((PART_SUFFIX, STATE_SUFFIX))):
+                continue
+            path = os.path.join(root, name)
+            relative_path = os.path.relpath(path, directory).replace(os.sep, "/")
+            files[relative_path] = {"sha256": hash_file(path), "size": os.path.getsize(path)}
+    return files
+
+
+def build_manifest(directory, version, archive_path=None):
+    """Describe a release directory: per-file hashes and sizes, plus the full archive size."""
+    manifest = {"version": version, "files": scan_directory(directory)}
+    if archive_path and os.path.exists(archive_path):
+        manifest["archive_size"] = os.path.getsize(archive_path)
+    return manifest
+
+
+def load_manifest(path):
+    """Read a manifest file, or return None if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(manifest, path):
+    """Write a manifest file atomically."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def local_manifest(install_path):
+    """Return the cached manifest of the install directory, rebuilding it if missing."""
+    manifest = load_manifest(os.path.join(install_path, MANIFEST_FILENAME))
+    if manifest is None:
+        manifest = {"version": None, "files": scan_directory(install_path)}
+    return manifest
+
+
+def fetch_manifest(release_url, session=None):
+    """Download the manifest published with a release, or None if the release has none."""
+    try:
+        response = (session or requests).get(f"{release_url}/{MANIFEST_FILENAME}", timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"[Updater] No update manifest available: {e}")
+        return None
+
+
+def diff_manifests(local, remote):
+    """Return (changed, removed) relative paths between the installed and the new release."""
+    local_files = local.get("files", {})
+    remote_files = remote.get("files", {})
+    changed = [
+        path for path, entry in remote_files.items()
+        if local_files.get(path, {}).get("sha256") != entry["sha256"]
+    ]
+    removed = [path for path in local_files if path not in remote_files]
+    return changed, removed
+
+
+def download_file(url, save_path, expected_hash, session=None):
+    """Download one release file and verify its hash; returns the number of bytes fetched."""
+    digest = hashlib.sha256()
+    size = 0
+    with (session or requests).get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        with open(save_path, "wb") as file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+    if digest.hexdigest() != expected_hash:
+        raise ValueError(f"Hash mismatch for {url}")
+    return size
+
+
+def apply_delta_update(release_url, install_path, remote, session=None):
+    """Fetch only the files that changed and swap them in atomically.
+
+    Release files are published as assets named by their SHA-256 hash next to
+    the manifest. Replaced and removed files are moved to a backup directory
+    first, so any failure rolls the install back to the previous release.
+    Returns a dict of transfer statistics, or None if the update failed.
+    """
+    local = local_manifest(install_path)
+    changed, removed = diff_manifests(local, remote)
+    if local.get("version") is None:
+        removed = []  # Without a cached manifest, nothing is known to be ours to delete
+    if not all(is_safe_path(path) for path in changed + removed):
+        print("[Updater] Manifest contains unsafe paths. Refusing delta update.")
+        return None
+
+    staging_path = os.path.join(install_path, STAGING_DIR_NAME)
+    shutil.rmtree(staging_path, ignore_errors=True)
+    os.makedirs(staging_path)
+
+    remote_files = remote["files"]
+    downloaded = 0
+    try:
+        for path in changed:
+            staged_file = os.path.join(staging_path, path)
+            os.makedirs(os.path.dirname(staged_file), exist_ok=True)
+            entry = remote_files[path]
+            downloaded += download_file(f"{release_url}/{entry['sha256']}", staged_file, entry["sha256"], session)
+    except (requests.RequestException, OSError, ValueError) as e:
+        print(f"[Updater] Error downloading delta update: {e}")
+        shutil.rmtree(staging_path, ignore_errors=True)
+        return None
+
+    try:
+        swap_in(staging_path, install_path, removed)
+    except OSError as e:
+        print(f"[Updater] Error applying delta update, rolled back: {e}")
+        shutil.rmtree(staging_path, ignore_errors=True)
+        return None
+    save_manifest(remote, os.path.join(install_path, MANIFEST_FILENAME))
+    record_installed_files(install_path, changed + [MANIFEST_FILENAME], removed)
+
+    full_size = remote.get("archive_size") or sum(entry["size"] for entry in remote_files.values())
+    return {
+        "changed_files": len(changed),
+        "removed_files": len(removed),
+        "bytes_downloaded": downloaded,
+        "full_download_bytes": full_size,
+        "bytes_saved": max(0, full_size - downloaded),
+    }
+
+
+def publish_release(release_dir, version, output_dir, archive_path=None):
+    """Write a release's manifest and its hash-named file assets to output_dir."""
+    manifest = build_manifest(release_dir, version, archive_path)
+    os.makedirs(output_dir, exist_ok=True)
+    for path, entry in manifest["files"].items():
+        shutil.copyfile(os.path.join(release_dir, path), os.path.join(output_dir, entry["sha256"]))
+    save_manifest(manifest, os.path.join(output_dir, MANIFEST_FILENAME))
+    if archive_path:
+        archive_name = os.path.basename(archive_path)
+        with open(os.path.join(output_dir, archive_name + ".sha256"), "w") as checksum_file:
+            checksum_file.write(f"{hash_file(archive_path)}  {archive_name}\n")
+    return manifest
+
+
+if __name__ == "__main__":
+    # Usage: python update_manifest.py <release_dir> <version> <output_dir> [FoxBr.zip]
+    if len(sys.argv) < 4:
+        print("Usage: python update_manifest.py <release_dir> <version> <output_dir> [archive]")
+        sys.exit(1)
+    published = publish_release(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+    print(f"Published {len(published['files'])} files for version {sys.argv[2]}.")
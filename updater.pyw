@@ -4,13 +4,17 @@ import ctypes
 import requests
 import zipfile
 import winreg
+from install_pipeline import InstallPipeline, InstallError, fetch_expected_hash, record_installed_files
+from update_manifest import MANIFEST_FILENAME, fetch_manifest, apply_delta_update, build_manifest, save_manifest
+from update_check import UpdateChecker, shared_session, read_installed_version
 
-VERSION_URL = "https://raw.githubusercontent.com/FoxH2010/FoxBr/refs/heads/main/version"
-DOWNLOAD_URL_TEMPLATE = "https://github.com/FoxH2010/FoxBr/releases/download/{}/FoxBr.zip"
+RELEASE_URL_TEMPLATE = "https://github.com/FoxH2010/FoxBr/releases/download/{}"
+DOWNLOAD_URL_TEMPLATE = RELEASE_URL_TEMPLATE + "/FoxBr.zip"
 ZIP_FILENAME = "FoxBr_Update.zip"
 REGISTRY_KEY_PATH = r"SOFTWARE\FoxTeam\FoxBr"
 INSTALL_PATH_KEY = "InstallPath"
 MAIN_EXECUTABLE_NAME = "FoxBr.exe"
+PROFILE_FLAG = "--profile"
 
 
 def is_admin():
@@ -21,58 +25,17 @@ def is_admin():
         return False
 
 
-def fetch_latest_version():
-    """Fetch the latest version from the server."""
-    try:
-        response = requests.get(VERSION_URL, timeout=10)
-        response.raise_for_status()
-        return response.text.strip()
-    except requests.RequestException as e:
-        print(f"[Updater] Error fetching version: {e}")
-        return None
-
-
-def download_update(version, save_path):
-    """Download the update ZIP file."""
+def install_update(version, install_path):
+    """Download, verify and extract the update ZIP, swapping the new files in with rollback."""
     try:
         download_url = DOWNLOAD_URL_TEMPLATE.format(version)
-        response = requests.get(download_url, stream=True, timeout=30)
-        response.raise_for_status()
-
-        with open(save_path, "wb") as file:
-            for chunk in response.iter_content(1024):
-                if chunk:
-                    file.write(chunk)
+        zip_path = os.path.join(install_path, ZIP_FILENAME)
+        session = shared_session()
+        expected_sha256 = fetch_expected_hash(download_url + ".sha256", session)
+        InstallPipeline(download_url, zip_path, install_path, expected_sha256=expected_sha256, session=session).run()
         return True
-    except requests.RequestException as e:
-        print(f"[Updater] Error downloading update: {e}")
-        return False
-
-
-def extract_and_replace(zip_path, install_path):
-    """Extract the ZIP file and replace old files."""
-    try:
-        # Define paths for current and backup executables
-        current_executable = os.path.join(install_path, MAIN_EXECUTABLE_NAME)
-        old_executable = os.path.join(install_path, "FoxBr_old.exe")
-
-        # Remove existing backup if it exists
-        if os.path.exists(old_executable):
-            os.remove(old_executable)
-
-        # Rename the current executable to a backup
-        if os.path.exists(current_executable):
-            os.rename(current_executable, old_executable)
-
-        # Extract the new files
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(install_path)
-
-        # Remove the ZIP file after extraction
-        os.remove(zip_path)
-        return True
-    except Exception as e:
-        print(f"[Updater] Error extracting update: {e}")
+    except (requests.RequestException, OSError, InstallError, zipfile.BadZipFile) as e:
+        print(f"[Updater] Error installing update: {e}")
         return False
 
 
@@ -90,38 +53,23 @@ def read_registry_install_path():
         return None
 
 
-def read_installed_version(install_path):
-    """Read the installed version from the version file."""
-    version_file_path = os.path.join(install_path, "version.txt")
-    if os.path.exists(version_file_path):
-        with open(version_file_path, "r") as version_file:
-            return version_file.read().strip()
-    return None
-
-
 def write_installed_version(install_path, version):
     """Write the new version to the version file."""
     version_file_path = os.path.join(install_path, "version.txt")
     with open(version_file_path, "w") as version_file:
         version_file.write(version)
+    record_installed_files(install_path, ["version.txt"])
 
 
 def main():
-    # Ensure the updater has admin privileges
-    if not is_admin():
-        ctypes.windll.shell32.ShellExecuteW(
-            None, "runas", sys.executable, " ".join(sys.argv), None, 1
-        )
-        sys.exit(0)
-
     # Retrieve the installation path
     install_path = read_registry_install_path()
     if not install_path:
         print("[Updater] Installation path not found. Exiting.")
         sys.exit(1)
 
-    # Fetch the latest version
-    latest_version = fetch_latest_version()
+    # Fetch the latest version; a recent check is reused without touching the network
+    latest_version = UpdateChecker().check()
     if not latest_version:
         print("[Updater] Failed to fetch the latest version. Exiting.")
         sys.exit(1)
@@ -132,23 +80,47 @@ def main():
         print("[Updater] FoxBr is already up-to-date. Exiting.")
         sys.exit(0)
 
-    print(f"[Updater] Updating from version {current_version} to {latest_version}...")
+    # Ask for admin privileges only now that there is an update to install
+    if not is_admin():
+        ctypes.windll.shell32.ShellExecuteW(
+            None, "runas", sys.executable, " ".join(sys.argv), None, 1
+        )
+        sys.exit(0)
 
-    # Download the update
-    zip_path = os.path.join(install_path, ZIP_FILENAME)
-    if not download_update(latest_version, zip_path):
-        print("[Updater] Failed to download the update. Exiting.")
-        sys.exit(1)
+    print(f"[Updater] Updating from version {current_version} to {latest_version}...")
 
-    # Extract and replace files
-    if not extract_and_replace(zip_path, install_path):
+    # Prefer a delta update: only the files that changed since the installed release
+    release_url = RELEASE_URL_TEMPLATE.format(latest_version)
+    remote_manifest = fetch_manifest(release_url, shared_session())
+    if remote_manifest:
+        stats = apply_delta_update(release_url, install_path, remote_manifest, shared_session())
+        if stats:
+            write_installed_version(install_path, latest_version)
+            print(
+                f"[Updater] Delta update replaced {stats['changed_files']} files, "
+                f"downloaded {stats['bytes_downloaded']} of {stats['full_download_bytes']} bytes "
+                f"(saved {stats['bytes_saved']})."
+            )
+            print("[Updater] Update complete. Exiting.")
+            sys.exit(0)
+        print("[Updater] Delta update failed. Falling back to the full download.")
+
+    # Download and install the full update
+    if not install_update(latest_version, install_path):
         print("[Updater] Failed to install the update. Exiting.")
         sys.exit(1)
 
     # Write the new version to the version file
     write_installed_version(install_path, latest_version)
+
+    # Cache the manifest of the new install so the next update can be a delta
+    save_manifest(build_manifest(install_path, latest_version), os.path.join(install_path, MANIFEST_FILENAME))
+    record_installed_files(install_path, [MANIFEST_FILENAME])
     print("[Updater] Update complete. Exiting.")
 
 
 if __name__ == "__main__":
+    if PROFILE_FLAG in sys.argv:
+        from ui_profiler import UiProfiler  # Pulls in Qt, so only when profiling
+        UiProfiler("updater", profile=True)  # Results are written at exit
     main()
@@ -0,0 +1,82 @@
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
+
+VIEW_POOL_SIZE = 2  # Ready views kept for new tabs; 0 disables the pool
+PLACEHOLDER_HTML = "<h1>Loading...</h1>"
+
+# View signals that tabs connect to and that are cleared before a view is reused
+TAB_SIGNALS = ("titleChanged", "urlChanged", "iconChanged", "loadStarted", "loadFinished")
+
+
+class WebViewPool(QObject):
+    """Keep a few pre-created web views ready so opening a tab doesn't build one."""
+
+    def __init__(self, parent, size=VIEW_POOL_SIZE, profile=None):
+        super().__init__(parent)
+        self.size = size
+        self.profile = profile or QWebEngineProfile.defaultProfile()
+        self.views = []
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+
+        # A zero-interval timer only fires when the event loop has nothing else to do
+        self.refill_timer = QTimer(self)
+        self.refill_timer.setInterval(0)
+        self.refill_timer.timeout.connect(self._refill_one)
+        self.schedule_refill()
+
+    def acquire(self):
+        """Return a ready view, or build one if the pool is empty."""
+        if self.views:
+            self.hits += 1
+            view = self.views.pop()
+        else:
+            self.misses += 1
+            view = self._create_view()
+        self.schedule_refill()
+        return view
+
+    def release(self, view):
+        """Take back a closed tab's view, or delete it if it can't be reused."""
+        self._disconnect_tab_signals(view)
+        page = view.page()
+        if len(self.views) >= self.size or page.recentlyAudible():
+            view.deleteLater()
+            return
+
+        # A fresh page drops the old history, scripts and state but keeps the widget.
+        # setPage() deletes an old page the view owns at once; detach it so it goes with the event loop
+        page.setParent(None)
+        view.setPage(QWebEnginePage(page.profile(), view))
+        page.deleteLater()
+        view.setHtml(PLACEHOLDER_HTML)
+        self.views.append(view)
+        self.recycled += 1
+
+    def schedule_refill(self):
+        if len(self.views) < self.size and not self.refill_timer.isActive():
+            self.refill_timer.start()
+
+    def stats(self):
+        return {"ready": len(self.views), "hits": self.hits, "misses": self.misses, "recycled": self.recycled}
+
+    def _refill_one(self):
+        """Create one view per idle tick until the pool is full."""
+        if len(self.views) < self.size:
+            self.views.append(self._create_view())
+        if len(self.views) >= self.size:
+            self.refill_timer.stop()
+
+    def _create_view(self):
+        view = QWebEngineView()
+        view.setPage(QWebEnginePage(self.profile, view))
+        view.setHtml(PLACEHOLDER_HTML)  # Placeholder content
+        return view
+
+    def _disconnect_tab_signals(self, view):
+        for name in TAB_SIGNALS:
+            try:
+                getattr(view, name).disconnect()
+            except TypeError:
+                pass  # Nothing was connected
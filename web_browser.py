@@ -1,22 +1,33 @@
 from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QToolButton, QPushButton, QLabel, QToolBar, QLineEdit
+    QMainWindow, QWidget, QVBoxLayout, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QUrl, QEvent, QRect, QTimer
+from PyQt5.QtCore import Qt, QUrl, QRect, QTimer
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from title_bar import CustomTitleBar
 from PyQt5.QtGui import QPixmap
-from toolbar import CustomToolBar
+from toolbar import CustomToolBar, url_from_input
+from tab_lifecycle import TabLifecycleManager
+from tab_model import Tab, TabModel
+from session import SessionJournal
+from internal_pages import InternalPages
+from single_instance import urls_from_args
+from browser_profile import shared_profile
+from update_coalescer import UpdateCoalescer
+from view_pool import WebViewPool, VIEW_POOL_SIZE
 
 
 class WebBrowser(QMainWindow):
-    def __init__(self):
+    def __init__(self, view_pool_size=VIEW_POOL_SIZE, urls=()):
         super().__init__()
         self.setWindowTitle("FoxBr")
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setGeometry(100, 100, 1024, 768)
 
-        # Map tab buttons to browser instances
-        self.tab_map = {}
+        # Ordered tabs with their browser instances
+        self.tabs = TabModel()
+
+        # Bursts of page signals and mouse moves are applied at most once per frame
+        self.ui_updates = UpdateCoalescer(self)
 
         # Main Layout
         main_layout = QVBoxLayout()
@@ -39,20 +50,138 @@ class WebBrowser(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        # Add the first tab
-        self.add_new_tab()
-
-    def eventFilter(self, source, event):
-        """Handle middle-click to close tabs."""
-        if source == self.title_bar.tab_bar and event.type() == QEvent.MouseButtonRelease:
-            if event.button() == Qt.MiddleButton:
-                tab_container = source.childAt(event.pos())
-                if tab_container:
-                    index = self.title_bar.tab_bar_layout.indexOf(tab_container)
-                    if index >= 0:
-                        self.close_tab(index)
-        return super().eventFilter(source, event)
-    
+        # One persistent profile for every tab, with bounded HTTP and code caches kept across restarts
+        self.profile = shared_profile()
+        engine_profile = self.profile.engine_profile
+
+        # Pre-created web views, so opening a tab doesn't have to build one
+        self.view_pool = WebViewPool(self, view_pool_size, engine_profile)
+
+        # foxbr:// pages; more are added as the services behind them start
+        self.internal_pages = InternalPages(self)
+        self.internal_pages.add_page("cache", self.profile.render_page)
+        self.internal_pages.install(engine_profile)
+
+        # Freeze and discard background tabs to bound memory use
+        self.lifecycle = TabLifecycleManager(self, self.create_browser_view)
+        self.toolbar.suggestion_chosen.connect(self.on_suggestion_chosen)
+
+        # Built by start_services() once the first frame is up, or on first use
+        self.services_started = False
+        self.perf = None
+        self.content_blocker = None
+        self.favicons = None
+        self.thumbnails = None
+        self.tab_overview = None
+        self.history = None
+        self.speculation = None
+        self.downloads = None
+        self.downloads_panel = None  # Built when first opened
+
+        # Restore the previous session, or start with a single tab, then open any URLs given at launch
+        self.session = SessionJournal()
+        if not self.restore_session() and not urls:
+            self.add_new_tab()
+        for url in urls:
+            self.add_new_tab(url)
+
+    def restore_session(self):
+        """Restore saved tabs as placeholders; only the active tab is loaded right away."""
+        entries, active_index = self.session.load()
+        if not entries:
+            return False
+
+        for entry in entries:
+            tab = Tab(QUrl(entry["url"]), entry["title"] or "Loading...")
+            self.tabs.append(tab)
+            self.lifecycle.register_placeholder(tab, tab.url)
+        self.title_bar.tab_strip.relayout()
+
+        active_tab = self.tabs.tab_at(active_index) or self.tabs.tab_at(0)
+        self.switch_to_tab(active_tab)
+        self.session.reset(self.tabs, active_tab)
+        return True
+
+    def start_services(self):
+        """Build the subsystems the first frame doesn't need; runs once, after first paint or on first use."""
+        if self.services_started:
+            return
+        self.services_started = True
+        # Imported here so their modules, databases and threads stay off the startup path
+        from perf_metrics import PerfMonitor
+        from content_blocker import ContentBlocker
+        from favicon_cache import FaviconCache
+        from thumbnail_cache import ThumbnailCache
+        from tab_overview import TabOverview
+        from history import HistoryService
+        from speculative_loader import SpeculativeLoader
+        from download_manager import DownloadManager
+        engine_profile = self.profile.engine_profile
+
+        # Per-tab load timing and renderer memory/CPU, shown at foxbr://perf
+        self.perf = PerfMonitor(self, self.tabs)
+        self.internal_pages.add_page("perf", self.perf.render_page)
+        for tab in self.tabs:
+            if tab.browser is not None:
+                self.perf.attach(tab, tab.browser)
+
+        # Ad and tracker blocking from the filter lists in the data directory
+        self.content_blocker = ContentBlocker(self)
+        self.content_blocker.install(engine_profile)
+
+        # Favicons by origin, so restored tabs show one before their page loads
+        self.favicons = FaviconCache(self)
+        for tab in self.tabs:
+            if tab.icon is None and tab.url is not None:
+                tab.icon = self.favicons.lookup(tab.url)
+                if tab.icon is not None:
+                    self.title_bar.tab_strip.refresh_tab(tab)
+
+        # Page thumbnails for the tab overview grid, kept for discarded tabs too
+        self.thumbnails = ThumbnailCache(self)
+        self.tab_overview = TabOverview(self.tabs, self.thumbnails)
+        self.tab_overview.tab_chosen.connect(self.switch_to_tab)
+        self.tab_overview.dismissed.connect(lambda: self.switch_to_tab(self.tabs.active_tab))
+        self.content_stack.addWidget(self.tab_overview)
+
+        # Browsing history, indexed for omnibox suggestions
+        self.history = HistoryService(self)
+        self.history.suggestions_ready.connect(self.toolbar.show_suggestions)
+
+        # Warm up, or preload, where the typed text is likely to lead
+        self.speculation = SpeculativeLoader(self, self.view_pool)
+        self.history.suggestions_ready.connect(self.speculation.on_suggestions)
+
+        # Downloads from web pages, run as parallel, resumable transfers
+        self.downloads = DownloadManager(self)
+        self.downloads.install(engine_profile)
+
+    def showing_overview(self):
+        """Whether the tab overview grid is on screen instead of a page."""
+        return self.tab_overview is not None and self.content_stack.currentWidget() is self.tab_overview
+
+    def closeEvent(self, event):
+        """Save the session before the window goes away."""
+        self.session.close()
+        if self.services_started:
+            self.downloads.close()
+            self.history.close()
+            self.favicons.close()
+            self.thumbnails.close()
+        super().closeEvent(event)
+
+    def on_launch_requested(self, args, cwd):
+        """A later launch handed over its arguments: open its URLs here, or a new tab, and come to the front."""
+        urls = urls_from_args(args, cwd)
+        for url in urls:
+            self.add_new_tab(url)
+        if not urls:
+            self.add_new_tab()
+        self.setWindowState(self.windowState() & ~Qt.WindowMinimized | Qt.WindowActive)
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
     def toggle_maximized(self):
         """Toggle between maximized and normal window states."""
         if self.isMaximized():
@@ -61,178 +190,113 @@ class WebBrowser(QMainWindow):
             self.showMaximized()
 
     def add_new_tab(self, url="https://www.google.com"):
-        """Add a new tab with functional hover and click behavior, and fix layout issues."""
-        # Browser content
-        browser = QWebEngineView()
-        browser.setHtml("<h1>Loading...</h1>")  # Placeholder content
-        browser.titleChanged.connect(lambda title: self.update_tab_title(browser, title))
-        browser.urlChanged.connect(lambda url: self.update_url_field_and_tab_title(browser, url))
-        browser.iconChanged.connect(lambda icon: self.update_tab_icon(browser, tab_button_icon))
-
-        self.content_stack.addWidget(browser)
-
-        # Tab Container (holds favicon, title, and close button)
-        tab_container = QWidget(self)
-        tab_container.setFixedSize(200, 40)
-        tab_container.setStyleSheet("""
-            QWidget {
-                background-color: #ffffff;
-                border: 1px solid #cccccc;
-                border-radius: 5px;
-                padding: 5px; /* Internal padding for comfortable spacing */
-            }
-            QWidget:hover {
-                background-color: #e0e0e0;
-            }
-        """)
-
-        # Layout for the Tab Container
-        tab_layout = QHBoxLayout(tab_container)
-        tab_layout.setContentsMargins(5, 0, 5, 0)
-        tab_layout.setSpacing(5)
-
-        # Favicon (icon on the left)
-        tab_button_icon = QPushButton(tab_container)
-        tab_button_icon.setFlat(True)
-        tab_button_icon.setFixedSize(20, 20)
-        tab_button_icon.setStyleSheet("""
-            QPushButton {
-                border: none;
-                background-color: transparent;
-            }
-        """)
-
-        # Tab Title
-        tab_title = QPushButton("Loading...", tab_container)  # Changed to QPushButton for consistency
-        tab_title.setFlat(True)
-        tab_title.setStyleSheet("""
-            QPushButton {
-                border: none;
-                background-color: transparent;
-                text-align: left;
-                font-size: 14px;
-                color: black;
-            }
-            QPushButton:hover {
-                background-color: rgba(0, 0, 0, 0); /* Keep hover effect consistent */
-            }
-        """)
-        tab_title.setFixedHeight(20)
-
-        # Close Button
-        close_button = QPushButton("✕", tab_container)
-        close_button.setFlat(True)
-        close_button.setFixedSize(20, 20)
-        close_button.setStyleSheet("""
-            QPushButton {
-                border: none;
-                background-color: transparent;
-                color: #ff0000;
-            }
-            QPushButton:hover {
-                color: #cc0000;
-                background-color: rgba(255, 0, 0, 0.1);
-            }
-        """)
-        close_button.clicked.connect(lambda: self.close_tab(tab_container))
-
-        # Hidden Button for Tab Interaction
-        hidden_tab_button = QToolButton(tab_container)
-        hidden_tab_button.setFixedSize(200, 40)  # Match tab container size
-        hidden_tab_button.setStyleSheet("""
-            QToolButton {
-                border: none;
-                background-color: transparent;
-            }
-            QToolButton:hover {
-                background-color: rgba(0, 0, 0, 0); /* Let hover effect propagate to parent */
-            }
-        """)
-        hidden_tab_button.clicked.connect(lambda: self.switch_to_tab(tab_container))
-
-        # Add hidden button over the tab container
-        hidden_button_layout = QVBoxLayout(tab_container)
-        hidden_button_layout.setContentsMargins(0, 0, 0, 0)
-        hidden_button_layout.addWidget(hidden_tab_button)
-        hidden_button_layout.setAlignment(Qt.AlignTop)
-
-        # Add widgets to the Tab Layout
-        tab_layout.addWidget(tab_button_icon)
-        tab_layout.addWidget(tab_title)
-        tab_layout.addStretch()
-        tab_layout.addWidget(close_button)
-
-        # Add Tab Container to the Tab Bar Layout
-        self.title_bar.tab_bar_layout.insertWidget(self.title_bar.tab_bar_layout.count() - 1, tab_container)
-
-        # Map the Tab Container to the Browser
-        self.tab_map[tab_container] = browser
-        browser.tab_button_title = tab_title  # Dynamically update the tab title
-
-        # Connect Favicon Update
-        browser.iconChanged.connect(lambda: self.update_tab_icon(browser, tab_button_icon))
+        """Add a new tab at the end of the tab strip and switch to it."""
+        tab = Tab(QUrl(url))
+        if self.favicons is not None:
+            tab.icon = self.favicons.lookup(tab.url)
+        self.tabs.append(tab)
+        self.session.tab_opened(tab)
+
+        # Browser content, mapped to the Tab
+        browser = self.create_browser_view(tab, QUrl(url))
+        self.lifecycle.register(tab, browser)
+        self.title_bar.tab_strip.relayout()
 
         # Switch to the new tab
-        self.switch_to_tab(tab_container)
+        self.switch_to_tab(tab)
 
         # Clear the URL field for the new tab
         self.toolbar.url_field.clear()
         self.toolbar.url_field.setPlaceholderText("Search or enter address")
 
+    def create_browser_view(self, tab, url, view=None):
+        """Take a ready web view for a tab and schedule loading its URL.
+
+        A view that already shows the page, such as a preloaded one, can be passed instead.
+        """
+        browser = view or self.view_pool.acquire()  # Already showing the placeholder content
+        browser.titleChanged.connect(
+            lambda title: self.ui_updates.submit(browser, "title", self.update_tab_title, browser, title)
+        )
+        browser.urlChanged.connect(
+            lambda url: self.ui_updates.submit(browser, "url", self.update_url_field_and_tab_title, browser, url)
+        )
+        browser.iconChanged.connect(lambda icon: self.update_tab_icon(browser))
+        browser.loadFinished.connect(lambda ok: self.capture_thumbnail_later(browser))
+
+        self.content_stack.addWidget(browser)
+
+        # Map the Tab to the Browser
+        self.tabs.set_browser(tab, browser)
+        if self.perf is not None:
+            self.perf.attach(tab, browser)
+
         # Load the URL after initializing
-        QTimer.singleShot(0, lambda: browser.setUrl(QUrl(url)))
-
-    def _setup_tab_hover(self, tab_container, tab_button_icon, tab_title, close_button):
-        """Unify hover behavior for the entire tab."""
-        def hover_event(event):
-            if event.type() == Qt.Enter:
-                # Highlight entire tab on hover
-                tab_container.setStyleSheet("""
-                    QWidget {
-                        background-color: #e0e0e0;
-                        border: 1px solid #cccccc;
-                        border-radius: 5px;
-                    }
-                """)
-            elif event.type() == Qt.Leave:
-                # Reset highlight when hover ends
-                tab_container.setStyleSheet("""
-                    QWidget {
-                        background-color: #ffffff;
-                        border: 1px solid #cccccc;
-                        border-radius: 5px;
-                    }
-                """)
-            return super(QWidget, tab_container).event(event)
-
-        # Apply hover event to the container
-        tab_container.event = hover_event
-
-    def update_tab_icon(self, browser, tab_button_icon):
-        """Update the favicon on the tab button."""
+        if view is None:
+            QTimer.singleShot(0, lambda: browser.setUrl(url))
+        return browser
+
+    def swap_in_view(self, tab, view):
+        """Replace a tab's view with a preloaded one."""
+        old_browser = tab.browser
+        if old_browser is not None:
+            self.ui_updates.cancel(old_browser)
+            self.content_stack.removeWidget(old_browser)
+            self.view_pool.release(old_browser)
+        self.create_browser_view(tab, view.url(), view=view)
+        self.lifecycle.replace_view(tab, view)
+        self.switch_to_tab(tab)
+
+        # The page finished loading before its signals were connected
+        self.update_url_field_and_tab_title(view, view.url())
+        self.update_tab_icon(view)
+
+    def update_tab_icon(self, browser):
+        """Update the favicon on the tab button, caching it for the page's origin."""
+        tab = self.tabs.tab_for_browser(browser)
         icon = browser.icon()
-        if not icon.isNull():
-            tab_button_icon.setIcon(icon)  # Use setIcon for QPushButton
-            tab_button_icon.setIconSize(tab_button_icon.size())  # Match the icon size to the button size
+        if tab is None or icon.isNull():
+            return
+        if self.favicons is not None:
+            icon = self.favicons.store(browser.url(), icon)
+        if icon is not tab.icon:  # The cache hands back the same icon when nothing changed
+            tab.icon = icon
+            self.title_bar.tab_strip.refresh_tab(tab)
+
+    def capture_thumbnail_later(self, browser):
+        """Refresh the overview thumbnail of the active tab once its page has painted."""
+        tab = self.tabs.tab_for_browser(browser)
+        if tab is not None and tab is self.tabs.active_tab and self.thumbnails is not None:
+            self.thumbnails.schedule_capture(tab)
 
     def update_tab_title(self, browser, title):
         """Update the title of the tab associated with the given browser."""
-        for tab_container, mapped_browser in self.tab_map.items():
-            if mapped_browser == browser:
-                tab_title = tab_container.layout().itemAt(1).widget()  # Second widget is the title button
-                if isinstance(tab_title, QPushButton):  # Ensure it's the title button
-                    tab_title.setText(title)
-
-    def switch_to_tab(self, tab_container):
-        """Switch to the tab associated with the given tab container."""
-        if tab_container in self.tab_map:
-            browser = self.tab_map[tab_container]
+        tab = self.tabs.tab_for_browser(browser)
+        if tab is not None:
+            tab.title = title
+            self.title_bar.tab_strip.refresh_tab(tab)
+            self.session.tab_updated(tab, title=title)
+            url = browser.url()
+            if title and url.scheme() != "data" and self.history is not None:
+                self.history.record_title(url.toString(), title)
+
+    def switch_to_tab(self, tab):
+        """Switch to the given tab."""
+        if tab in self.tabs:
+            # Wake the tab up, rebuilding its view if it was discarded
+            self.lifecycle.activate(tab)
+            self.session.tab_activated(tab)
+            browser = tab.browser
+            if self.showing_overview():
+                self.tab_overview.close_overview()
             index = self.content_stack.indexOf(browser)
             if index != -1:
                 self.content_stack.setCurrentIndex(index)
 
             # Highlight the active tab
-            self.highlight_active_tab(tab_container)
+            self.highlight_active_tab(tab)
+            if self.thumbnails is not None:
+                self.thumbnails.schedule_capture(tab)
 
             # Update the URL field for the active tab
             current_url = browser.url().toString()
@@ -242,49 +306,37 @@ class WebBrowser(QMainWindow):
             else:
                 self.toolbar.url_field.setText(current_url)
 
-    def close_tab(self, tab_container):
-        """Close the tab associated with the given tab container."""
-        if tab_container in self.tab_map:
-            # Remove browser content
-            browser = self.tab_map.pop(tab_container)
-            self.content_stack.removeWidget(browser)
-            browser.deleteLater()
-
-            # Remove the tab container
-            self.title_bar.tab_bar_layout.removeWidget(tab_container)
-            tab_container.deleteLater()
+    def close_tab(self, tab):
+        """Close the given tab."""
+        if tab in self.tabs:
+            # Remove browser content (discarded tabs have no view left)
+            browser = tab.browser
+            was_active = tab is self.tabs.active_tab
+            self.lifecycle.unregister(tab)
+            if self.services_started:
+                self.perf.detach(tab)
+                self.thumbnails.remove(tab.id)
+            self.session.tab_closed(tab)
+            self.tabs.remove(tab)
+            if browser is not None:
+                self.ui_updates.cancel(browser)
+                self.content_stack.removeWidget(browser)
+                self.view_pool.release(browser)
+
+            # Remove the tab from the strip
+            self.title_bar.tab_strip.relayout()
 
             # If no tabs remain, close the browser
-            if not self.tab_map:
+            if not self.tabs:
                 self.close()
-            else:
-                # Switch to the first available tab
-                first_tab = next(iter(self.tab_map.keys()))
-                self.switch_to_tab(first_tab)
+            elif was_active or self.tabs.active_tab is None:
+                # Switch to the neighbour the model made active
+                self.switch_to_tab(self.tabs.active_tab or self.tabs.tab_at(0))
 
     def highlight_active_tab(self, active_tab):
-        """Highlight the active tab and reset the styles of inactive tabs."""
-        for i in range(self.title_bar.tab_bar_layout.count() - 1):
-            tab_container = self.title_bar.tab_bar_layout.itemAt(i).widget()
-            if tab_container == active_tab:
-                tab_container.setStyleSheet("""
-                    QWidget {
-                        background-color: #d0d0d0;
-                        border: 1px solid #cccccc;
-                        border-radius: 5px;
-                    }
-                """)
-            else:
-                tab_container.setStyleSheet("""
-                    QWidget {
-                        background-color: #ffffff;
-                        border: 1px solid #cccccc;
-                        border-radius: 5px;
-                    }
-                    QWidget:hover {
-                        background-color: #e0e0e0;
-                    }
-                """)
+        """Highlight the active tab; only the previous and new active tabs are restyled."""
+        self.tabs.active_tab = active_tab
+        self.title_bar.tab_strip.set_active(active_tab)
 
     def update_url_field_and_tab_title(self, browser, url):
         """Update the URL field and tab title when the browser URL changes."""
@@ -296,6 +348,16 @@ class WebBrowser(QMainWindow):
             else:
                 self.toolbar.url_field.setText(url.toString())
 
+        # Remember real page URLs (not the placeholder HTML) for the session and history
+        tab = self.tabs.tab_for_browser(browser)
+        if tab is not None and url.scheme() != "data":
+            if tab.restoring:  # Reloading a discarded or restored tab is not a new visit
+                tab.restoring = False
+            elif self.history is not None:
+                self.history.record_visit(url.toString(), browser.title())
+            tab.url = url
+            self.session.tab_updated(tab, url=url.toString())
+
         # Update the tab title based on the browser's title
         self.update_tab_title(browser, browser.title())
 
@@ -305,24 +367,42 @@ class WebBrowser(QMainWindow):
         if not text:
             return
 
-        # Detect if the entered text is a valid URL
-        if text.startswith("http://") or text.startswith("https://"):
-            url = text
-        elif "." in text:  # Likely a domain
-            url = "http://" + text
-        else:
-            # Treat as a search query and redirect to Google
-            search_engine = "https://www.google.com/search?q="
-            url = search_engine + text.replace(" ", "+")
+        # A URL, or a search query for anything that doesn't look like one
+        url = url_from_input(text)
 
-        # Load the URL or search query
+        # Show the preloaded page if it is the one asked for, otherwise load it
+        preloaded = self.speculation.take(url) if self.speculation is not None else None
+        if self.showing_overview() and self.tabs.active_tab is not None:
+            self.switch_to_tab(self.tabs.active_tab)
         current_tab = self.content_stack.currentWidget()
-        if isinstance(current_tab, QWebEngineView):
+        if preloaded is not None and self.tabs.active_tab is not None:
+            self.swap_in_view(self.tabs.active_tab, preloaded)
+        elif isinstance(current_tab, QWebEngineView):
             current_tab.setUrl(QUrl(url))
 
         # Clear focus from the URL field after submission
         self.toolbar.url_field.clearFocus()
 
+    def on_url_text_edited(self, text):
+        """Ask for suggestions for the typed text, including other open tabs."""
+        self.start_services()
+        open_tabs = [
+            (tab.id, tab.url.toString(), tab.title)
+            for tab in self.tabs if tab is not self.tabs.active_tab and tab.url is not None
+        ]
+        self.history.request_suggestions(text, open_tabs)
+        if text.strip():
+            self.speculation.on_input(url_from_input(text.strip()))
+
+    def on_suggestion_chosen(self, url, tab_id):
+        """Switch to an open tab, or load a history entry in the current tab."""
+        for tab in self.tabs:
+            if tab.id == tab_id:
+                self.switch_to_tab(tab)
+                return
+        self.toolbar.url_field.setText(url)
+        self.on_url_entered()
+
     def select_url_on_click(self, event):
         """Select the entire URL when the field is clicked."""
         self.toolbar.url_field.selectAll()
@@ -346,9 +426,23 @@ class WebBrowser(QMainWindow):
         if isinstance(current_tab, QWebEngineView):
             current_tab.reload()
 
+    def on_overview_clicked(self):
+        """Show all tabs as a grid of thumbnails, or go back to the active tab."""
+        self.start_services()
+        if self.showing_overview():
+            self.switch_to_tab(self.tabs.active_tab)
+            return
+        self.tab_overview.open(self.tabs.active_tab)
+        self.content_stack.setCurrentWidget(self.tab_overview)
+        self.tab_overview.setFocus()
+
     def on_settings_clicked(self):
-        """Handle Settings button click."""
-        print("Settings button clicked!")  # Replace with actual settings logic
+        """Open the downloads panel under the settings button."""
+        self.start_services()
+        if self.downloads_panel is None:
+            from downloads_panel import DownloadsPanel  # Only needed once the panel is opened
+            self.downloads_panel = DownloadsPanel(self, self.downloads)
+        self.downloads_panel.show_below(self.toolbar.settings_button)
 
     def mousePressEvent(self, event):
         """Start resizing or pass to other components."""
@@ -360,6 +454,7 @@ class WebBrowser(QMainWindow):
 
     def mouseReleaseEvent(self, event):
         """Stop resizing."""
+        self.ui_updates.flush()  # Apply the last pending resize
         self.resizing = False
         self.resize_direction = None
         self.setCursor(Qt.ArrowCursor)
@@ -368,7 +463,7 @@ class WebBrowser(QMainWindow):
     def mouseMoveEvent(self, event):
         """Handle resizing or update cursor shape."""
         if hasattr(self, "resizing") and self.resizing and hasattr(self, "resize_direction") and self.resize_direction:
-            self.perform_resizing(event.globalPos())
+            self.ui_updates.submit(self, "resize", self.perform_resizing, event.globalPos())
         else:
             self.update_cursor(event.pos())
         super().mouseMoveEvent(event)
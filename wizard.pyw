@@ -10,8 +10,12 @@ from PyQt5.QtWidgets import (
     QProgressBar, QWidget, QLineEdit, QFileDialog, QMessageBox
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from download_engine import DownloadCanceled
+from install_pipeline import InstallPipeline, InstallError, fetch_expected_hash, record_installed_files
+from update_coalescer import UpdateCoalescer
+from update_check import UpdateChecker, shared_session
+from ui_profiler import UiProfiler
 
-VERSION_URL = "https://raw.githubusercontent.com/FoxH2010/FoxBr/refs/heads/main/version"
 DOWNLOAD_URL_TEMPLATE = "https://github.com/FoxH2010/FoxBr/releases/download/{}/FoxBr.zip"
 DEFAULT_INSTALL_PATH = r"C:\Program Files\FoxTeam\FoxBr"
 ZIP_FILENAME = "FoxBr.zip"
@@ -41,53 +45,68 @@ class VersionFetcher(QThread):
     error_occurred = pyqtSignal(str)
 
     def run(self):
-        try:
-            response = requests.get(VERSION_URL, timeout=10)
-            response.raise_for_status()
-            version = response.text.strip()
+        # Always revalidate, but conditionally: an unchanged version costs an empty 304
+        checker = UpdateChecker()
+        version = checker.check(force=True)
+        if version:
             self.version_fetched.emit(version)
-        except requests.RequestException as e:
-            self.error_occurred.emit(str(e))
+        else:
+            self.error_occurred.emit(checker.last_error or "Could not fetch the latest version.")
 
 
 class InstallerDownloader(QThread):
+    """Download, verify and extract the release archive off the GUI thread."""
+
     download_progress = pyqtSignal(int)
     download_complete = pyqtSignal()
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, download_url, save_path):
+    def __init__(self, download_url, save_path, install_path):
         super().__init__()
         self.download_url = download_url
         self.save_path = save_path
+        self.install_path = install_path
+        self.pipeline = None
         self._is_canceled = False
 
     def run(self):
+        self.last_percent = -1
+        session = shared_session()  # Reuses the version check's connection
+        expected_sha256 = fetch_expected_hash(self.download_url + ".sha256", session)
+        self.pipeline = InstallPipeline(
+            self.download_url, self.save_path, self.install_path,
+            expected_sha256=expected_sha256, progress_callback=self.report_progress, session=session
+        )
+        if self._is_canceled:
+            return
         try:
-            response = requests.get(self.download_url, stream=True, timeout=30)
-            response.raise_for_status()
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
-
-            with open(self.save_path, "wb") as file:
-                for chunk in response.iter_content(1024):
-                    if self._is_canceled:
-                        file.close()
-                        os.remove(self.save_path)
-                        return
-                    if chunk:
-                        file.write(chunk)
-                        downloaded_size += len(chunk)
-                        progress = int((downloaded_size / total_size) * 100)
-                        self.download_progress.emit(progress)
-
+            self.pipeline.run()
             if not self._is_canceled:
                 self.download_complete.emit()
-        except requests.RequestException as e:
+        except DownloadCanceled:
+            self.pipeline.downloader.discard_partial()
+        except (requests.RequestException, OSError, InstallError, zipfile.BadZipFile) as e:
+            # A partial download is kept, so the next attempt resumes it
             self.error_occurred.emit(str(e))
 
+    def report_progress(self, downloaded, download_total, extracted, extract_total):
+        """Emit the combined download and extraction percentage, only when it changes."""
+        if download_total:
+            progress = downloaded / download_total
+            if extract_total:
+                progress = (progress + extracted / extract_total) / 2
+            else:
+                progress /= 2
+            percent = int(progress * 100)
+            if percent != self.last_percent:
+                self.last_percent = percent
+                self.download_progress.emit(percent)
+
     def cancel(self):
         """Cancel the download process."""
         self._is_canceled = True
+        if self.pipeline is not None:
+            self.pipeline.cancel()
 
 
 class InstallerWizard(QStackedWidget):
@@ -214,6 +233,7 @@ class DownloadPage(BasePage):
         super().__init__(wizard)
         self.status_label = QLabel("Preparing to download...")
         self.progress_bar = QProgressBar()
+        self.progress_updates = UpdateCoalescer(self)  # At most one repaint per frame
 
         self.content_layout.addWidget(self.status_label)
         self.content_layout.addWidget(self.progress_bar)
@@ -254,24 +274,24 @@ class DownloadPage(BasePage):
         save_path = os.path.join(self.install_path, ZIP_FILENAME)
 
         self.status_label.setText(f"Downloading FoxBr v{self.version} to {self.install_path}...")
-        self.downloader = InstallerDownloader(download_url, save_path)
-        self.downloader.download_progress.connect(self.progress_bar.setValue)
+        self.downloader = InstallerDownloader(download_url, save_path, self.install_path)
+        self.downloader.download_progress.connect(
+            lambda percent: self.progress_updates.submit(self.progress_bar, "value", self.progress_bar.setValue, percent)
+        )
         self.downloader.download_complete.connect(self.download_complete)
         self.downloader.error_occurred.connect(self.show_error)
         self.downloader.start()
 
     def download_complete(self):
-        self.status_label.setText("Download complete! Extracting files...")
-        zip_path = os.path.join(self.install_path, ZIP_FILENAME)
+        # Files were already verified and extracted on the downloader thread
+        self.progress_updates.flush()
+        self.status_label.setText("Finishing installation...")
 
         try:
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(self.install_path)
-            os.remove(zip_path)
-
             version_file_path = os.path.join(self.install_path, "version.txt")
             with open(version_file_path, "w") as version_file:
                 version_file.write(self.version)
+            record_installed_files(self.install_path, ["version.txt"])
 
             write_installation_path_to_registry(self.install_path)
 
@@ -287,7 +307,7 @@ class DownloadPage(BasePage):
                 )
             self.wizard.setCurrentWidget(self.wizard.completion_page)
         except Exception as e:
-            self.status_label.setText(f"Error extracting files: {e}")
+            self.status_label.setText(f"Error finishing installation: {e}")
 
     def cancel_download(self):
         if self.downloader:
@@ -340,7 +360,8 @@ class CompletionPage(BasePage):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    profiler, argv = UiProfiler.from_argv("wizard", sys.argv)  # --profile / --watch-stalls
+    app = QApplication(argv)
 
     if os.name == "nt" and not is_admin():
         QMessageBox.critical(None, "Permission Error", "This installer must be run as an administrator.")
@@ -348,4 +369,6 @@ if __name__ == "__main__":
 
     wizard = InstallerWizard()
     wizard.show()
+    if profiler is not None:
+        profiler.watch(app)
     sys.exit(app.exec_())